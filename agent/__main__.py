@@ -1,10 +1,17 @@
 import argparse
+import multiprocessing
 
 def main():
     p = argparse.ArgumentParser(prog="suridash-agent")
     sub = p.add_subparsers(dest="cmd", required=True)
 
-    sub.add_parser("setup", help="Setup ipset/iptables (requires root)")
+    setup_parser = sub.add_parser("setup", help="Setup ipset/iptables or nftables (requires root)")
+    setup_parser.add_argument(
+        "--backend",
+        choices=["ipset", "nftables"],
+        default=None,
+        help="Firewall backend to provision (default: SURIDASH_FIREWALL_BACKEND or ipset)",
+    )
     sub.add_parser("run", help="Run Suridash agent")
     
     update_parser = sub.add_parser("update", help="Update Suridash agent via dashboard script")
@@ -14,7 +21,7 @@ def main():
 
     if args.cmd == "setup":
         from agent.setup import main as setup_main
-        setup_main()
+        setup_main(args.backend)
 
     elif args.cmd == "run":
         from agent.main import main as run_main
@@ -25,4 +32,5 @@ def main():
         update_main(args.version)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
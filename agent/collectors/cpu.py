@@ -1,7 +1,9 @@
-import psutil
-
-def collect():
+def collect(window):
+    """CPU dari window sampler (lihat sampler.py): rata-rata total + per core."""
+    cores = window["info"]["cores"]
     return {
-        "percent": psutil.cpu_percent(interval=1),
-        "cores": psutil.cpu_count(),
+        "percent": round(window["cpu"]["avg"], 1),
+        "cores": cores,
+        "perCore": [round(window[f"cpu{i}"]["avg"], 1) for i in range(cores)],
+        "window": window["cpu"],
     }
@@ -1,9 +1,22 @@
-import psutil
-
-def collect():
-    disk = psutil.disk_usage("/")
+def collect(window):
+    """Disk root (field lama) + per mount + rate IO (bytes/sec) dari window sampler."""
+    mounts = {}
+    for path, total in window["info"]["mounts"].items():
+        percent = window.get(f"mount.{path}.percent")
+        if percent is None:
+            continue
+        mounts[path] = {
+            "total": total,
+            "used": int(window[f"mount.{path}.used"]["last"]),
+            "percent": percent["last"],
+        }
     return {
-        "total": disk.total,
-        "used": disk.used,
-        "percent": disk.percent,
+        "total": window["info"]["diskTotal"],
+        "used": int(window["disk_used"]["last"]),
+        "percent": window["disk_percent"]["last"],
+        "mounts": mounts,
+        "io": {
+            "read": int(window["disk_read"]["avg"]),
+            "write": int(window["disk_write"]["avg"]),
+        },
     }
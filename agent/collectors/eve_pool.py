@@ -0,0 +1,102 @@
+"""
+Ingestion eve.json multi-core.
+
+Satu thread reader memecah eve.json jadi chunk yang rapi per baris, lalu
+process pool melakukan decode, filter alert, fingerprint dan proyeksi field.
+Yang dikirim balik ke proses utama (lewat pipe) hanya record alert yang
+ringkas, dan urutannya tetap sama dengan urutan di file.
+
+Aktif kalau SURIDASH_EVE_WORKERS > 0. Default 0 = tail single-thread biasa
+(cukup untuk host kecil).
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from agent.collectors.suricata_alerts import ALERT_MARKER, STATS_MARKER, stats_events, tail_eve_chunks
+from agent.utils import codec
+from agent.utils.deduper import fingerprint_suricata_alert
+
+logger = logging.getLogger("suridash-agent")
+
+EVE_WORKERS = int(os.environ.get("SURIDASH_EVE_WORKERS", "0"))
+# chunk yang boleh antre per worker sebelum reader ikut menunggu
+INFLIGHT_PER_WORKER = 4
+
+_TOP_FIELDS = ("timestamp", "src_ip", "src_port", "dest_ip", "dest_port", "proto")
+_ALERT_FIELDS = ("signature", "signature_id", "rev", "category", "severity")
+
+
+def project_alert(event: dict) -> dict:
+    """Ambil field yang dipakai pipeline saja (payload, dedup, auto-block)."""
+    rec = {k: event.get(k) for k in _TOP_FIELDS}
+    a = event.get("alert") or {}
+    rec["alert"] = {k: a.get(k) for k in _ALERT_FIELDS}
+    return rec
+
+
+def parse_chunk(data: bytes, bucket_seconds: int) -> list:
+    """Jalan di worker process. Return list (fingerprint, record)."""
+    out = []
+    for line in data.split(b"\n"):
+        if ALERT_MARKER not in line:
+            continue
+        try:
+            event = codec.loads(line)
+        except ValueError:
+            continue
+        if event.get("event_type") != "alert":
+            continue
+        rec = project_alert(event)
+        out.append((fingerprint_suricata_alert(rec, bucket_seconds=bucket_seconds), rec))
+    return out
+
+
+class EvePool:
+    def __init__(self, path: str, workers: int, bucket_seconds: int, on_stats=None):
+        self.path = path
+        # event stats jarang (tiap beberapa detik): di-decode di thread reader saja
+        self.on_stats = on_stats
+        self.workers = max(1, workers)
+        self.bucket_seconds = bucket_seconds
+        # spawn: aman dipakai dari proses yang sudah punya banyak thread
+        self._ctx = multiprocessing.get_context("spawn")
+        self._pool = self._new_pool()
+        self._futures: queue.Queue = queue.Queue(maxsize=self.workers * INFLIGHT_PER_WORKER)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self._ctx)
+
+    def _submit(self, data: bytes):
+        try:
+            return self._pool.submit(parse_chunk, data, self.bucket_seconds)
+        except BrokenProcessPool:
+            logger.error("Eve parser pool broken, restarting workers")
+            self._pool = self._new_pool()
+            return self._pool.submit(parse_chunk, data, self.bucket_seconds)
+
+    def _reader(self):
+        for data in tail_eve_chunks(self.path):
+            if self.on_stats is not None and STATS_MARKER in data:
+                for event in stats_events(data):
+                    self.on_stats(event)
+            # put() blocking -> backpressure kalau worker tertinggal
+            self._futures.put(self._submit(data))
+
+    def alerts(self):
+        """Yield (fingerprint, record) sesuai urutan file."""
+        threading.Thread(target=self._reader, name="suridash-eve-reader", daemon=True).start()
+
+        while True:
+            fut = self._futures.get()
+            try:
+                results = fut.result()
+            except Exception as e:
+                logger.error(f"Eve parser worker failed: {e}")
+                continue
+            yield from results
@@ -0,0 +1,99 @@
+"""
+Ingestion eve langsung dari Suricata lewat unix socket.
+
+Agent membuat (listen) socket di SURIDASH_EVE_SOCKET, lalu Suricata
+dikonfigurasi menulis eve ke sana:
+
+  outputs:
+    - eve-log:
+        enabled: yes
+        filetype: unix_stream      # atau unix_dgram
+        filename: /run/suridash/eve.sock
+
+Tidak ada file di disk, tidak ada rotasi, tidak ada polling: setiap event
+langsung masuk ke pipeline alert di event loop.
+"""
+
+import asyncio
+import os
+import socket
+import logging
+from typing import Callable, Optional
+
+from agent.collectors.suricata_alerts import parse_alert_lines
+
+logger = logging.getLogger("suridash-agent")
+
+EVE_SOCKET = os.environ.get("SURIDASH_EVE_SOCKET", "")
+EVE_SOCKET_TYPE = os.environ.get("SURIDASH_EVE_SOCKET_TYPE", "stream").lower()
+# default 660: hanya owner/grup yang boleh menulis alert (bisa memicu auto-block)
+EVE_SOCKET_MODE = int(os.environ.get("SURIDASH_EVE_SOCKET_MODE", "660"), 8)
+
+MAX_LINE = 16 * 1024 * 1024
+
+
+def _prepare_path(path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        os.unlink(path)  # socket lama dari run sebelumnya
+    except FileNotFoundError:
+        pass
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, on_alert: Callable[[dict], None], on_stats: Optional[Callable[[dict], None]] = None):
+        self.on_alert = on_alert
+        self.on_stats = on_stats
+
+    def datagram_received(self, data, addr):
+        # satu datagram = satu event (kadang diakhiri newline)
+        for alert in parse_alert_lines(data.split(b"\n"), self.on_stats):
+            self.on_alert(alert)
+
+
+async def serve_eve_socket(
+    path: str,
+    on_alert: Callable[[dict], None],
+    sock_type: str = EVE_SOCKET_TYPE,
+    on_stats: Optional[Callable[[dict], None]] = None,
+):
+    """
+    Start listener di `path`. `on_alert` dipanggil di event loop untuk setiap
+    event alert (dan `on_stats` untuk event stats). Return server/transport
+    supaya bisa ditutup.
+    """
+    _prepare_path(path)
+    loop = asyncio.get_running_loop()
+
+    if sock_type == "dgram":
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(on_alert, on_stats),
+            local_addr=path,
+            family=socket.AF_UNIX,
+        )
+        os.chmod(path, EVE_SOCKET_MODE)
+        logger.info(f"Listening for Suricata eve (unix_dgram) on {path}")
+        return transport
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        logger.info("Suricata connected to eve socket")
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError as e:
+                    # event terlalu besar: buang sampai newline berikutnya
+                    await reader.readexactly(e.consumed)
+                    continue
+                for alert in parse_alert_lines((line,), on_stats):
+                    on_alert(alert)
+        finally:
+            logger.warning("Suricata disconnected from eve socket")
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle, path=path, limit=MAX_LINE)
+    os.chmod(path, EVE_SOCKET_MODE)
+    logger.info(f"Listening for Suricata eve (unix_stream) on {path}")
+    return server
@@ -1,10 +1,8 @@
-import psutil
-
-def collect():
-    mem = psutil.virtual_memory()
+def collect(window):
     return {
-        "total": mem.total,
-        "used": mem.used,
-        "percent": mem.percent,
-        "free": mem.free,
+        "total": window["info"]["memTotal"],
+        "used": int(window["mem_used"]["last"]),
+        "percent": window["mem_percent"]["last"],
+        "free": int(window["mem_free"]["last"]),
+        "window": window["mem_percent"],
     }
@@ -1,33 +1,20 @@
 # agent/collectors/network.py
-import psutil
-import time
 
-_prev = None
-_prev_time = None
-
-def collect():
-    global _prev, _prev_time
-
-    now = time.time()
-    net = psutil.net_io_counters()
-
-    if _prev is None:
-        _prev = net
-        _prev_time = now
-        return {
-            "rx": 0,
-            "tx": 0,
+def collect(window):
+    """Rate network (bytes/sec) dari window sampler, rata-rata sepanjang window."""
+    interfaces = {}
+    for name in window["info"]["interfaces"]:
+        recv = window.get(f"if.{name}.recv")
+        if recv is None:
+            continue
+        interfaces[name] = {
+            "recv": int(recv["avg"]),
+            "sent": int(window[f"if.{name}.sent"]["avg"]),
+            "recvMax": int(recv["max"]),
         }
-
-    interval = now - _prev_time
-
-    rx_rate = (net.bytes_recv - _prev.bytes_recv) / interval
-    tx_rate = (net.bytes_sent - _prev.bytes_sent) / interval
-
-    _prev = net
-    _prev_time = now
-
     return {
-        "recv": int(rx_rate),  # bytes/sec
-        "sent": int(tx_rate),
+        "recv": int(window["net_recv"]["avg"]),
+        "sent": int(window["net_sent"]["avg"]),
+        "window": {"recv": window["net_recv"], "sent": window["net_sent"]},
+        "interfaces": interfaces,
     }
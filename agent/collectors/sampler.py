@@ -0,0 +1,309 @@
+"""
+Sampler metrics di thread terpisah.
+
+Thread daemon membaca CPU (per core), memory, disk (per mount + IO) dan
+network (per interface) tiap SURIDASH_METRIC_RESOLUTION detik tanpa pernah
+blocking (cpu_percent dengan interval=None = selisih sejak pembacaan
+sebelumnya). Hasilnya ditulis ke ring buffer array('d') berukuran tetap, satu
+array per series dengan index tulis bersama. Series per interface / mount
+dibuat saat interface / mount muncul dan dibuang saat hilang; slot yang belum
+terisi bernilai NaN dan tidak ikut dihitung.
+
+Daftar mount di-cache dan hanya dibaca ulang kalau /proc/self/mounts
+memberi tanda berubah (POLLPRI); daftar interface hanya difilter ulang kalau
+set nama dari /proc/net/dev berubah.
+
+send_metrics cukup memanggil window(detik) untuk mengambil ringkasan
+min/avg/max/p95 yang sudah ada di memori, jadi event loop tidak ikut
+menunggu pembacaan psutil.
+"""
+
+import math
+import os
+import select
+import threading
+import time
+from array import array
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+
+import psutil
+
+METRIC_RESOLUTION = float(os.environ.get("SURIDASH_METRIC_RESOLUTION", "1"))
+METRIC_HISTORY = int(os.environ.get("SURIDASH_METRIC_HISTORY", "300"))  # jumlah sample
+# interface yang tidak dilaporkan terpisah (pola glob, pisahkan dengan koma)
+METRIC_IFACES_EXCLUDE = os.environ.get("SURIDASH_METRIC_IFACES_EXCLUDE", "lo,veth*,docker*,br-*,virbr*")
+DISK_PATH = "/"
+
+# filesystem yang bukan storage sungguhan
+SKIP_FSTYPES = frozenset({"squashfs", "tmpfs", "devtmpfs", "overlay", "iso9660"})
+# kalau /proc/self/mounts tidak bisa di-poll: baca ulang daftar mount tiap N detik
+MOUNT_REFRESH_SECONDS = 60
+
+_NAN = float("nan")
+
+
+def _stats(values: List[float]) -> dict:
+    if not values:
+        return {"min": 0, "avg": 0, "max": 0, "p95": 0, "last": 0}
+    last = values[-1]
+    values = sorted(values)
+    n = len(values)
+    return {
+        "min": round(values[0], 2),
+        "avg": round(sum(values) / n, 2),
+        "max": round(values[-1], 2),
+        "p95": round(values[max(0, math.ceil(0.95 * n) - 1)], 2),
+        "last": round(last, 2),
+    }
+
+
+class _MountWatcher:
+    """Tanda perubahan tabel mount lewat poll(POLLPRI) di /proc/self/mounts."""
+
+    def __init__(self, clock):
+        self._clock = clock
+        self._poll = None
+        self._file = None
+        self._next_refresh = 0.0
+        try:
+            self._file = open("/proc/self/mounts", "rb")
+            self._poll = select.poll()
+            self._poll.register(self._file.fileno(), select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            self._poll = None
+
+    def changed(self) -> bool:
+        if self._poll is not None:
+            # event di-reset oleh poll itu sendiri, tidak perlu membaca file
+            return bool(self._poll.poll(0))
+        now = self._clock()
+        if now >= self._next_refresh:
+            self._next_refresh = now + MOUNT_REFRESH_SECONDS
+            return True
+        return False
+
+
+class MetricSampler:
+    def __init__(
+        self,
+        resolution: float = METRIC_RESOLUTION,
+        history: int = METRIC_HISTORY,
+        ifaces_exclude: str = METRIC_IFACES_EXCLUDE,
+        clock=time.monotonic,
+    ):
+        self.resolution = max(0.05, resolution)
+        self.capacity = max(2, history)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.cores = psutil.cpu_count() or 1
+        self._times = array("d", bytes(8 * self.capacity))
+        self._series: Dict[str, array] = {}
+        for name in (
+            ["cpu"]
+            + [f"cpu{i}" for i in range(self.cores)]
+            + ["mem_percent", "mem_used", "mem_free", "disk_percent", "disk_used",
+               "disk_read", "disk_write", "net_recv", "net_sent"]
+        ):
+            self._add_series(name)
+        self._head = 0  # slot tulis berikutnya
+        self._count = 0
+
+        # nilai yang (hampir) tidak berubah, tidak perlu ring buffer
+        self.info = {"cores": self.cores, "memTotal": 0, "diskTotal": 0, "interfaces": [], "mounts": {}}
+
+        self._exclude = [p.strip() for p in ifaces_exclude.split(",") if p.strip()]
+        self._nic_names = None  # set nama terakhir dari /proc/net/dev
+        self._mount_watcher = _MountWatcher(clock)
+        self._refresh_mounts()
+
+        # pembacaan awal: baseline cpu_percent, counter network dan disk IO
+        psutil.cpu_percent(percpu=True)
+        self._net_prev = psutil.net_io_counters(pernic=True)
+        self._io_prev = self._disk_io()
+        self._prev_time = clock()
+        self.errors = 0
+
+    # ===== series dinamis =====
+
+    def _add_series(self, name: str):
+        if name not in self._series:
+            self._series[name] = array("d", [_NAN]) * self.capacity
+
+    def _sync_series(self, prefix: str, keys: List[str], fields: tuple):
+        """Samakan series `prefix.<key>.<field>` dengan daftar key saat ini."""
+        wanted = {f"{prefix}.{k}.{f}" for k in keys for f in fields}
+        with self._lock:
+            for name in [n for n in self._series if n.startswith(prefix + ".") and n not in wanted]:
+                del self._series[name]
+            for name in wanted:
+                self._add_series(name)
+
+    def _refresh_interfaces(self, names):
+        self._nic_names = names
+        keep = sorted(n for n in names if not any(fnmatch(n, p) for p in self._exclude))
+        self._sync_series("if", keep, ("recv", "sent"))
+        self.info["interfaces"] = keep
+
+    def _refresh_mounts(self):
+        mounts = {}
+        try:
+            partitions = psutil.disk_partitions(all=False)
+        except OSError:
+            return
+        for part in partitions:
+            if part.fstype in SKIP_FSTYPES or part.mountpoint in mounts:
+                continue
+            mounts[part.mountpoint] = 0
+        self._sync_series("mount", list(mounts), ("percent", "used"))
+        self.info["mounts"] = mounts
+
+    @staticmethod
+    def _disk_io():
+        try:
+            return psutil.disk_io_counters()
+        except (OSError, RuntimeError):
+            return None
+
+    # ===== pembacaan =====
+
+    def _read(self) -> Dict[str, float]:
+        row: Dict[str, float] = {}
+
+        per_core = psutil.cpu_percent(percpu=True)
+        for i, value in enumerate(per_core[: self.cores]):
+            row[f"cpu{i}"] = value
+        row["cpu"] = sum(per_core) / len(per_core) if per_core else 0.0
+
+        mem = psutil.virtual_memory()
+        row["mem_percent"] = mem.percent
+        row["mem_used"] = mem.used
+        row["mem_free"] = mem.free
+        self.info["memTotal"] = mem.total
+
+        disk = psutil.disk_usage(DISK_PATH)
+        row["disk_percent"] = disk.percent
+        row["disk_used"] = disk.used
+        self.info["diskTotal"] = disk.total
+
+        if self._mount_watcher.changed():
+            self._refresh_mounts()
+        mounts = self.info["mounts"]
+        for path in mounts:
+            try:
+                usage = psutil.disk_usage(path)
+            except OSError:
+                continue  # mount hilang di antara dua refresh
+            row[f"mount.{path}.percent"] = usage.percent
+            row[f"mount.{path}.used"] = usage.used
+            mounts[path] = usage.total
+
+        now = self._clock()
+        dt = now - self._prev_time
+        nics = psutil.net_io_counters(pernic=True)
+        if self._nic_names is None or nics.keys() != self._nic_names:
+            self._refresh_interfaces(set(nics))
+        io = self._disk_io()
+        if dt > 0:
+            # counter bisa reset (interface hilang / wrap) -> anggap 0
+            recv = sent = 0
+            for name, cur in nics.items():
+                prev = self._net_prev.get(name)
+                if prev is None:
+                    continue
+                r = max(0, cur.bytes_recv - prev.bytes_recv)
+                s = max(0, cur.bytes_sent - prev.bytes_sent)
+                recv += r
+                sent += s
+                row[f"if.{name}.recv"] = r / dt
+                row[f"if.{name}.sent"] = s / dt
+            row["net_recv"] = recv / dt
+            row["net_sent"] = sent / dt
+            if io is not None and self._io_prev is not None:
+                row["disk_read"] = max(0, io.read_bytes - self._io_prev.read_bytes) / dt
+                row["disk_write"] = max(0, io.write_bytes - self._io_prev.write_bytes) / dt
+        self._net_prev = nics
+        self._io_prev = io
+        self._prev_time = now
+        return row
+
+    def sample_once(self):
+        row = self._read()
+        ts = self._clock()
+        with self._lock:
+            i = self._head
+            self._times[i] = ts
+            for name, values in self._series.items():
+                values[i] = row.get(name, _NAN)
+            self._head = (i + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def _run(self):
+        deadline = self._clock()
+        while not self._stop.is_set():
+            deadline += self.resolution
+            try:
+                self.sample_once()
+            except Exception:
+                # psutil bisa gagal sesaat (misal /proc tidak terbaca); sample dilewati
+                self.errors += 1
+            delay = deadline - self._clock()
+            if delay < 0:
+                # tertinggal (host sangat sibuk) -> jangan kejar sample yang terlewat
+                deadline = self._clock()
+                delay = 0
+            self._stop.wait(delay)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="suridash-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def window(self, seconds: float) -> dict:
+        """Ringkasan per series untuk sample dalam `seconds` terakhir."""
+        with self._lock:
+            count = self._count
+            if count == 0:
+                idx = []
+            else:
+                cutoff = self._clock() - seconds
+                start = (self._head - count) % self.capacity
+                idx = [
+                    (start + k) % self.capacity
+                    for k in range(count)
+                    if self._times[(start + k) % self.capacity] >= cutoff
+                ]
+                if not idx:
+                    # tidak ada sample baru (sampler tertinggal): pakai yang terakhir
+                    idx = [(self._head - 1) % self.capacity]
+            # NaN != NaN: slot sebelum series ada / pembacaan gagal dilewati
+            data = {name: [v for v in (values[i] for i in idx) if v == v] for name, values in self._series.items()}
+            info = dict(self.info)
+            info["interfaces"] = list(info["interfaces"])
+            info["mounts"] = dict(info["mounts"])
+
+        out = {name: _stats(values) for name, values in data.items()}
+        out["samples"] = len(idx)
+        out["info"] = info
+        return out
+
+
+_sampler: Optional[MetricSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> MetricSampler:
+    """Sampler global, thread-nya dijalankan saat pertama kali dipanggil."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricSampler()
+            _sampler.start()
+        return _sampler
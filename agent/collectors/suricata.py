@@ -1,28 +1,43 @@
+"""
+Status Suricata untuk agent_status.
+
+Fakta statis (path binary, versi) di-cache sampai binary berubah (mtime /
+inode), jadi `suricata -V` hanya dijalankan sekali per upgrade. Liveness dicek
+lewat pidfile + /proc/<pid>, tanpa fork `systemctl`; scan seluruh /proc hanya
+dipakai kalau tidak ada pidfile, dengan backoff selama Suricata tidak ketemu. rulesLoaded diambil dari
+event stats yang sudah dilihat tailer (observe_stats), bukan dengan membaca
+ulang ekor eve.json.
+"""
+
 import json
 import os
+import shutil
 import subprocess
+import threading
+import time
 
 SURICATA_EVE_PATHS = [
     "/var/log/suricata/eve.json",
     "/var/log/suricata/eve.log",
 ]
 
-def _cmd_exists(cmd: str) -> bool:
-    return subprocess.call(
-        ["which", cmd],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    ) == 0
-
-
-def is_installed() -> bool:
-    return _cmd_exists("suricata")
+SURICATA_PIDFILES = [
+    p for p in (
+        os.environ.get("SURIDASH_SURICATA_PIDFILE", ""),
+        "/run/suricata.pid",
+        "/var/run/suricata.pid",
+        "/run/suricata/suricata.pid",
+        "/var/run/suricata/suricata.pid",
+    ) if p
+]
 
+# /proc/<pid>/comm Suricata: "suricata" lalu "Suricata-Main" setelah init
+# (bukan prefix: suricata-update juga diawali "suricata")
+_COMMS = ("suricata", "Suricata-Main")
 
-def is_running() -> bool:
-    return subprocess.call(
-        ["systemctl", "is-active", "--quiet", "suricata"]
-    ) == 0
+# scan /proc gagal -> scan berikutnya ditunda, berlipat dua sampai batas atas
+PROC_SCAN_BACKOFF_MIN = 30
+PROC_SCAN_BACKOFF_MAX = 300
 
 
 def find_eve_log():
@@ -31,10 +46,11 @@ def find_eve_log():
             return path
     return None
 
-def _get_version():
+
+def _get_version(binary: str):
     try:
         result = subprocess.run(
-            ["suricata", "-V"],
+            [binary, "-V"],
             capture_output=True,
             text=True,
             timeout=3,
@@ -48,7 +64,19 @@ def _get_version():
     except Exception:
         return None
 
+
+def rules_loaded_from_stats(event: dict):
+    """rules_loaded dari satu event stats, atau None kalau tidak ada."""
+    engines = (event.get("stats") or {}).get("detect", {}).get("engines")
+    if isinstance(engines, list) and engines:
+        return engines[0].get("rules_loaded", 0)
+    if isinstance(engines, dict):
+        return engines.get("rules_loaded", 0)
+    return None
+
+
 def get_rules_loaded(eve_path):
+    """Cari event stats terakhir di ekor eve.json (hanya dipakai sekali saat start)."""
     if not eve_path:
         return 0
     try:
@@ -60,34 +88,141 @@ def get_rules_loaded(eve_path):
                 try:
                     data = json.loads(line)
                     if data.get("event_type") == "stats":
-                        engines = data.get("stats", {}).get("detect", {}).get("engines", [])
-                        if isinstance(engines, list) and len(engines) > 0:
-                            return engines[0].get("rules_loaded", 0)
-                        elif isinstance(engines, dict):
-                            return engines.get("rules_loaded", 0)
+                        rules = rules_loaded_from_stats(data)
+                        if rules is not None:
+                            return rules
                 except json.JSONDecodeError:
                     continue
     except Exception:
         pass
     return 0
 
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/comm") as f:
+            return f.read().strip() in _COMMS
+    except OSError:
+        return False
+
+
+def _read_pidfile():
+    for path in SURICATA_PIDFILES:
+        try:
+            with open(path) as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def _scan_proc():
+    """Fallback kalau tidak ada pidfile: cari proses suricata di /proc."""
+    try:
+        pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return None
+    for pid in pids:
+        if _pid_alive(pid):
+            return pid
+    return None
+
+
+class SuricataStatus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._binary = None
+        self._binary_key = None  # (path, st_ino, st_mtime_ns)
+        self.version = None
+        self._pid = None
+        self._scan_after = 0.0
+        self._scan_backoff = PROC_SCAN_BACKOFF_MIN
+        self.rules_loaded = None  # dari event stats terakhir
+        self.stats_seen = 0
+
+    def _refresh_binary(self):
+        path = self._binary
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is None:
+            # binary hilang / belum pernah dicari: cari ulang di PATH (tanpa fork)
+            path = shutil.which("suricata")
+            try:
+                st = os.stat(path) if path else None
+            except OSError:
+                st = None
+        key = (path, st.st_ino, st.st_mtime_ns) if st else None
+        if key != self._binary_key:
+            # baru di-install / di-upgrade / dihapus
+            self._binary_key = key
+            self._binary = path if st else None
+            self.version = _get_version(path) if st else None
+
+    def _is_running(self) -> bool:
+        if self._pid and _pid_alive(self._pid):
+            return True
+        self._pid = _read_pidfile()
+        if self._pid and _pid_alive(self._pid):
+            self._scan_backoff = PROC_SCAN_BACKOFF_MIN
+            return True
+
+        now = time.monotonic()
+        if now < self._scan_after:
+            # scan sebelumnya tidak menemukan Suricata; pidfile tetap dicek tiap tick
+            self._pid = None
+            return False
+        self._pid = _scan_proc()
+        if self._pid is not None:
+            self._scan_backoff = PROC_SCAN_BACKOFF_MIN
+            return True
+        self._scan_after = now + self._scan_backoff
+        self._scan_backoff = min(self._scan_backoff * 2, PROC_SCAN_BACKOFF_MAX)
+        return False
+
+    def observe_stats(self, event: dict):
+        rules = rules_loaded_from_stats(event)
+        if rules is not None:
+            self.rules_loaded = rules
+        self.stats_seen += 1
+
+    def collect(self) -> dict:
+        with self._lock:
+            self._refresh_binary()
+            installed = self._binary is not None
+            running = self._is_running() if installed else False
+            eve_path = find_eve_log()
+
+            if installed and self.rules_loaded is None and eve_path:
+                # belum ada event stats dari tailer (baru start): baca ekor file sekali
+                self.rules_loaded = get_rules_loaded(eve_path)
+
+            last_modified = None
+            if eve_path:
+                try:
+                    last_modified = int(os.path.getmtime(eve_path))
+                except OSError:
+                    pass
+
+            return {
+                "installed": installed,
+                "running": running,
+                "eveLogExists": eve_path is not None,
+                "eveLogPath": eve_path,
+                "version": self.version,
+                "rulesLoaded": (self.rules_loaded or 0) if installed else 0,
+                "lastModified": last_modified,
+            }
+
+
+_status = SuricataStatus()
+
+
+def observe_stats(event: dict):
+    """Dipanggil tailer / eve socket untuk setiap event stats Suricata."""
+    _status.observe_stats(event)
+
+
 def collect():
-    installed = is_installed()
-    running = is_running() if installed else False
-    eve_path = find_eve_log()
-    version = _get_version() if installed else None
-    rules_loaded = get_rules_loaded(eve_path) if installed else 0
-
-    last_modified = None
-    if eve_path:
-        last_modified = int(os.path.getmtime(eve_path))
-
-    return {
-        "installed": installed,
-        "running": running,
-        "eveLogExists": eve_path is not None,
-        "eveLogPath": eve_path,
-        "version": version,
-        "rulesLoaded": rules_loaded,
-        "lastModified": last_modified,
-    }
+    return _status.collect()
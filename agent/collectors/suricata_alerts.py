@@ -1,38 +1,183 @@
-import json
 import os
 import time
 
-def tail_eve_alerts(path: str):
+from agent.utils import codec, inotify
+
+# inotify: tunggu event dari kernel, bukan polling 50ms
+USE_INOTIFY = os.environ.get("SURIDASH_EVE_INOTIFY", "true").lower() == "true"
+POLL_INTERVAL = 0.05
+# safety net: walau pakai inotify, cek rotasi sekali per detik saat idle
+IDLE_CHECK_SECONDS = 1.0
+
+# baca eve.json per chunk biner, bukan per baris text
+CHUNK_SIZE = int(os.environ.get("SURIDASH_EVE_CHUNK_KB", "1024")) * 1024
+# Suricata menulis eve tanpa spasi setelah ':' -> cukup cek substring bytes
+ALERT_MARKER = b'"event_type":"alert"'
+# event stats (default tiap 8 detik), dipakai status collector
+STATS_MARKER = b'"event_type":"stats"'
+
+
+class ChunkLineReader:
+    """
+    Baca file per chunk besar lalu pecah per baris sendiri.
+    Baris terakhir yang belum ada newline-nya disimpan sampai lengkap.
+    """
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.pending = b""
+        self.pos = f.tell()
+
+    def read_chunk(self):
+        """
+        Return bytes berisi baris-baris lengkap (tanpa newline terakhir),
+        b"" kalau belum ada baris lengkap, atau None kalau sudah EOF.
+        """
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return None
+        self.pos += len(chunk)
+
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            self.pending += chunk
+            return b""
+
+        data = self.pending + chunk[:end] if self.pending else chunk[:end]
+        self.pending = chunk[end + 1:]
+        return data
+
+    def read_lines(self):
+        """Return list baris lengkap, atau None kalau sudah EOF."""
+        data = self.read_chunk()
+        if data is None:
+            return None
+        return data.split(b"\n") if data else []
+
+    def reset(self, pos: int = 0):
+        self.f.seek(pos)
+        self.pos = pos
+        self.pending = b""
+
+
+def stats_events(data: bytes):
+    """Decode event stats di dalam chunk (cari marker dulu, chunk lain tidak di-split)."""
+    start = data.find(STATS_MARKER)
+    while start >= 0:
+        begin = data.rfind(b"\n", 0, start) + 1
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = len(data)
+        try:
+            event = codec.loads(data[begin:end])
+        except ValueError:
+            event = None
+        if event is not None and event.get("event_type") == "stats":
+            yield event
+        start = data.find(STATS_MARKER, end)
+
+
+def parse_alert_lines(lines, on_stats=None):
+    """
+    Tolak baris non-alert dengan cek bytes murah sebelum decode JSON.
+    Kalau `on_stats` diberikan, event stats ikut di-decode dan diteruskan ke sana.
+    """
+    for line in lines:
+        if ALERT_MARKER not in line:
+            if on_stats is not None and STATS_MARKER in line:
+                for event in stats_events(line):
+                    on_stats(event)
+            continue
+        try:
+            data = codec.loads(line)
+        except ValueError:
+            continue
+        if data.get("event_type") == "alert":
+            yield data
+
+
+def _open_watcher(path: str):
+    if not USE_INOTIFY or not inotify.available():
+        return None
+    try:
+        return inotify.FileWatcher(path)
+    except OSError:
+        return None
+
+
+def _path_rotated(path: str, inode: int) -> bool:
+    try:
+        return os.stat(path).st_ino != inode
+    except FileNotFoundError:
+        # file lama sudah dipindah tapi yang baru belum dibuat
+        return False
+
+
+def tail_eve_chunks(path: str):
+    """
+    Follow eve.json dan yield chunk bytes yang sudah rapi per baris
+    (tidak pernah memotong baris di tengah).
+    """
     f = None
+    reader = None
     inode = None
+    watcher = None
+    from_start = False
 
     while True:
         try:
             if not f:
-                f = open(path, "r", buffering=1)
-                inode = os.stat(path).st_ino
+                f = open(path, "rb", buffering=0)
+                inode = os.fstat(f.fileno()).st_ino
 
-                # 🔥 mulai dari akhir file (abaikan isi lama)
-                f.seek(0, os.SEEK_END)
+                if from_start:
+                    # file baru hasil rotasi: baca dari awal
+                    from_start = False
+                else:
+                    # 🔥 mulai dari akhir file (abaikan isi lama)
+                    f.seek(0, os.SEEK_END)
+                reader = ChunkLineReader(f)
 
-            line = f.readline()
-            if line:
-                try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+                if watcher:
+                    watcher.close()
+                watcher = _open_watcher(path)
 
-                if data.get("event_type") == "alert":
+            data = reader.read_chunk()
+            if data is not None:
+                if data:
                     yield data
+                continue
+
+            # ===== idle: sudah di EOF =====
+            # cek rotasi/truncate hanya di sini, bukan per baris
+            if watcher:
+                events = watcher.wait(IDLE_CHECK_SECONDS)
+                check_rotation = "rotated" in events or not events
+                check_truncate = "modified" in events or not events
             else:
-                time.sleep(0.05)  # kecil biar responsif
+                time.sleep(POLL_INTERVAL)  # fallback polling
+                check_rotation = check_truncate = True
 
-            # log rotation: inode berubah
-            if os.stat(path).st_ino != inode:
+            if check_truncate and os.fstat(f.fileno()).st_size < reader.pos:
+                # copytruncate: file dipotong di tempat
+                reader.reset(0)
+
+            if check_rotation and _path_rotated(path, inode):
+                # log rotation: inode berubah
                 f.close()
                 f = None
+                from_start = True
 
         except FileNotFoundError:
             time.sleep(1)
         except Exception:
             time.sleep(0.2)
+
+
+def tail_eve_alerts(path: str, on_stats=None):
+    for data in tail_eve_chunks(path):
+        if on_stats is not None and STATS_MARKER in data:
+            for event in stats_events(data):
+                on_stats(event)
+        yield from parse_alert_lines(data.split(b"\n"))
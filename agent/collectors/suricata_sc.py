@@ -0,0 +1,187 @@
+"""
+Client asyncio untuk unix command socket Suricata (protokol `suricatasc`).
+
+  unix-command:
+    enabled: yes
+    filename: /var/run/suricata/suricata-command.socket
+
+Protokol: setelah connect client mengirim {"version": "0.2"}, lalu setiap
+perintah {"command": "...", "arguments": {...}} dibalas
+{"return": "OK"|"NOK", "message": ...} yang diakhiri newline.
+
+Perintah TIDAK boleh di-pipeline: unix-manager Suricata membaca satu buffer
+(maks 4096 byte) dan mem-parse-nya sebagai satu JSON; dua perintah dalam satu
+buffer gagal di-parse dan koneksi ditutup. Jadi perintah dikirim satu per
+satu, masing-masing menunggu balasannya. Yang dihemat adalah connect +
+handshake: satu koneksi dipakai ulang antar status tick; kalau putus /
+timeout, koneksi dibuang dan dibuka lagi pada perintah berikutnya.
+"""
+
+import asyncio
+import os
+import stat
+from typing import Dict, List, Optional, Tuple
+
+from agent.utils import codec
+
+SURICATA_SOCKET = os.environ.get("SURIDASH_SURICATA_SOCKET", "/var/run/suricata/suricata-command.socket")
+COMMAND_TIMEOUT = float(os.environ.get("SURIDASH_SURICATA_SOCKET_TIMEOUT", "3"))
+
+PROTOCOL_VERSION = "0.2"
+# dump-counters dengan stats per thread bisa ratusan KB
+MAX_RESPONSE = 16 * 1024 * 1024
+
+# perintah untuk status (satu koneksi, dikirim berurutan)
+STATUS_COMMANDS = (
+    "uptime",
+    "version",
+    "running-mode",
+    "capture-mode",
+    "ruleset-stats",
+    "ruleset-reload-time",
+    "iface-list",
+    "dump-counters",
+)
+
+
+class SuricataCommandError(Exception):
+    """Suricata membalas NOK."""
+
+
+def socket_available(path: str = SURICATA_SOCKET) -> bool:
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+class SuricataSocket:
+    def __init__(self, path: str = SURICATA_SOCKET, timeout: float = COMMAND_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        # satu perintah in-flight per koneksi
+        self._lock = asyncio.Lock()
+
+        self.connects = 0
+        self.commands_sent = 0
+        self.errors = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _connect(self):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(self.path, limit=MAX_RESPONSE), self.timeout
+        )
+        try:
+            writer.write(codec.dumps({"version": PROTOCOL_VERSION}) + b"\n")
+            await writer.drain()
+            reply = codec.loads(await asyncio.wait_for(reader.readuntil(b"\n"), self.timeout))
+            if reply.get("return") != "OK":
+                raise SuricataCommandError(f"handshake rejected: {reply.get('message')}")
+        except BaseException:
+            writer.close()
+            raise
+        self._reader, self._writer = reader, writer
+        self.connects += 1
+
+    def _drop(self):
+        writer, self._writer, self._reader = self._writer, None, None
+        if writer is not None:
+            writer.close()
+
+    async def _request(self, command: str, arguments: Optional[dict]) -> dict:
+        msg = {"command": command}
+        if arguments:
+            msg["arguments"] = arguments
+        async with self._lock:
+            if not self.connected:
+                await self._connect()
+            try:
+                self._writer.write(codec.dumps(msg) + b"\n")
+                self.commands_sent += 1
+                await self._writer.drain()
+                line = await asyncio.wait_for(self._reader.readuntil(b"\n"), self.timeout)
+                return codec.loads(line)
+            except (OSError, EOFError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    asyncio.TimeoutError, ValueError):
+                # balasan terpotong / terlambat: sisa stream tidak bisa dipercaya lagi
+                self.errors += 1
+                self._drop()
+                raise
+            except asyncio.CancelledError:
+                # balasan perintah ini masih akan datang di stream
+                self._drop()
+                raise
+
+    async def command(self, command: str, arguments: dict = None):
+        reply = await self._request(command, arguments)
+        if reply.get("return") != "OK":
+            raise SuricataCommandError(str(reply.get("message")))
+        return reply.get("message")
+
+    async def commands(self, requests: List[Tuple[str, Optional[dict]]]) -> list:
+        """
+        Jalankan beberapa perintah berurutan di koneksi yang sama.
+        Return list message per perintah (SuricataCommandError untuk yang NOK).
+        """
+        out = []
+        for command, arguments in requests:
+            try:
+                out.append(await self.command(command, arguments))
+            except SuricataCommandError as e:
+                out.append(e)
+        return out
+
+    async def close(self):
+        async with self._lock:
+            self._drop()
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "commands": self.commands_sent,
+            "errors": self.errors,
+        }
+
+
+def _ok(value):
+    return None if isinstance(value, Exception) else value
+
+
+async def query_status(client: SuricataSocket) -> Tuple[Dict, Optional[dict]]:
+    """
+    Status Suricata lewat command socket (perintah status + iface-stat per
+    interface). Return (field status, dump-counters).
+    """
+    replies = dict(zip(STATUS_COMMANDS, await client.commands([(c, None) for c in STATUS_COMMANDS])))
+
+    # socket menjawab = Suricata terpasang dan berjalan (binary bisa di luar PATH agent)
+    status = {"installed": True, "running": True, "source": "socket"}
+    version = _ok(replies["version"])
+    if version:
+        status["version"] = version
+    status["uptime"] = _ok(replies["uptime"])
+    status["runningMode"] = _ok(replies["running-mode"])
+    status["captureMode"] = _ok(replies["capture-mode"])
+
+    rulesets = _ok(replies["ruleset-stats"])
+    if isinstance(rulesets, list) and rulesets and isinstance(rulesets[0], dict):
+        status["rulesLoaded"] = rulesets[0].get("rules_loaded", 0)
+        status["rulesFailed"] = rulesets[0].get("rules_failed", 0)
+    reload_time = _ok(replies["ruleset-reload-time"])
+    if isinstance(reload_time, list) and reload_time and isinstance(reload_time[0], dict):
+        status["lastReload"] = reload_time[0].get("last_reload")
+
+    iface_list = _ok(replies["iface-list"])
+    ifaces = iface_list.get("ifaces") if isinstance(iface_list, dict) else None
+    if isinstance(ifaces, list) and ifaces and all(isinstance(name, str) for name in ifaces):
+        stats = await client.commands([("iface-stat", {"iface": name}) for name in ifaces])
+        status["interfaces"] = {name: _ok(s) for name, s in zip(ifaces, stats)}
+
+    counters = _ok(replies["dump-counters"])
+    return status, counters if isinstance(counters, dict) else None
@@ -0,0 +1,191 @@
+"""
+Counter store untuk event `stats` Suricata.
+
+Event stats (default tiap 8 detik) berisi counter kumulatif sejak Suricata
+start: capture.kernel_packets / kernel_drops, flow.memcap, tcp.*, dan per
+thread kalau `threads: yes` ("threads.W#01-eth0.capture.kernel_drops").
+Store ini meratakan event jadi key bertitik, menyaring lewat whitelist (pola
+glob), lalu menghitung delta antar event dan mengakumulasikannya sampai
+dikirim sebagai pesan `suricata_stats`.
+
+Counter yang turun (Suricata restart, uptime mengecil) dianggap reset: delta
+= nilai baru. Key yang cocok dengan pola gauge (memuse, flow.active, ...)
+dikirim apa adanya, bukan delta.
+"""
+
+import os
+import re
+import threading
+import time
+from fnmatch import translate
+from typing import Dict, Optional
+
+SURICATA_STATS = os.environ.get("SURIDASH_SURICATA_STATS", "true").lower() == "true"
+STATS_INTERVAL = int(os.environ.get("SURIDASH_SURICATA_STATS_INTERVAL", "30"))
+STATS_COUNTERS = os.environ.get(
+    "SURIDASH_SURICATA_STATS_COUNTERS",
+    "capture.kernel_packets,capture.kernel_drops,capture.kernel_ifdrops,"
+    "decoder.pkts,decoder.bytes,decoder.invalid,detect.alert,"
+    "flow.memcap,flow.active,flow.emerg_mode_entered,"
+    "tcp.memuse,tcp.reassembly_memuse,tcp.ssn_memcap_drop,tcp.segment_memcap_drop,"
+    "threads.*.capture.kernel_drops",
+)
+STATS_GAUGES = os.environ.get(
+    "SURIDASH_SURICATA_STATS_GAUGES",
+    "*memuse,flow.active,flow.spare,flow_mgr.rows_*,uptime",
+)
+
+
+def _compile(patterns: str):
+    items = [p.strip() for p in patterns.split(",") if p.strip()]
+    if not items:
+        return None
+    return re.compile("|".join(translate(p) for p in items))
+
+
+def flatten(stats: dict, prefix: str = "", out: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """{"capture": {"kernel_drops": 1}} -> {"capture.kernel_drops": 1}; list (detect.engines) dilewati."""
+    if out is None:
+        out = {}
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flatten(value, name + ".", out)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+class StatsStore:
+    def __init__(self, counters: str = STATS_COUNTERS, gauges: str = STATS_GAUGES, clock=time.monotonic):
+        self._include = _compile(counters)
+        self._gauge = _compile(gauges)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # nama key -> "counter" / "gauge" / None (tidak masuk whitelist)
+        self._kinds: Dict[str, Optional[str]] = {}
+        self._prev: Dict[str, float] = {}
+        self._prev_uptime = None
+        self._prev_time = None
+
+        self._deltas: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._elapsed = 0.0
+        self._uptime = None
+
+        self.events = 0
+        self.resets = 0
+
+    def _kind(self, name: str) -> Optional[str]:
+        kind = self._kinds.get(name, False)
+        if kind is False:
+            if self._include is None or not self._include.fullmatch(name):
+                kind = None
+            elif self._gauge is not None and self._gauge.fullmatch(name):
+                kind = "gauge"
+            else:
+                kind = "counter"
+            self._kinds[name] = kind
+        return kind
+
+    def observe(self, event: dict):
+        stats = event.get("stats")
+        if not isinstance(stats, dict):
+            return
+        values = flatten(stats)
+        now = self._clock()
+        uptime = stats.get("uptime")
+
+        with self._lock:
+            self.events += 1
+            restarted = (
+                isinstance(uptime, (int, float))
+                and self._prev_uptime is not None
+                and uptime < self._prev_uptime
+            )
+            if restarted:
+                self.resets += 1
+                self._prev = {}
+
+            if self._prev_time is not None:
+                if isinstance(uptime, (int, float)) and self._prev_uptime is not None:
+                    # setelah restart: counter baru berjalan sejak uptime 0
+                    self._elapsed += uptime if restarted else uptime - self._prev_uptime
+                else:
+                    self._elapsed += now - self._prev_time
+
+            baseline = not self._prev and not restarted
+            prev = self._prev
+            current = {}
+            for name, value in values.items():
+                kind = self._kind(name)
+                if kind is None:
+                    continue
+                if kind == "gauge":
+                    self._gauges[name] = value
+                    continue
+                current[name] = value
+                if baseline:
+                    continue
+                old = prev.get(name)
+                # counter baru muncul / reset -> seluruh nilai dihitung sebagai delta
+                delta = value if old is None or value < old else value - old
+                if delta:
+                    self._deltas[name] = self._deltas.get(name, 0) + delta
+
+            self._prev = current
+            self._prev_time = now
+            if isinstance(uptime, (int, float)):
+                self._prev_uptime = uptime
+                self._uptime = uptime
+
+    def drain(self) -> Optional[dict]:
+        """Ringkasan sejak drain sebelumnya, atau None kalau belum ada interval."""
+        with self._lock:
+            if not self._elapsed:
+                return None
+            elapsed = self._elapsed
+            deltas, self._deltas = self._deltas, {}
+            gauges = dict(self._gauges)
+            self._elapsed = 0.0
+            uptime = self._uptime
+
+        payload = {
+            "interval": round(elapsed, 2),
+            "uptime": uptime,
+            "counters": deltas,
+            "rates": {k: round(v / elapsed, 2) for k, v in deltas.items()},
+            "gauges": gauges,
+        }
+        packets = deltas.get("capture.kernel_packets", 0)
+        drops = deltas.get("capture.kernel_drops", 0)
+        if packets:
+            # rumus sama dengan stats.log Suricata: kernel_drops / kernel_packets
+            payload["dropRatio"] = round(drops / packets, 6)
+        return payload
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "events": self.events,
+                "resets": self.resets,
+                "tracked": sum(1 for k in self._kinds.values() if k),
+            }
+
+
+_store = StatsStore() if SURICATA_STATS else None
+
+
+def observe_counters(event: dict):
+    """Dipanggil ingestion untuk setiap event stats."""
+    if _store is not None:
+        _store.observe(event)
+
+
+def drain_counters() -> Optional[dict]:
+    return _store.drain() if _store is not None else None
+
+
+def get_stats():
+    return _store.stats() if _store is not None else None
@@ -5,6 +5,7 @@ from agent.config.loader import load_config
 from agent.utils.logger import setup_logger
 from agent.core.heartbeat import start_heartbeat
 from agent.core.websocket import run_ws
+from agent.core import auto_blocker, blocker
 
 class Agent:
     def __init__(self):
@@ -17,6 +18,10 @@ class Agent:
     def run(self):
         self.logger.info("Starting SuriDash Agent")
 
+        # Load blacklist ke memori sebelum alert pertama masuk
+        blocker.init()
+        auto_blocker.init()
+
         # Heartbeat thread
         t = threading.Thread(
             target=start_heartbeat,
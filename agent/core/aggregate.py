@@ -0,0 +1,134 @@
+"""
+Agregasi prefix: kalau K alamat dari prefix yang sama (/24 IPv4, /64 IPv6)
+diblokir dalam satu window, blokir prefix-nya sekali di set hash:net dan
+hapus entry tunggal yang sudah tertutup.
+
+PrefixAggregator hanya menyimpan state; eksekusi ke firewall ada di
+blocker.py. Anggota prefix yang sudah diagregasi tetap dicatat (beserta
+expiry-nya) supaya unblock satu alamat bisa memecah prefix kembali.
+"""
+
+import ipaddress
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+AGGREGATE = os.environ.get("SURIDASH_BLOCK_AGGREGATE", "false").lower() == "true"
+AGGREGATE_THRESHOLD = int(os.environ.get("SURIDASH_BLOCK_AGGREGATE_THRESHOLD", "8"))
+AGGREGATE_WINDOW = int(os.environ.get("SURIDASH_BLOCK_AGGREGATE_WINDOW", "600"))
+AGGREGATE_V4_PREFIX = int(os.environ.get("SURIDASH_BLOCK_AGGREGATE_V4_PREFIX", "24"))
+AGGREGATE_V6_PREFIX = int(os.environ.get("SURIDASH_BLOCK_AGGREGATE_V6_PREFIX", "64"))
+
+# batas jumlah prefix kandidat yang dilacak
+MAX_CANDIDATES = 50_000
+
+
+def _max_expiry(values) -> float:
+    values = list(values)
+    if not values or any(not v for v in values):
+        return 0
+    return max(values)
+
+
+class PrefixAggregator:
+    def __init__(
+        self,
+        threshold: int = AGGREGATE_THRESHOLD,
+        window: int = AGGREGATE_WINDOW,
+        v4_prefix: int = AGGREGATE_V4_PREFIX,
+        v6_prefix: int = AGGREGATE_V6_PREFIX,
+        clock=time.time,
+    ):
+        self.threshold = max(2, threshold)
+        self.window = window
+        self.v4_prefix = v4_prefix
+        self.v6_prefix = v6_prefix
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # prefix kandidat -> {ip: (blocked_at, expire_ts)}
+        self._candidates: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        # prefix yang sudah diagregasi -> {ip: expire_ts}
+        self._members: Dict[str, Dict[str, float]] = {}
+        # prefix yang sudah diagregasi -> expire_ts prefix (0 = permanen)
+        self._expires: Dict[str, float] = {}
+
+        self.aggregated = 0
+
+    def prefix_of(self, ip: str) -> str:
+        addr = ipaddress.ip_address(ip)
+        plen = self.v4_prefix if addr.version == 4 else self.v6_prefix
+        return str(ipaddress.ip_network(f"{addr}/{plen}", strict=False))
+
+    def _prune(self, now: float):
+        cutoff = now - self.window
+        for prefix in list(self._candidates):
+            bucket = self._candidates[prefix]
+            for ip in [ip for ip, (t, exp) in bucket.items() if t < cutoff or (exp and exp <= now)]:
+                del bucket[ip]
+            if not bucket:
+                del self._candidates[prefix]
+
+    def record(self, ip: str, expires: float) -> Optional[Tuple[str, Dict[str, float]]]:
+        """
+        Catat alamat yang baru diblokir. Return (prefix, {ip: expire_ts}) kalau
+        prefix-nya baru saja melewati ambang dan harus diblokir utuh.
+        """
+        prefix = self.prefix_of(ip)
+        now = self._clock()
+        with self._lock:
+            members = self._members.get(prefix)
+            if members is not None:
+                exp = self._expires.get(prefix, 0)
+                if not exp or exp > now:
+                    members[ip] = max(members.get(ip, 0), expires)
+                    return None
+                # prefix sudah expired di kernel -> mulai lagi dari kandidat
+                del self._members[prefix]
+                self._expires.pop(prefix, None)
+
+            if len(self._candidates) >= MAX_CANDIDATES:
+                self._prune(now)
+
+            bucket = self._candidates.setdefault(prefix, {})
+            bucket[ip] = (now, expires)
+            cutoff = now - self.window
+            live = {a: exp for a, (t, exp) in bucket.items() if t >= cutoff and (not exp or exp > now)}
+            if len(live) < self.threshold:
+                return None
+
+            del self._candidates[prefix]
+            self._members[prefix] = live
+            self._expires[prefix] = _max_expiry(live.values())
+            self.aggregated += 1
+            return prefix, dict(live)
+
+    def merge(self, prefix: str, members: Dict[str, float]):
+        """Tambahkan anggota lain (misal entry lama di mirror) ke prefix teragregasi."""
+        with self._lock:
+            current = self._members.setdefault(prefix, {})
+            for ip, exp in members.items():
+                current[ip] = exp if not exp else max(current.get(ip, exp), exp)
+            self._expires[prefix] = _max_expiry(current.values())
+
+    def expires(self, prefix: str) -> float:
+        """Expiry prefix = expiry anggota paling lama (0 = permanen)."""
+        return self._expires.get(prefix, 0)
+
+    def release(self, prefix: str) -> Dict[str, float]:
+        """Lepas prefix teragregasi (unblock / gagal / expired). Return anggotanya."""
+        with self._lock:
+            self._expires.pop(prefix, None)
+            return self._members.pop(prefix, None) or {}
+
+    def is_aggregated(self, prefix: str) -> bool:
+        return prefix in self._members
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "aggregated": self.aggregated,
+                "prefixes": len(self._members),
+                "candidates": len(self._candidates),
+            }
@@ -0,0 +1,157 @@
+"""
+AlertBatcher: gabungkan banyak alert jadi satu pesan `suricata_alert_batch`.
+
+Batch ditutup kalau salah satu batas tercapai: jumlah alert, ukuran bytes,
+atau umur alert tertua (max delay). Di mode JSON tiap alert di-encode sekali
+saja dan pesan batch dirakit dari bytes yang sudah jadi; di mode biner
+(msgpack/cbor) batch di-encode utuh lewat session.send().
+
+add() tidak pernah menunggu pengiriman: batch yang sudah ditutup dikirim oleh
+task run(). Alert yang gagal terkirim, atau masih tertahan saat koneksi
+ditutup, diserahkan kembali lewat `on_unsent` (alert eve asli, bukan payload)
+supaya bisa masuk spool dan dikirim ulang setelah reconnect.
+
+Hanya dipakai kalau server menerima capability `suricata_alert_batch`.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+
+from agent.utils import codec
+
+ALERT_BATCH = os.environ.get("SURIDASH_ALERT_BATCH", "true").lower() == "true"
+ALERT_BATCH_MAX_COUNT = int(os.environ.get("SURIDASH_ALERT_BATCH_MAX_COUNT", "100"))
+ALERT_BATCH_MAX_BYTES = int(os.environ.get("SURIDASH_ALERT_BATCH_MAX_BYTES", str(64 * 1024)))
+ALERT_BATCH_MAX_DELAY_MS = int(os.environ.get("SURIDASH_ALERT_BATCH_MAX_DELAY_MS", "200"))
+# severity <= nilai ini dikirim langsung tanpa menunggu window (0 = nonaktif)
+ALERT_BATCH_URGENT_SEVERITY = int(os.environ.get("SURIDASH_ALERT_BATCH_URGENT_SEVERITY", "1"))
+
+_HEAD = b'{"type":"suricata_alert_batch","count":'
+
+
+class AlertBatcher:
+    def __init__(
+        self,
+        session,
+        logger,
+        on_unsent=None,
+        max_count: int = ALERT_BATCH_MAX_COUNT,
+        max_bytes: int = ALERT_BATCH_MAX_BYTES,
+        max_delay: float = ALERT_BATCH_MAX_DELAY_MS / 1000,
+    ):
+        self.session = session
+        self.logger = logger
+        self.on_unsent = on_unsent
+        self.max_count = max(1, max_count)
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+
+        # batch yang sedang diisi: payload + alert asalnya
+        self._items = []
+        self._sources = []
+        self._size = 0
+        self._deadline = None
+        # batch yang sudah ditutup, menunggu dikirim run()
+        self._ready = deque()
+        self._sending = None
+        self._wakeup = asyncio.Event()
+
+    @staticmethod
+    def is_urgent(alert_payload: dict) -> bool:
+        sev = alert_payload.get("severity")
+        try:
+            return ALERT_BATCH_URGENT_SEVERITY > 0 and int(sev) <= ALERT_BATCH_URGENT_SEVERITY
+        except (TypeError, ValueError):
+            return False
+
+    def add(self, alert_payload: dict, source: dict = None):
+        # ukuran JSON dipakai sebagai perkiraan ukuran di mode biner juga
+        data = codec.dumps(alert_payload)
+        if self._items and self._size + len(data) > self.max_bytes:
+            self._seal()
+
+        self._items.append(alert_payload if self.session.binary else data)
+        self._sources.append(source)
+        self._size += len(data) + 1
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.max_delay
+
+        if len(self._items) >= self.max_count or self._size >= self.max_bytes:
+            self._seal()
+        self._wakeup.set()
+
+    def _seal(self):
+        if not self._items:
+            return
+        self._ready.append((self._items, self._sources))
+        self._items = []
+        self._sources = []
+        self._size = 0
+        self._deadline = None
+
+    async def _send(self, items: list):
+        if self.session.binary:
+            await self.session.send({
+                "type": "suricata_alert_batch",
+                "count": len(items),
+                "timestamp": int(time.time()),
+                "payload": items,
+            })
+            self.logger.info(f"Sent Suricata alert batch: {len(items)} alerts ({self.session.encoding})")
+            return
+
+        data = b"".join((
+            _HEAD, str(len(items)).encode(),
+            b',"timestamp":', str(int(time.time())).encode(),
+            b',"payload":[', b",".join(items), b"]}",
+        ))
+        await self.session.send_raw(data, "suricata_alert_batch")
+        self.logger.info(f"Sent Suricata alert batch: {len(items)} alerts, {len(data)} bytes")
+
+    def _hand_back(self, sources: list):
+        sources = [a for a in sources if a is not None]
+        if sources and self.on_unsent is not None:
+            self.on_unsent(sources)
+
+    async def run(self):
+        """Task pengirim: kirim batch yang sudah ditutup, tutup batch yang melewati max delay."""
+        try:
+            while True:
+                if self._ready:
+                    items, sources = self._ready.popleft()
+                    self._sending = sources
+                    try:
+                        await self._send(items)
+                    except Exception as e:
+                        self.logger.error(f"Failed to send Suricata alert batch: {e}")
+                        if self.session.closed:
+                            # gagal karena koneksi -> kirim ulang setelah reconnect
+                            self._hand_back(sources)
+                    self._sending = None
+                    continue
+
+                if self._deadline is None:
+                    await self._wakeup.wait()
+                else:
+                    timeout = self._deadline - time.monotonic()
+                    if timeout > 0:
+                        try:
+                            await asyncio.wait_for(self._wakeup.wait(), timeout)
+                        except asyncio.TimeoutError:
+                            pass
+                self._wakeup.clear()
+                if self._deadline is not None and time.monotonic() >= self._deadline:
+                    self._seal()
+        finally:
+            # koneksi ditutup: semua yang belum pasti terkirim dikembalikan
+            # (batch yang terpotong di tengah send ikut, bisa terkirim dua kali)
+            leftover = list(self._sending or ())
+            for _, sources in self._ready:
+                leftover.extend(sources)
+            leftover.extend(self._sources)
+            self._ready.clear()
+            self._items, self._sources, self._size, self._deadline = [], [], 0, None
+            self._sending = None
+            self._hand_back(leftover)
@@ -0,0 +1,156 @@
+"""
+LaneQueue: antrian alert multi-lane dengan prioritas.
+
+Lane (prioritas tinggi -> rendah):
+  critical  alert yang memenuhi kriteria auto-block (severity/keyword)
+  high      severity 1-2 yang tidak masuk kriteria auto-block
+  low       sisanya
+
+Tiap lane punya kapasitas sendiri, dan total isi dibatasi `maxsize`.
+Kebijakan saat penuh:
+  - lane sendiri penuh      -> buang alert tertua di lane itu
+  - total penuh             -> buang alert tertua dari lane prioritas terendah
+                               yang berisi (tidak pernah dari lane lebih tinggi)
+  - tidak ada yang bisa dibuang -> alert baru yang ditolak
+
+Alert yang terbuang dikembalikan ke pemanggil (untuk spool), dan tercatat
+di counter `dropped` per lane. Pengambilan memakai weighted round-robin
+(smooth, ala nginx) antar lane yang berisi, jadi lane rendah tetap jalan
+walau lane tinggi ramai.
+"""
+
+import asyncio
+import os
+from collections import deque
+from typing import Dict, Optional
+
+from agent.core.auto_blocker import matches_auto_block
+
+LANES = ("critical", "high", "low")
+
+ALERT_QUEUE_SIZE = int(os.environ.get("SURIDASH_ALERT_QUEUE_SIZE", "1000"))
+
+
+def _parse_lane_map(raw: str, default: Dict[str, int]) -> Dict[str, int]:
+    out = dict(default)
+    for part in raw.split(","):
+        name, _, value = part.partition(":")
+        name = name.strip().lower()
+        if name in out and value.strip():
+            out[name] = int(value)
+    return out
+
+
+ALERT_LANE_CAPACITY = _parse_lane_map(
+    os.environ.get("SURIDASH_ALERT_LANE_CAPACITY", ""),
+    {"critical": 1000, "high": 800, "low": 600},
+)
+ALERT_LANE_WEIGHTS = _parse_lane_map(
+    os.environ.get("SURIDASH_ALERT_LANE_WEIGHTS", ""),
+    {"critical": 8, "high": 3, "low": 1},
+)
+
+
+def lane_of(alert: dict) -> str:
+    if matches_auto_block(alert):
+        return "critical"
+    try:
+        if int((alert.get("alert") or {}).get("severity")) <= 2:
+            return "high"
+    except (TypeError, ValueError):
+        pass
+    return "low"
+
+
+class LaneQueue:
+    def __init__(
+        self,
+        maxsize: int = ALERT_QUEUE_SIZE,
+        capacity: Dict[str, int] = ALERT_LANE_CAPACITY,
+        weights: Dict[str, int] = ALERT_LANE_WEIGHTS,
+    ):
+        self.maxsize = max(1, maxsize)
+        self._cap = {l: max(1, capacity[l]) for l in LANES}
+        self._weights = {l: max(1, weights[l]) for l in LANES}
+        self._q = {l: deque() for l in LANES}
+        self._current = {l: 0 for l in LANES}
+        self._size = 0
+        self._not_empty = asyncio.Event()
+
+        self.enqueued = {l: 0 for l in LANES}
+        self.dequeued = {l: 0 for l in LANES}
+        self.dropped = {l: 0 for l in LANES}
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def put_nowait(self, alert: dict) -> Optional[dict]:
+        """Masukkan alert. Return alert yang terbuang (bisa alert ini sendiri) atau None."""
+        lane = lane_of(alert)
+        q = self._q[lane]
+
+        evicted = None
+        if len(q) >= self._cap[lane]:
+            evicted = q.popleft()
+            self.dropped[lane] += 1
+        elif self._size >= self.maxsize:
+            # cari korban dari lane terendah, maksimal setara lane alert baru
+            for victim in reversed(LANES[LANES.index(lane):]):
+                if self._q[victim]:
+                    evicted = self._q[victim].popleft()
+                    self.dropped[victim] += 1
+                    break
+            else:
+                self.dropped[lane] += 1
+                return alert
+        else:
+            self._size += 1
+
+        q.append(alert)
+        self.enqueued[lane] += 1
+        self._not_empty.set()
+        return evicted
+
+    def _pop(self) -> dict:
+        # smooth weighted round-robin antar lane yang berisi
+        best = None
+        total = 0
+        for lane in LANES:
+            if not self._q[lane]:
+                continue
+            w = self._weights[lane]
+            self._current[lane] += w
+            total += w
+            if best is None or self._current[lane] > self._current[best]:
+                best = lane
+        self._current[best] -= total
+
+        self._size -= 1
+        self.dequeued[best] += 1
+        return self._q[best].popleft()
+
+    async def get(self) -> dict:
+        while not self._size:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self._pop()
+
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "maxsize": self.maxsize,
+            "lanes": {
+                lane: {
+                    "size": len(self._q[lane]),
+                    "capacity": self._cap[lane],
+                    "weight": self._weights[lane],
+                    "enqueued": self.enqueued[lane],
+                    "dequeued": self.dequeued[lane],
+                    "dropped": self.dropped[lane],
+                }
+                for lane in LANES
+            },
+        }
@@ -8,10 +8,20 @@ Suricata severity:
   4 = rendah
 
 Default threshold = 2 → blokir severity 1 dan 2.
+
+Selain severity, alert juga diblokir kalau cocok dengan salah satu:
+  - keyword (substring di signature / category)
+  - signature id
+  - category (persis)
+
+Kriteria di-compile sekali jadi AutoBlockPolicy (regex gabungan + frozenset)
+oleh init(), setelah agent.env di-load.
 """
 
 import os
+import re
 import logging
+from functools import lru_cache
 
 from agent.core.blocker import block_ip, is_ip_blocked
 
@@ -24,43 +34,98 @@ AUTO_BLOCK_SEVERITY = int(os.environ.get("SURIDASH_AUTO_BLOCK_SEVERITY", "2"))
 AUTO_BLOCK_TIMEOUT = int(os.environ.get("SURIDASH_AUTO_BLOCK_TIMEOUT", "3600"))
 
 
-def should_auto_block(alert: dict) -> bool:
+POLICY_CACHE_SIZE = 4096
+
+
+def _split(raw: str):
+    return [k.strip() for k in raw.lower().split(",") if k.strip()]
+
+
+class AutoBlockPolicy:
+    """Snapshot kriteria auto-block yang sudah di-compile."""
+
+    def __init__(self, keywords: str = "", signature_ids: str = "", categories: str = ""):
+        words = sorted(set(_split(keywords)), key=len, reverse=True)
+        self._keyword_re = re.compile("|".join(map(re.escape, words))) if words else None
+        self.signature_ids = frozenset(int(x) for x in _split(signature_ids) if x.isdigit())
+        self.categories = frozenset(_split(categories))
+
+        # keputusan per (signature, category): jumlah signature unik kecil, hit rate tinggi
+        self.match_text = lru_cache(maxsize=POLICY_CACHE_SIZE)(self._match_text)
+
+    def _match_text(self, signature: str, category: str) -> bool:
+        category = category.lower()
+        if category in self.categories:
+            return True
+        if self._keyword_re is None:
+            return False
+        return bool(self._keyword_re.search(signature.lower()) or self._keyword_re.search(category))
+
+    def matches(self, alert: dict) -> bool:
+        a = alert.get("alert") or {}
+
+        # Cek berdasarkan severity (jika severity tersetting)
+        severity = a.get("severity")
+        if severity is not None:
+            try:
+                if int(severity) <= AUTO_BLOCK_SEVERITY:
+                    return True
+            except (ValueError, TypeError):
+                pass
+
+        if self.signature_ids and a.get("signature_id") in self.signature_ids:
+            return True
+
+        return self.match_text(a.get("signature") or "", a.get("category") or "")
+
+
+def _env_snapshot():
+    return (
+        os.environ.get("SURIDASH_AUTO_BLOCK_KEYWORDS", ""),
+        os.environ.get("SURIDASH_AUTO_BLOCK_SIGNATURE_IDS", ""),
+        os.environ.get("SURIDASH_AUTO_BLOCK_CATEGORIES", ""),
+    )
+
+
+_policy = AutoBlockPolicy(*_env_snapshot())
+
+
+def init():
     """
-    Cek apakah alert ini memenuhi syarat untuk auto-block.
-    Return True jika severity <= threshold dan IP belum diblokir.
+    Compile policy dari environment. Dipanggil Agent setelah load_config:
+    modul ini sudah di-import sebelum agent.env masuk ke os.environ.
+    """
+    global _policy
+    _policy = AutoBlockPolicy(*_env_snapshot())
+    logger.info(
+        f"[auto-block] policy: {len(_policy.signature_ids)} signature ids, "
+        f"{len(_policy.categories)} categories, keywords={'yes' if _policy._keyword_re else 'no'}"
+    )
+
+
+def get_policy() -> AutoBlockPolicy:
+    return _policy
+
+
+def matches_auto_block(alert: dict) -> bool:
+    """
+    Cek kriteria auto-block (severity / keyword / signature id / category)
+    saja, tanpa cek IP. Dipakai juga untuk memilih lane antrian alert.
     """
+    # source yang melewati ambang rate (lihat rate_blocker.py)
+    if alert.get("rate_block"):
+        return True
     if not AUTO_BLOCK_ENABLED:
         return False
+    return get_policy().matches(alert)
 
-    # Keyword-based auto-block (e.g. "sql injection,xss,dos")
-    AUTO_BLOCK_KEYWORDS = os.environ.get("SURIDASH_AUTO_BLOCK_KEYWORDS", "").lower()
-    keywords = [k.strip() for k in AUTO_BLOCK_KEYWORDS.split(",") if k.strip()]
 
-    a = alert.get("alert") or {}
-    severity = a.get("severity")
-    signature = a.get("signature", "").lower()
-    category = a.get("category", "").lower()
-
-    # Cek apakah cocok dengan keyword spesifik (jika ada keyword)
-    matched_keyword = False
-    if keywords:
-        for kw in keywords:
-            if kw in signature or kw in category:
-                matched_keyword = True
-                break
-
-    # Cek berdasarkan severity (jika severity tersetting)
-    matched_severity = False
-    if severity is not None:
-        try:
-            severity = int(severity)
-            if severity <= AUTO_BLOCK_SEVERITY:
-                matched_severity = True
-        except (ValueError, TypeError):
-            pass
-
-    # Blokir jika masuk kriteria severity ATAU kriteria keyword
-    if not (matched_severity or matched_keyword):
+def should_auto_block(alert: dict) -> bool:
+    """
+    Cek apakah alert ini memenuhi syarat untuk auto-block.
+    Return True jika severity <= threshold dan IP belum diblokir.
+    """
+    if not matches_auto_block(alert):
         return False
 
     src_ip = alert.get("src_ip")
@@ -89,7 +154,13 @@ def auto_block_from_alert(alert: dict) -> bool:
 
     try:
         ok = block_ip(src_ip, AUTO_BLOCK_TIMEOUT)
-        if ok:
+        if ok and alert.get("rate_block"):
+            rate = alert["rate_block"]
+            block_logger.warning(
+                f"[auto-block] Blocked {src_ip} | rate={rate['alerts']} alerts, "
+                f"{rate['signatures']} signatures in {rate['window']}s | timeout={AUTO_BLOCK_TIMEOUT}s"
+            )
+        elif ok:
             block_logger.warning(
                 f"[auto-block] Blocked {src_ip} | severity={severity} "
                 f"| sig=\"{signature}\" | timeout={AUTO_BLOCK_TIMEOUT}s"
@@ -0,0 +1,114 @@
+"""
+BatchWriter: kumpulkan operasi firewall (add/del) dari banyak caller lalu
+eksekusi sekaligus per batch.
+
+Batch di-flush kalau jumlahnya sudah `max_batch` atau op tertua sudah
+menunggu `max_delay` detik. Setiap caller tetap dapat hasil per-op lewat
+Future masing-masing.
+"""
+
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+logger = logging.getLogger("suridash-blocker")
+
+# op = (action, ip, timeout) -> action: "add" / "del"
+Op = Tuple[str, str, int]
+
+
+class BatchWriter:
+    def __init__(
+        self,
+        apply_batch: Callable[[List[Op]], List[bool]],
+        max_batch: int = 256,
+        max_delay: float = 0.02,
+        name: str = "suridash-batch-writer",
+    ):
+        self._apply = apply_batch
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay)
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Op, Future, float]] = []
+        self._thread = None
+
+        self.stats = {
+            "ops": 0,
+            "batches": 0,
+            "failed": 0,
+            "latency_sum": 0.0,
+            "latency_max": 0.0,
+        }
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, op: Op) -> Future:
+        fut: Future = Future()
+        with self._cond:
+            self._ensure_thread()
+            self._pending.append((op, fut, time.monotonic()))
+            self._cond.notify()
+        return fut
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            # tunggu sampai batch penuh atau window habis
+            deadline = self._pending[0][2] + self.max_delay
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            ops = [b[0] for b in batch]
+
+            try:
+                results = self._apply(ops)
+            except Exception as e:
+                logger.error(f"[blocker] batch apply failed ({len(ops)} ops): {e}")
+                results = [e] * len(ops)
+
+            now = time.monotonic()
+            st = self.stats
+            st["batches"] += 1
+            for (op, fut, queued_at), res in zip(batch, results):
+                latency = now - queued_at
+                st["ops"] += 1
+                st["latency_sum"] += latency
+                if latency > st["latency_max"]:
+                    st["latency_max"] = latency
+
+                if isinstance(res, Exception):
+                    st["failed"] += 1
+                    fut.set_exception(res)
+                else:
+                    if not res:
+                        st["failed"] += 1
+                    fut.set_result(bool(res))
+
+    def get_stats(self) -> dict:
+        st = dict(self.stats)
+        ops = st["ops"]
+        latency_sum = st.pop("latency_sum")
+        st["latency_avg_ms"] = round(latency_sum / ops * 1000, 3) if ops else 0.0
+        st["latency_max_ms"] = round(st.pop("latency_max") * 1000, 3)
+        st["avg_batch"] = round(ops / st["batches"], 2) if st["batches"] else 0.0
+        st["pending"] = len(self._pending)
+        return st
@@ -0,0 +1,77 @@
+"""
+BlockStage: tahap cek/blokir IP untuk pipeline alert, di luar event loop.
+
+Semua operasi firewall (is_ip_blocked, auto_block_from_alert) jalan di
+thread pool khusus. Alert yang datang bersamaan untuk src_ip yang sama
+berbagi satu operasi in-flight, jadi flood dari satu IP hanya memicu satu
+test/block, sementara alert IP lain dan trafik websocket tetap jalan.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+from agent.core.blocker import is_ip_blocked
+from agent.core.auto_blocker import auto_block_from_alert, matches_auto_block
+
+BLOCK_WORKERS = int(os.environ.get("SURIDASH_BLOCK_WORKERS", "4"))
+
+# (sudah terblokir sebelumnya, baru saja diblokir oleh alert ini)
+Verdict = Tuple[bool, bool]
+
+
+def _check_and_block(alert: dict) -> Verdict:
+    src_ip = alert.get("src_ip")
+    if src_ip and is_ip_blocked(src_ip):
+        return True, False
+    return False, auto_block_from_alert(alert)
+
+
+class BlockStage:
+    def __init__(self, workers: int = BLOCK_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers),
+            thread_name_prefix="suridash-block",
+        )
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def _run(self, alert: dict) -> Verdict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _check_and_block, alert)
+
+    async def process(self, alert: dict) -> Verdict:
+        src_ip = alert.get("src_ip")
+        if not src_ip:
+            return await self._run(alert)
+
+        while True:
+            pending = self._inflight.get(src_ip)
+            if pending is None:
+                break
+
+            # ikut menunggu operasi yang sedang jalan untuk IP ini
+            self.coalesced += 1
+            try:
+                already, just = await asyncio.shield(pending)
+            except Exception:
+                already, just = False, False
+            if already or just:
+                return True, False
+            # leader tidak memblokir: hasil test-nya (belum terblokir) berlaku juga
+            # untuk alert ini, kecuali alert ini sendiri memenuhi kriteria
+            # auto-block (severity/keyword-nya bisa berbeda dari alert leader)
+            if not matches_auto_block(alert):
+                return False, False
+
+        fut = asyncio.ensure_future(self._run(alert))
+        self._inflight[src_ip] = fut
+        try:
+            return await asyncio.shield(fut)
+        finally:
+            if self._inflight.get(src_ip) is fut:
+                del self._inflight[src_ip]
+
+    def inflight(self) -> int:
+        return len(self._inflight)
@@ -1,10 +1,15 @@
 import os
-import subprocess
 import ipaddress
 import time
 from typing import Dict, Tuple
 import logging
 
+from agent.core import ipfilter
+from agent.core.aggregate import AGGREGATE, PrefixAggregator
+from agent.core.batcher import BatchWriter
+from agent.core.blocklist import BlocklistMirror, normalize
+from agent.core.firewall import get_backend
+
 logger = logging.getLogger("suridash-blocker")
 
 IPSET_NAME = os.environ.get("SURIDASH_IPSET_NAME", "suridash-blacklist")
@@ -17,28 +22,131 @@ _BLOCKED_CACHE: Dict[str, Tuple[bool, float]] = {}
 CACHE_TTL_SECONDS = int(os.environ.get("SURIDASH_IPSET_CACHE_TTL", "10"))  # kecil tapi efektif
 MAX_CACHE_SIZE = 10_000
 
-def _run(cmd: list[str]):
-    subprocess.run(cmd, check=True)
+# Batch writer: add/del dikumpulkan lalu dieksekusi sekali per batch
+# (satu `ipset restore`, satu sendmsg netlink, atau satu transaksi nft)
+IPSET_BATCH = os.environ.get("SURIDASH_IPSET_BATCH", "true").lower() == "true"
+IPSET_BATCH_SIZE = int(os.environ.get("SURIDASH_IPSET_BATCH_SIZE", "256"))
+IPSET_BATCH_WINDOW_MS = int(os.environ.get("SURIDASH_IPSET_BATCH_WINDOW_MS", "20"))
+IPSET_OP_TIMEOUT = 10  # detik, batas tunggu hasil per-op
+
+# Backend: ipset (binary via sudo) | netlink (langsung ke kernel) | nftables
+FIREWALL_BACKEND = os.environ.get("SURIDASH_FIREWALL_BACKEND", "ipset").lower()
+
+_backend = get_backend(FIREWALL_BACKEND, IPSET_NAME)
+_writer = BatchWriter(
+    _backend.apply,
+    max_batch=IPSET_BATCH_SIZE,
+    max_delay=IPSET_BATCH_WINDOW_MS / 1000,
+    name="suridash-fw-writer",
+)
+
+# Mirror lokal isi set -> is_ip_blocked tanpa subprocess
+IPSET_MIRROR = os.environ.get("SURIDASH_IPSET_MIRROR", "true").lower() == "true"
+IPSET_RECONCILE_SECONDS = int(os.environ.get("SURIDASH_IPSET_RECONCILE", "300"))
+
+_mirror = BlocklistMirror(_backend.list_entries, reconcile_interval=IPSET_RECONCILE_SECONDS)
+
+# Agregasi /24 & /64 ke set hash:net (lihat aggregate.py)
+_aggregator = PrefixAggregator() if AGGREGATE else None
+
+def _submit(action: str, ip: str, timeout: int = 0) -> bool:
+    if not IPSET_BATCH:
+        # mode lama: satu eksekusi backend per IP
+        return _backend.apply([(action, ip, timeout)])[0]
+    return _writer.submit((action, ip, timeout)).result(timeout=IPSET_OP_TIMEOUT)
+
+def _submit_many(ops) -> list:
+    if not ops:
+        return []
+    if not IPSET_BATCH:
+        return _backend.apply(ops)
+    futures = [_writer.submit(op) for op in ops]
+    return [f.result(timeout=IPSET_OP_TIMEOUT) for f in futures]
+
+def _remaining(exp: float, now: float) -> int:
+    # 0 = permanen; minimal 1 detik supaya tidak jadi permanen karena pembulatan
+    return 0 if not exp else max(1, int(exp - now + 0.999))
+
+def _collapse(prefix: str, members: Dict[str, float]):
+    """Blokir `prefix` utuh lalu hapus entry tunggal yang sudah tertutup."""
+    # entry lama di dalam prefix (misal dari sebelum agent start) ikut dirapikan
+    extra = {ip: _mirror.expires_at(ip) or 0 for ip in _mirror.within(prefix) if ip not in members}
+    if extra:
+        _aggregator.merge(prefix, extra)
+    members = {**members, **extra}
 
-def _is_public_ip(ip: str) -> bool:
-    try:
-        addr = ipaddress.ip_address(ip)
-        return not (
-            addr.is_private
-            or addr.is_loopback
-            or addr.is_link_local
-            or addr.is_multicast
-            or addr.is_reserved
-            or addr.is_unspecified
-            or addr in ipaddress.ip_network("100.64.0.0/10")
-        )
-    except ValueError:
+    now = time.time()
+    timeout = _remaining(_aggregator.expires(prefix), now)
+    if not _submit("add", prefix, timeout):
+        _aggregator.release(prefix)
+        return
+    _mirror.add(prefix, timeout)
+
+    ips = list(members)
+    for ip, ok in zip(ips, _submit_many([("del", ip, 0) for ip in ips])):
+        if ok:
+            _mirror.remove(ip)
+    logger.info(f"[blocker] aggregated {len(ips)} addresses into {prefix} for {timeout or 'permanent'}s")
+
+def _expand(prefix: str, keep_out: str = None) -> bool:
+    """Pecah prefix teragregasi kembali jadi entry tunggal (kecuali `keep_out`)."""
+    members = _aggregator.release(prefix)
+    now = time.time()
+    ops = [
+        ("add", ip, _remaining(exp, now))
+        for ip, exp in members.items()
+        if ip != keep_out and (not exp or exp > now)
+    ]
+    for (_, ip, timeout), ok in zip(ops, _submit_many(ops)):
+        if ok:
+            _mirror.add(ip, timeout)
+    if not _submit("del", prefix):
         return False
+    _mirror.remove(prefix)
+    logger.info(f"[blocker] split {prefix} back into {len(ops)} addresses")
+    return True
+
+def init():
+    """
+    Load mirror blacklist sekali saat start lalu jalankan reconcile periodik.
+    Kalau gagal (misal sudo belum dikonfigurasi), is_ip_blocked kembali ke
+    test per IP ke backend + cache TTL.
+    """
+    if not IPSET_MIRROR:
+        return
+    if _mirror.load():
+        _mirror.start_reconcile()
+
+def get_stats() -> dict:
+    """Statistik blocker untuk membandingkan mode batch vs fork per IP."""
+    return {
+        "backend": _backend.name,
+        "batch": IPSET_BATCH,
+        "forks": _backend.forks,
+        "writer": _writer.get_stats(),
+        "mirror": len(_mirror) if _mirror.loaded else None,
+        "aggregate": _aggregator.stats() if _aggregator else None,
+        "ipFilter": ipfilter.get_stats(),
+    }
+
+def _is_public_ip(ip: str) -> bool:
+    # range reserved sudah di-compile + verdict di-cache (lihat ipfilter.py)
+    return not ipfilter.is_reserved(ip)
+
+def _is_public_net(cidr: str) -> bool:
+    # allowlist tidak dicek: unblock prefix tetap boleh
+    return ipfilter.net_verdict(cidr) not in (ipfilter.RESERVED, ipfilter.INVALID)
 
 def block_ip(ip: str, timeout: int | None = None) -> bool:
-    if not _is_public_ip(ip):
+    verdict = ipfilter.ip_verdict(ip)
+    if verdict == ipfilter.ALLOWLIST:
+        logger.info(f"[blocker] skip allowlisted ip: {ip}")
+        return False
+    if verdict is not None:
         print("[blocker] skip non-public ip:", ip)
         return False
+    # key cooldown / aggregator / mirror harus sama untuk bentuk IPv6 apa pun
+    ip = normalize(ip)
 
     now = time.time()
     last = _block_cooldown.get(ip, 0)
@@ -52,29 +160,75 @@ def block_ip(ip: str, timeout: int | None = None) -> bool:
     _block_cooldown[ip] = now
     timeout = timeout or DEFAULT_TIMEOUT
 
-    _run(["sudo", "ipset", "add", IPSET_NAME, ip, "timeout", str(timeout), "-exist"])
+    # sudah tertutup prefix hasil agregasi
+    if _aggregator and _mirror.covering(ip):
+        # tetap dicatat sebagai anggota supaya ikut dipulihkan kalau prefix dipecah
+        _aggregator.record(ip, now + timeout)
+        return True
+
+    if not _submit("add", ip, timeout):
+        return False
+    _mirror.add(ip, timeout)
+    _BLOCKED_CACHE.pop(ip, None)
     logger.info(f"[blocker] blocked {ip} for {timeout}s")
+
+    if _aggregator:
+        agg = _aggregator.record(ip, now + timeout)
+        if agg and ipfilter.net_verdict(agg[0]) is not None:
+            # prefix menutupi range reserved / allowlist -> tetap entry tunggal
+            _aggregator.release(agg[0])
+        elif agg:
+            _collapse(*agg)
     return True
 
 def unblock_ip(ip: str) -> bool:
+    if "/" in ip:
+        # unblock prefix utuh
+        if not _is_public_net(ip):
+            return False
+        prefix = str(ipaddress.ip_network(ip, strict=False))
+        if not _submit("del", prefix):
+            return False
+        _mirror.remove(prefix)
+        if _aggregator:
+            _aggregator.release(prefix)
+        logger.info(f"[blocker] unblocked {prefix}")
+        return True
+
     if not _is_public_ip(ip):
         return False
-
-    try:
-        _run(["sudo", "ipset", "del", IPSET_NAME, ip])
-        logger.info(f"[blocker] unblocked {ip}")
-        return True
-    except subprocess.CalledProcessError:
+    ip = normalize(ip)
+
+    # alamat di dalam prefix teragregasi -> pecah prefix, sisakan anggota lain
+    if _aggregator:
+        prefix = _mirror.covering(ip)
+        if prefix and _aggregator.is_aggregated(prefix):
+            if not _expand(prefix, keep_out=ip):
+                return False
+            _BLOCKED_CACHE.pop(ip, None)
+            if _mirror.expires_at(ip) is None:
+                logger.info(f"[blocker] unblocked {ip}")
+                return True
+
+    if not _submit("del", ip):
         return False
+    _mirror.remove(ip)
+    _BLOCKED_CACHE.pop(ip, None)
+    logger.info(f"[blocker] unblocked {ip}")
+    return True
 
 def is_ip_blocked(ip: str) -> bool:
     """
-    Cek apakah ip ada di ipset.
-    Cepat karena pakai cache TTL.
+    Cek apakah ip ada di blacklist set.
+    Pakai mirror lokal (O(1), tanpa subprocess) kalau sudah ter-load,
+    selain itu test ke backend dengan cache TTL.
     """
     if not ip or not _is_public_ip(ip):
         return False
 
+    if _mirror.loaded:
+        return _mirror.contains(ip)
+
     now = time.time()
     cached = _BLOCKED_CACHE.get(ip)
     if cached and cached[1] > now:
@@ -84,16 +238,10 @@ def is_ip_blocked(ip: str) -> bool:
     if len(_BLOCKED_CACHE) > MAX_CACHE_SIZE:
         _BLOCKED_CACHE.clear()
 
-    # ipset test <set> <ip> -> exit code 0 kalau ada, 1 kalau tidak ada
     try:
-        subprocess.run(
-            ["sudo", "ipset", "test", IPSET_NAME, ip],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        _BLOCKED_CACHE[ip] = (True, now + CACHE_TTL_SECONDS)
-        return True
-    except subprocess.CalledProcessError:
-        _BLOCKED_CACHE[ip] = (False, now + CACHE_TTL_SECONDS)
-        return False
\ No newline at end of file
+        blocked = _backend.test(ip)
+    except OSError as e:
+        logger.error(f"[blocker] test {ip} failed: {e}")
+        return False
+    _BLOCKED_CACHE[ip] = (blocked, now + CACHE_TTL_SECONDS)
+    return blocked
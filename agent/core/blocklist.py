@@ -0,0 +1,161 @@
+"""
+BlocklistMirror: salinan lokal isi blacklist set di memori.
+
+Di-load sekali saat start (satu `ipset list -o save`), lalu di-update oleh
+setiap block/unblock yang dilakukan agent. Expiry dihitung sendiri dari
+timeout entry. Reconcile periodik menangkap perubahan dari luar agent
+(misal admin `ipset del` manual).
+
+Entry berupa prefix (set hash:net) juga dicatat di CidrTable, jadi
+contains() ikut benar untuk alamat yang ditutupi prefix.
+"""
+
+import ipaddress
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional
+
+from agent.core.cidr import CidrTable
+
+logger = logging.getLogger("suridash-blocker")
+
+
+def normalize(key: str) -> str:
+    """
+    Bentuk kanonik key mirror. list_entries semua backend mengembalikan IPv6
+    terkompresi, sementara eve / pemanggil bisa memberi bentuk panjang
+    ("2001:db8:0:0::1"); tanpa normalisasi keduanya jadi key berbeda.
+    """
+    if ":" not in key and "/" not in key:
+        return key  # IPv4 tunggal dari eve sudah kanonik
+    try:
+        if "/" in key:
+            return str(ipaddress.ip_network(key, strict=False))
+        return str(ipaddress.ip_address(key))
+    except ValueError:
+        return key
+
+
+class BlocklistMirror:
+    def __init__(self, loader: Callable[[], Dict[str, int]], reconcile_interval: int = 300):
+        self._loader = loader
+        self.reconcile_interval = reconcile_interval
+
+        # ip -> expire_ts (0 = permanen)
+        self._entries: Dict[str, float] = {}
+        # prefix (cidr) -> expire_ts
+        self._nets = CidrTable()
+        # perubahan lokal selama load berjalan: ip -> expire_ts | None (removed)
+        self._local: Dict[str, Optional[float]] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loading = False
+
+        self.loaded = False
+        self.last_reconcile = 0.0
+
+    def load(self) -> bool:
+        started = time.time()
+        with self._lock:
+            self._loading = True
+            self._local.clear()
+        try:
+            raw = self._loader()
+        except Exception as e:
+            with self._lock:
+                self._loading = False
+            logger.warning(f"[blocker] failed to load blocklist mirror: {e}")
+            return False
+
+        entries = {normalize(ip): (started + t if t else 0) for ip, t in raw.items()}
+
+        with self._lock:
+            # op lokal yang terjadi saat list berjalan lebih baru dari hasil list
+            for ip, exp in self._local.items():
+                if exp is None:
+                    entries.pop(ip, None)
+                else:
+                    entries[ip] = exp
+            self._local.clear()
+            self._loading = False
+            self._entries = entries
+            nets = CidrTable()
+            for key, exp in entries.items():
+                if "/" in key:
+                    nets.add(key, exp)
+            self._nets = nets
+            self.loaded = True
+            self.last_reconcile = started
+
+        logger.info(f"[blocker] blocklist mirror loaded ({len(entries)} entries)")
+        return True
+
+    def start_reconcile(self):
+        if self._thread is not None or self.reconcile_interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._reconcile_loop, name="suridash-blocklist-reconcile", daemon=True)
+        self._thread.start()
+
+    def _reconcile_loop(self):
+        while True:
+            time.sleep(self.reconcile_interval)
+            self.load()
+
+    def add(self, ip: str, timeout: int = 0):
+        ip = normalize(ip)
+        exp = time.time() + timeout if timeout else 0
+        with self._lock:
+            self._entries[ip] = exp
+            if "/" in ip:
+                self._nets.add(ip, exp)
+            if self._loading:
+                self._local[ip] = exp
+
+    def remove(self, ip: str):
+        ip = normalize(ip)
+        with self._lock:
+            self._entries.pop(ip, None)
+            if "/" in ip:
+                self._nets.remove(ip)
+            if self._loading:
+                self._local[ip] = None
+
+    def contains(self, ip: str) -> bool:
+        ip = normalize(ip)
+        exp = self._entries.get(ip)
+        if exp is not None:
+            if not exp or exp > time.time():
+                return True
+            with self._lock:
+                if self._entries.get(ip) == exp:
+                    del self._entries[ip]
+        return self.covering(ip) is not None
+
+    def covering(self, ip: str) -> Optional[str]:
+        """Prefix aktif yang menutupi `ip`, atau None."""
+        now = time.time()
+        for cidr, exp in self._nets.covering(ip):
+            if not exp or exp > now:
+                return cidr
+        return None
+
+    def within(self, cidr: str) -> List[str]:
+        """Alamat tunggal di mirror yang berada di dalam prefix `cidr`."""
+        net = ipaddress.ip_network(cidr, strict=False)
+        out = []
+        for key in list(self._entries):
+            if "/" in key:
+                continue
+            try:
+                if ipaddress.ip_address(key) in net:
+                    out.append(key)
+            except ValueError:
+                pass
+        return out
+
+    def expires_at(self, ip: str) -> Optional[float]:
+        return self._entries.get(normalize(ip))
+
+    def __len__(self):
+        return len(self._entries)
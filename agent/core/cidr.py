@@ -0,0 +1,65 @@
+"""
+CidrTable: lookup prefix yang menutupi sebuah alamat (longest-prefix match).
+
+Disimpan per family dan per panjang prefix: {prefixlen: {network_int: value}},
+sama seperti hash:net di kernel. Lookup hanya mencoba panjang prefix yang
+benar-benar ada di tabel (biasanya satu atau dua), dari yang paling spesifik.
+"""
+
+import ipaddress
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class CidrTable:
+    def __init__(self):
+        # version -> {prefixlen: {network_int >> host_bits: (cidr, value)}}
+        self._tables: Dict[int, Dict[int, Dict[int, Tuple[str, Any]]]] = {4: {}, 6: {}}
+        self._count = 0
+
+    @staticmethod
+    def _key(net) -> Tuple[int, int, int]:
+        return net.version, net.prefixlen, int(net.network_address) >> (net.max_prefixlen - net.prefixlen)
+
+    def add(self, cidr: str, value: Any = None) -> str:
+        """Tambah prefix. Return bentuk normal (misal '203.0.113.0/24')."""
+        net = ipaddress.ip_network(cidr, strict=False)
+        version, plen, key = self._key(net)
+        table = self._tables[version].setdefault(plen, {})
+        if key not in table:
+            self._count += 1
+        table[key] = (str(net), value)
+        return str(net)
+
+    def remove(self, cidr: str) -> Optional[Any]:
+        try:
+            net = ipaddress.ip_network(cidr, strict=False)
+        except ValueError:
+            return None
+        version, plen, key = self._key(net)
+        table = self._tables[version].get(plen)
+        if not table or key not in table:
+            return None
+        _, value = table.pop(key)
+        if not table:
+            del self._tables[version][plen]
+        self._count -= 1
+        return value
+
+    def covering(self, ip: str) -> Iterator[Tuple[str, Any]]:
+        """Yield (cidr, value) semua prefix yang menutupi `ip`, paling spesifik dulu."""
+        if not self._count:
+            return
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return
+        tables = self._tables[addr.version]
+        n = int(addr)
+        bits = addr.max_prefixlen
+        for plen in sorted(tables, reverse=True):
+            hit = tables.get(plen, {}).get(n >> (bits - plen))
+            if hit is not None:
+                yield hit
+
+    def __len__(self) -> int:
+        return self._count
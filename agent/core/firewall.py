@@ -0,0 +1,89 @@
+"""
+Interface backend firewall di belakang block_ip / unblock_ip / is_ip_blocked.
+
+Backend yang tersedia:
+  ipset    -> binary `ipset` via sudo (default)
+  netlink  -> ipset langsung ke kernel lewat NFNETLINK
+  nftables -> named set di table nftables, satu `nft -f -` per batch
+
+Setiap backend memakai empat set (lihat set_names): alamat tunggal IPv4/IPv6
+dan prefix hasil agregasi (hash:net) IPv4/IPv6.
+"""
+
+import ipaddress
+import logging
+from typing import Dict, List, Tuple
+
+from agent.core.batcher import Op
+
+logger = logging.getLogger("suridash-blocker")
+
+BACKENDS = ("ipset", "netlink", "nftables")
+
+
+def set_names(set_name: str) -> Tuple[str, str, str, str]:
+    """(ip v4, ip v6, net v4, net v6)"""
+    return set_name, f"{set_name}-v6", f"{set_name}-net", f"{set_name}-net6"
+
+
+def set_for(set_name: str, ip: str, net_set: bool = False) -> str:
+    """
+    Nama set untuk alamat / prefix `ip` (`net_set` = paksa set hash:net,
+    untuk test alamat yang mungkin tertutup prefix). ValueError kalau bukan
+    alamat valid.
+    """
+    net = ipaddress.ip_network(ip, strict=False)
+    v4, v6, net4, net6 = set_names(set_name)
+    if net_set or net.prefixlen != net.max_prefixlen:
+        return net4 if net.version == 4 else net6
+    return v4 if net.version == 4 else v6
+
+
+class FirewallBackend:
+    name = "base"
+
+    def __init__(self):
+        self.forks = 0
+
+    def apply(self, ops: List[Op]) -> List[bool]:
+        """Eksekusi batch add/del. Return hasil per-op (urutan sama dengan `ops`)."""
+        raise NotImplementedError
+
+    def test(self, ip: str) -> bool:
+        raise NotImplementedError
+
+    def list_entries(self) -> Dict[str, int]:
+        """Isi set saat ini: ip -> sisa timeout (detik, 0 = permanen)."""
+        raise NotImplementedError
+
+
+def get_backend(name: str, set_name: str) -> FirewallBackend:
+    """
+    Buat backend sesuai config. Backend native yang gagal diinisialisasi
+    jatuh kembali ke binary ipset.
+    """
+    from agent.core.ipset import IpsetCli
+
+    name = (name or "ipset").lower()
+
+    if name == "netlink":
+        from agent.core import ipset_netlink
+        if ipset_netlink.available():
+            try:
+                backend = ipset_netlink.IpsetNetlink(set_name)
+                # pastikan set ada dan kita punya CAP_NET_ADMIN
+                backend.test("192.0.2.1")
+                return backend
+            except OSError as e:
+                logger.warning(f"[blocker] netlink backend unavailable ({e}), falling back to ipset binary")
+        else:
+            logger.warning("[blocker] netlink not supported on this platform, falling back to ipset binary")
+
+    elif name == "nftables":
+        from agent.core.nftables import Nftables
+        return Nftables(set_name)
+
+    elif name != "ipset":
+        logger.warning(f"[blocker] unknown firewall backend '{name}', using ipset")
+
+    return IpsetCli(set_name)
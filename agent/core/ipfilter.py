@@ -0,0 +1,214 @@
+"""
+Klasifikasi IP sebelum diblokir: range reserved (private, loopback, link-local,
+multicast, CGNAT, dokumentasi, ...) dan allowlist operator (scanner sendiri,
+partner) yang tidak boleh pernah diblokir.
+
+Semua range di-compile jadi interval integer terurut (sudah digabung, tidak
+overlap) per family, lookup pakai bisect: O(log n) walau allowlist berisi
+ribuan CIDR. Verdict per IP disimpan di LRU terbatas.
+
+File allowlist: satu IP / CIDR per baris, `#` untuk komentar. File dicek
+ulang (mtime + ukuran) paling sering tiap SURIDASH_ALLOWLIST_CHECK detik dan
+di-compile ulang kalau berubah.
+"""
+
+import ipaddress
+import logging
+import os
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("suridash-blocker")
+
+ALLOWLIST_FILE = os.environ.get("SURIDASH_ALLOWLIST_FILE", "/etc/suridash/allowlist.txt")
+ALLOWLIST_CHECK_SECONDS = float(os.environ.get("SURIDASH_ALLOWLIST_CHECK", "5"))
+VERDICT_CACHE_SIZE = int(os.environ.get("SURIDASH_IP_VERDICT_CACHE", "65536"))
+
+# verdict
+RESERVED = "reserved"
+ALLOWLIST = "allowlist"
+INVALID = "invalid"
+
+# Setara dengan is_private / is_loopback / is_link_local / is_multicast /
+# is_reserved / is_unspecified milik ipaddress + CGNAT (100.64.0.0/10).
+# Satu-satunya beda: site-local fec0::/10 (deprecated) ikut reserved.
+RESERVED_RANGES = (
+    # IPv4
+    "0.0.0.0/8",
+    "10.0.0.0/8",
+    "100.64.0.0/10",
+    "127.0.0.0/8",
+    "169.254.0.0/16",
+    "172.16.0.0/12",
+    "192.0.0.0/29",
+    "192.0.0.170/31",
+    "192.0.2.0/24",
+    "192.168.0.0/16",
+    "198.18.0.0/15",
+    "198.51.100.0/24",
+    "203.0.113.0/24",
+    "224.0.0.0/4",
+    "240.0.0.0/4",
+    # IPv6: semua di luar 2000::/3 reserved / ULA / link-local / multicast
+    "::/3",
+    "4000::/2",
+    "8000::/1",
+    "2001::/23",
+    "2001:db8::/32",
+)
+
+
+class RangeSet:
+    """Interval [start, end] integer terurut per family, lookup dengan bisect."""
+
+    def __init__(self, cidrs: Iterable = ()):
+        spans = {4: [], 6: []}
+        for cidr in cidrs:
+            net = cidr if isinstance(cidr, (ipaddress.IPv4Network, ipaddress.IPv6Network)) else ipaddress.ip_network(cidr, strict=False)
+            spans[net.version].append((int(net.network_address), int(net.broadcast_address)))
+
+        self._starts = {}
+        self._ends = {}
+        self._count = 0
+        for version, items in spans.items():
+            starts: List[int] = []
+            ends: List[int] = []
+            for lo, hi in sorted(items):
+                if ends and lo <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], hi)
+                else:
+                    starts.append(lo)
+                    ends.append(hi)
+            self._starts[version] = starts
+            self._ends[version] = ends
+            self._count += len(starts)
+
+    def contains(self, version: int, n: int) -> bool:
+        i = bisect_right(self._starts[version], n) - 1
+        return i >= 0 and n <= self._ends[version][i]
+
+    def overlaps(self, version: int, lo: int, hi: int) -> bool:
+        """True kalau ada interval yang beririsan dengan [lo, hi]."""
+        i = bisect_right(self._starts[version], hi) - 1
+        return i >= 0 and self._ends[version][i] >= lo
+
+    def __len__(self) -> int:
+        return self._count
+
+
+_RESERVED = RangeSet(RESERVED_RANGES)
+
+
+def load_allowlist(path: str) -> Tuple[RangeSet, int]:
+    """Baca file allowlist. Return (RangeSet, jumlah entry valid)."""
+    nets = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                nets.append(ipaddress.ip_network(line, strict=False))
+            except ValueError:
+                logger.warning(f"[allowlist] {path}:{lineno}: invalid entry {line!r}, skipped")
+    return RangeSet(nets), len(nets)
+
+
+class IpFilter:
+    """Snapshot reserved + allowlist yang sudah di-compile."""
+
+    def __init__(self, allowlist: RangeSet = None, snapshot=None, cache_size: int = VERDICT_CACHE_SIZE):
+        self.allowlist = allowlist or RangeSet()
+        self.snapshot = snapshot
+        self.verdict = lru_cache(maxsize=max(1, cache_size))(self._verdict)
+
+    def _verdict(self, ip: str) -> Optional[str]:
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return INVALID
+        n = int(addr)
+        if _RESERVED.contains(addr.version, n):
+            return RESERVED
+        if self.allowlist.contains(addr.version, n):
+            return ALLOWLIST
+        return None
+
+    def net_verdict(self, cidr: str) -> Optional[str]:
+        """Verdict untuk prefix: ditolak kalau beririsan dengan range mana pun."""
+        try:
+            net = ipaddress.ip_network(cidr, strict=False)
+        except ValueError:
+            return INVALID
+        lo, hi = int(net.network_address), int(net.broadcast_address)
+        if _RESERVED.overlaps(net.version, lo, hi):
+            return RESERVED
+        if self.allowlist.overlaps(net.version, lo, hi):
+            return ALLOWLIST
+        return None
+
+    def stats(self) -> dict:
+        info = self.verdict.cache_info()
+        return {
+            "allowlist": len(self.allowlist),
+            "cached": info.currsize,
+            "hits": info.hits,
+            "misses": info.misses,
+        }
+
+
+def _file_snapshot(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _build(path: str, snap) -> IpFilter:
+    if snap is None:
+        return IpFilter(snapshot=None)
+    try:
+        ranges, count = load_allowlist(path)
+    except OSError as e:
+        logger.error(f"[allowlist] failed to read {path}: {e}")
+        return IpFilter(snapshot=snap)
+    logger.info(f"[allowlist] loaded {count} entries ({len(ranges)} ranges) from {path}")
+    return IpFilter(ranges, snapshot=snap)
+
+
+_filter = _build(ALLOWLIST_FILE, _file_snapshot(ALLOWLIST_FILE)) if ALLOWLIST_FILE else IpFilter()
+_checked = time.monotonic()
+
+
+def get_filter() -> IpFilter:
+    global _filter, _checked
+    if not ALLOWLIST_FILE:
+        return _filter
+    now = time.monotonic()
+    if now - _checked >= ALLOWLIST_CHECK_SECONDS:
+        _checked = now
+        snap = _file_snapshot(ALLOWLIST_FILE)
+        if snap != _filter.snapshot:
+            _filter = _build(ALLOWLIST_FILE, snap)
+    return _filter
+
+
+def ip_verdict(ip: str) -> Optional[str]:
+    """None kalau boleh diblokir, selain itu alasannya (reserved / allowlist / invalid)."""
+    return get_filter().verdict(ip)
+
+
+def net_verdict(cidr: str) -> Optional[str]:
+    return get_filter().net_verdict(cidr)
+
+
+def is_reserved(ip: str) -> bool:
+    """Bukan alamat publik (atau tidak valid); allowlist tidak ikut dicek."""
+    return get_filter().verdict(ip) in (RESERVED, INVALID)
+
+
+def get_stats() -> dict:
+    return get_filter().stats()
@@ -0,0 +1,141 @@
+"""
+Akses ipset lewat binary `ipset` (subprocess).
+
+Semua add/del dalam satu batch dikirim ke satu proses `ipset restore -exist`,
+jadi satu fork + satu sudo untuk ratusan IP, bukan satu per IP. Tiap op
+diarahkan ke set sesuai family dan alamat/prefix (lihat firewall.set_names).
+"""
+
+import re
+import subprocess
+import logging
+from typing import Dict, List
+
+from agent.core.batcher import Op
+from agent.core.firewall import FirewallBackend, set_for, set_names
+
+logger = logging.getLogger("suridash-blocker")
+
+_ERR_LINE_RE = re.compile(r"Error in line (\d+):\s*(.*)")
+
+
+class IpsetCli(FirewallBackend):
+    name = "ipset"
+
+    def __init__(self, set_name: str, sudo: bool = True):
+        super().__init__()
+        self.set_name = set_name
+        self.sets = set_names(set_name)
+        self.prefix = ["sudo"] if sudo else []
+
+    def _set_for(self, ip: str) -> str:
+        try:
+            return set_for(self.set_name, ip)
+        except ValueError:
+            return self.set_name  # biar ipset yang menolak (error per baris)
+
+    def _line(self, op: Op) -> str:
+        action, ip, timeout = op
+        target = self._set_for(ip)
+        if action == "add":
+            if timeout:
+                return f"add {target} {ip} timeout {int(timeout)}"
+            return f"add {target} {ip}"
+        return f"del {target} {ip}"
+
+    def apply(self, ops: List[Op]) -> List[bool]:
+        results = [False] * len(ops)
+        todo = list(range(len(ops)))  # index op yang belum punya hasil
+
+        while todo:
+            script = "\n".join(self._line(ops[i]) for i in todo) + "\n"
+            self.forks += 1
+            proc = subprocess.run(
+                self.prefix + ["ipset", "restore", "-exist"],
+                input=script,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode == 0:
+                for i in todo:
+                    results[i] = True
+                break
+
+            # ipset berhenti di baris pertama yang gagal; baris sebelumnya sudah masuk
+            m = _ERR_LINE_RE.search(proc.stderr or "")
+            if not m:
+                logger.error(f"[blocker] ipset restore failed: {(proc.stderr or '').strip()}")
+                break
+
+            lineno = int(m.group(1))
+            reason = m.group(2).strip()
+            if lineno < 1 or lineno > len(todo):
+                break
+
+            failed = todo[lineno - 1]
+            logger.warning(f"[blocker] ipset restore: {ops[failed][1]} rejected ({reason})")
+            for i in todo[:lineno - 1]:
+                results[i] = True
+            todo = todo[lineno:]
+
+            # set tidak ada (instalasi lama tanpa set v6/net) -> op lain ke set yang
+            # sama pasti gagal juga; op ke set lain tetap dicoba
+            if "does not exist" in reason:
+                missing = self._set_for(ops[failed][1])
+                todo = [i for i in todo if self._set_for(ops[i][1]) != missing]
+
+        return results
+
+    def test(self, ip: str) -> bool:
+        # ipset test <set> <ip> -> exit code 0 kalau ada, 1 kalau tidak ada
+        targets = [self._set_for(ip)]
+        try:
+            net = set_for(self.set_name, ip, net_set=True)
+            if net not in targets:
+                targets.append(net)  # alamat bisa tertutup prefix hasil agregasi
+        except ValueError:
+            pass
+
+        for target in targets:
+            self.forks += 1
+            if subprocess.run(
+                self.prefix + ["ipset", "test", target, ip],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            ).returncode == 0:
+                return True
+        return False
+
+    def list_entries(self) -> Dict[str, int]:
+        """
+        Ambil isi semua set dengan `ipset list -o save` per set.
+        Return ip/cidr -> sisa timeout (detik, 0 = permanen).
+        Set v6/net boleh belum ada (instalasi lama); set utama wajib ada.
+        """
+        entries: Dict[str, int] = {}
+        for name in self.sets:
+            self.forks += 1
+            proc = subprocess.run(
+                self.prefix + ["ipset", "list", name, "-o", "save"],
+                capture_output=True,
+                text=True,
+                check=name == self.set_name,
+            )
+            if proc.returncode != 0:
+                continue
+
+            for line in proc.stdout.splitlines():
+                parts = line.split()
+                # add <set> <ip> [timeout N] ...
+                if len(parts) < 3 or parts[0] != "add" or parts[1] != name:
+                    continue
+                timeout = 0
+                if "timeout" in parts:
+                    i = parts.index("timeout")
+                    if i + 1 < len(parts):
+                        try:
+                            timeout = int(parts[i + 1])
+                        except ValueError:
+                            pass
+                entries[parts[2]] = timeout
+        return entries
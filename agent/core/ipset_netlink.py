@@ -0,0 +1,301 @@
+"""
+Akses ipset langsung ke kernel lewat NFNETLINK (AF_NETLINK), tanpa binary
+`ipset` dan tanpa sudo. Butuh CAP_NET_ADMIN di proses agent.
+
+Banyak pesan add/del digabung dalam satu sendmsg; kernel membalas satu ACK
+per pesan sehingga hasil per-IP tetap bisa dipetakan lewat nomor seq.
+
+Dipilih lewat SURIDASH_FIREWALL_BACKEND=netlink (lihat agent/core/firewall.py).
+"""
+
+import errno
+import ipaddress
+import os
+import socket
+import struct
+import threading
+import logging
+from typing import Dict, List
+
+from agent.core.batcher import Op
+from agent.core.firewall import FirewallBackend, set_for, set_names
+
+logger = logging.getLogger("suridash-blocker")
+
+NETLINK_NETFILTER = 12
+NFNL_SUBSYS_IPSET = 6
+
+NLM_F_REQUEST = 0x1
+NLM_F_MULTI = 0x2
+NLM_F_ACK = 0x4
+NLM_F_DUMP = 0x300
+
+NLMSG_ERROR = 0x2
+NLMSG_DONE = 0x3
+
+NLA_F_NESTED = 1 << 15
+NLA_F_NET_BYTEORDER = 1 << 14
+NLA_TYPE_MASK = ~(NLA_F_NESTED | NLA_F_NET_BYTEORDER) & 0xFFFF
+
+# include/uapi/linux/netfilter/ipset/ip_set.h
+IPSET_PROTOCOL = 6
+IPSET_CMD_LIST = 7
+IPSET_CMD_ADD = 9
+IPSET_CMD_DEL = 10
+IPSET_CMD_TEST = 11
+
+IPSET_ATTR_PROTOCOL = 1
+IPSET_ATTR_SETNAME = 2
+IPSET_ATTR_DATA = 7
+IPSET_ATTR_ADT = 8
+
+IPSET_ATTR_IP = 1
+IPSET_ATTR_CIDR = 3
+IPSET_ATTR_TIMEOUT = 6
+IPSET_ATTR_LINENO = 9
+
+IPSET_ATTR_IPADDR_IPV4 = 1
+IPSET_ATTR_IPADDR_IPV6 = 2
+
+IPSET_ERR_EXIST = 4103
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_NFGENMSG = struct.Struct("=BBH")
+_NLATTR = struct.Struct("=HH")
+
+MAX_SEND_BYTES = 64 * 1024
+
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _attr(atype: int, data: bytes) -> bytes:
+    length = _NLATTR.size + len(data)
+    return _NLATTR.pack(length, atype) + data + b"\0" * (_align(length) - length)
+
+
+def _parse_attrs(buf: bytes, offset: int = 0, end: int = None) -> List[tuple]:
+    end = len(buf) if end is None else end
+    attrs = []
+    while offset + _NLATTR.size <= end:
+        length, atype = _NLATTR.unpack_from(buf, offset)
+        if length < _NLATTR.size:
+            break
+        attrs.append((atype & NLA_TYPE_MASK, buf[offset + _NLATTR.size: offset + length]))
+        offset += _align(length)
+    return attrs
+
+
+class IpsetNetlinkError(OSError):
+    pass
+
+
+class IpsetNetlink(FirewallBackend):
+    name = "netlink"
+
+    def __init__(self, set_name: str):
+        super().__init__()
+        self.set_name = set_name
+        self.sets = set_names(set_name)
+        self._setname_attrs = {n: _attr(IPSET_ATTR_SETNAME, n.encode() + b"\0") for n in self.sets}
+        self._proto_attr = _attr(IPSET_ATTR_PROTOCOL, bytes([IPSET_PROTOCOL]))
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.sendmsgs = 0
+
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_NETFILTER)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self._sock.settimeout(5)
+        self._sock.bind((0, 0))
+
+    # ---------- encoding ----------
+
+    def _next_seq(self) -> int:
+        self._seq = (self._seq + 1) & 0xFFFFFFFF or 1
+        return self._seq
+
+    def _msg(self, cmd: int, family: int, flags: int, payload: bytes, seq: int) -> bytes:
+        body = _NFGENMSG.pack(family, 0, 0) + payload
+        return _NLMSGHDR.pack(
+            _NLMSGHDR.size + len(body),
+            (NFNL_SUBSYS_IPSET << 8) | cmd,
+            NLM_F_REQUEST | flags,
+            seq,
+            0,
+        ) + body
+
+    def _data_attr(self, ip: str, timeout: int = 0, lineno: int = 0) -> tuple:
+        net = ipaddress.ip_network(ip, strict=False)
+        if net.version == 4:
+            family, addr_type = socket.AF_INET, IPSET_ATTR_IPADDR_IPV4
+        else:
+            family, addr_type = socket.AF_INET6, IPSET_ATTR_IPADDR_IPV6
+
+        ip_attr = _attr(
+            IPSET_ATTR_IP | NLA_F_NESTED,
+            _attr(addr_type | NLA_F_NET_BYTEORDER, net.network_address.packed),
+        )
+        data = ip_attr
+        if net.prefixlen != net.max_prefixlen:
+            data += _attr(IPSET_ATTR_CIDR, bytes([net.prefixlen]))
+        if timeout:
+            data += _attr(IPSET_ATTR_TIMEOUT | NLA_F_NET_BYTEORDER, struct.pack(">I", int(timeout)))
+        if lineno:
+            data += _attr(IPSET_ATTR_LINENO, struct.pack("=I", lineno))
+        return family, _attr(IPSET_ATTR_DATA | NLA_F_NESTED, data)
+
+    def _adt_msg(self, cmd: int, ip: str, timeout: int, seq: int, lineno: int = 0, net_set: bool = False) -> bytes:
+        family, data = self._data_attr(ip, timeout, lineno)
+        setname = self._setname_attrs[set_for(self.set_name, ip, net_set)]
+        return self._msg(cmd, family, NLM_F_ACK, self._proto_attr + setname + data, seq)
+
+    # ---------- io ----------
+
+    def _recv_acks(self, pending: Dict[int, int]) -> Dict[int, int]:
+        """Baca ACK sampai semua seq di `pending` terjawab. Return seq -> errno (0 = ok)."""
+        results: Dict[int, int] = {}
+        while len(results) < len(pending):
+            buf = self._sock.recv(1 << 16)
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(buf):
+                length, mtype, _flags, seq, _pid = _NLMSGHDR.unpack_from(buf, offset)
+                if length < _NLMSGHDR.size:
+                    break
+                if mtype == NLMSG_ERROR and seq in pending:
+                    (err,) = struct.unpack_from("=i", buf, offset + _NLMSGHDR.size)
+                    results[seq] = -err
+                offset += _align(length)
+        return results
+
+    def _send_batch(self, msgs: List[bytes], seqs: List[int]) -> Dict[int, int]:
+        results: Dict[int, int] = {}
+        start = 0
+        while start < len(msgs):
+            # potong per ~64KB supaya tidak melebihi buffer netlink
+            end, size = start, 0
+            while end < len(msgs) and (end == start or size + len(msgs[end]) <= MAX_SEND_BYTES):
+                size += len(msgs[end])
+                end += 1
+            chunk_seqs = {seq: i for i, seq in enumerate(seqs[start:end])}
+            self._sock.sendmsg([b"".join(msgs[start:end])])
+            self.sendmsgs += 1
+            results.update(self._recv_acks(chunk_seqs))
+            start = end
+        return results
+
+    def apply(self, ops: List[Op]) -> List[bool]:
+        with self._lock:
+            msgs, seqs = [], []
+            for lineno, (action, ip, timeout) in enumerate(ops, 1):
+                seq = self._next_seq()
+                cmd = IPSET_CMD_ADD if action == "add" else IPSET_CMD_DEL
+                try:
+                    msgs.append(self._adt_msg(cmd, ip, timeout if action == "add" else 0, seq, lineno))
+                except ValueError:
+                    msgs.append(None)
+                seqs.append(seq)
+
+            valid = [(m, s) for m, s in zip(msgs, seqs) if m is not None]
+            acks = self._send_batch([m for m, _ in valid], [s for _, s in valid]) if valid else {}
+
+        results = []
+        for (action, ip, _), seq in zip(ops, seqs):
+            err = acks.get(seq, errno.EINVAL)
+            if err:
+                logger.warning(f"[blocker] netlink ipset {action} {ip} failed (errno={err})")
+            results.append(err == 0)
+        return results
+
+    def _test(self, ip: str, net_set: bool) -> int:
+        with self._lock:
+            seq = self._next_seq()
+            msg = self._adt_msg(IPSET_CMD_TEST, ip, 0, seq, net_set=net_set)
+            return self._send_batch([msg], [seq]).get(seq, errno.EINVAL)
+
+    def test(self, ip: str) -> bool:
+        err = self._test(ip, False)
+        if err == 0:
+            return True
+        if err != IPSET_ERR_EXIST:
+            raise IpsetNetlinkError(err, f"ipset test {ip} failed")
+        if "/" in ip:
+            return False
+        # alamat bisa tertutup prefix hasil agregasi (set net boleh belum ada)
+        return self._test(ip, True) == 0
+
+    def list_entries(self) -> Dict[str, int]:
+        """
+        Dump isi semua set. Return ip/cidr -> sisa timeout (0 = permanen).
+        Set v6/net boleh belum ada (instalasi lama); set utama wajib ada.
+        """
+        entries: Dict[str, int] = {}
+        for name in self.sets:
+            try:
+                self._list_set(name, entries)
+            except IpsetNetlinkError:
+                if name == self.set_name:
+                    raise
+        return entries
+
+    def _list_set(self, name: str, entries: Dict[str, int]):
+        with self._lock:
+            seq = self._next_seq()
+            self._sock.sendmsg([self._msg(
+                IPSET_CMD_LIST, socket.AF_UNSPEC, NLM_F_DUMP | NLM_F_ACK,
+                self._proto_attr + self._setname_attrs[name], seq,
+            )])
+            self.sendmsgs += 1
+
+            done = False
+            while not done:
+                buf = self._sock.recv(1 << 20)
+                offset = 0
+                while offset + _NLMSGHDR.size <= len(buf):
+                    length, mtype, _flags, mseq, _pid = _NLMSGHDR.unpack_from(buf, offset)
+                    if length < _NLMSGHDR.size:
+                        break
+                    if mseq == seq:
+                        if mtype == NLMSG_DONE:
+                            done = True
+                        elif mtype == NLMSG_ERROR:
+                            (err,) = struct.unpack_from("=i", buf, offset + _NLMSGHDR.size)
+                            if err:
+                                raise IpsetNetlinkError(-err, f"ipset list {name} failed")
+                            done = True
+                        else:
+                            self._parse_list_msg(buf, offset + _NLMSGHDR.size + _NFGENMSG.size, offset + length, entries)
+                    offset += _align(length)
+
+    def _parse_list_msg(self, buf: bytes, start: int, end: int, entries: Dict[str, int]):
+        for atype, adt in _parse_attrs(buf, start, end):
+            if atype != IPSET_ATTR_ADT:
+                continue
+            for etype, elem in _parse_attrs(adt):
+                if etype != IPSET_ATTR_DATA:
+                    continue
+                addr, cidr, timeout = None, None, 0
+                for ftype, field in _parse_attrs(elem):
+                    if ftype == IPSET_ATTR_IP:
+                        for _t, raw in _parse_attrs(field):
+                            addr = ipaddress.ip_address(raw)
+                    elif ftype == IPSET_ATTR_CIDR:
+                        cidr = field[0]
+                    elif ftype == IPSET_ATTR_TIMEOUT:
+                        (timeout,) = struct.unpack(">I", field[:4])
+                if addr is None:
+                    continue
+                key = str(addr)
+                if cidr is not None and cidr != addr.max_prefixlen:
+                    key = f"{addr}/{cidr}"
+                entries[key] = timeout
+
+    def close(self):
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+def available() -> bool:
+    return hasattr(socket, "AF_NETLINK") and os.name == "posix"
@@ -0,0 +1,104 @@
+"""
+Delta encoding untuk system_metrics.
+
+Frame pertama setelah connect dan setiap SURIDASH_METRIC_KEYFRAME frame
+adalah keyframe (payload penuh). Frame lain hanya berisi leaf yang berubah
+lebih dari epsilon relatif (SURIDASH_METRIC_EPSILON) dibanding nilai yang
+terakhir DIKIRIM, bukan nilai frame sebelumnya, jadi perubahan kecil yang
+menumpuk tetap terkirim begitu melewati epsilon. Leaf yang hilang (interface
+dicabut, mount di-unmount) dikirim sebagai None.
+
+  keyframe: {"keyframe": true,  "seq": 0, "cpu": {...}, "disk": {...}, ...}
+  delta:    {"keyframe": false, "seq": 1, "network": {"interfaces": {"eth1": {"recv": 81234}}}}
+"""
+
+import os
+from typing import Dict, Tuple
+
+METRIC_EPSILON = float(os.environ.get("SURIDASH_METRIC_EPSILON", "0.05"))
+METRIC_KEYFRAME = int(os.environ.get("SURIDASH_METRIC_KEYFRAME", "12"))
+
+Path = Tuple[str, ...]
+
+
+def _flatten(obj: dict, prefix: Path = (), out: Dict[Path, object] = None) -> Dict[Path, object]:
+    if out is None:
+        out = {}
+    for key, value in obj.items():
+        path = prefix + (key,)
+        if isinstance(value, dict):
+            # dict kosong tidak punya leaf (keyframe tetap membawa {} apa adanya)
+            _flatten(value, path, out)
+        else:
+            out[path] = value
+    return out
+
+
+def _nest(flat: Dict[Path, object]) -> dict:
+    out: dict = {}
+    for path, value in flat.items():
+        node = out
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return out
+
+
+def _number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+class MetricsDelta:
+    """Encoder per koneksi: dibuat baru setiap connect, jadi frame pertama selalu keyframe."""
+
+    def __init__(self, epsilon: float = METRIC_EPSILON, keyframe_every: int = METRIC_KEYFRAME):
+        self.epsilon = max(0.0, epsilon)
+        self.keyframe_every = max(1, keyframe_every)
+        self._sent: Dict[Path, object] = {}
+        self._seq = 0
+
+        self.frames = 0
+        self.keyframes = 0
+        self.leaves_sent = 0
+        self.leaves_total = 0
+
+    def _changed(self, old, new) -> bool:
+        if _number(old) and _number(new):
+            return abs(new - old) > self.epsilon * max(abs(old), abs(new))
+        if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+            return any(self._changed(a, b) for a, b in zip(old, new))
+        return old != new
+
+    def encode(self, payload: dict) -> dict:
+        flat = _flatten(payload)
+        seq = self._seq
+        self._seq += 1
+        self.frames += 1
+        self.leaves_total += len(flat)
+
+        if seq % self.keyframe_every == 0:
+            self._sent = flat
+            self.keyframes += 1
+            self.leaves_sent += len(flat)
+            return {"keyframe": True, "seq": seq, **payload}
+
+        sent = self._sent
+        changed = {}
+        for path, value in flat.items():
+            if path not in sent or self._changed(sent[path], value):
+                changed[path] = value
+                sent[path] = value
+        for path in [p for p in sent if p not in flat]:
+            changed[path] = None
+            del sent[path]
+
+        self.leaves_sent += len(changed)
+        return {"keyframe": False, "seq": seq, **_nest(changed)}
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "leavesSent": self.leaves_sent,
+            "leavesTotal": self.leaves_total,
+        }
@@ -0,0 +1,161 @@
+"""
+Backend nftables: named set dengan timeout di table `inet <NFT_TABLE>`.
+
+Satu batch add/del dikirim sebagai satu `nft -f -`, jadi ribuan element masuk
+dalam satu transaksi atomik di kernel. IPv4 masuk ke set `<name>`, IPv6 ke
+set `<name>-v6`, prefix hasil agregasi ke `<name>-net` / `<name>-net6`
+(set interval).
+"""
+
+import json
+import os
+import re
+import subprocess
+import logging
+from typing import Dict, List
+
+from agent.core.batcher import Op
+from agent.core.firewall import FirewallBackend, set_for, set_names
+
+logger = logging.getLogger("suridash-blocker")
+
+NFT_TABLE = os.environ.get("SURIDASH_NFT_TABLE", "suridash")
+
+_ERR_LINE_RE = re.compile(r"^/dev/stdin:(\d+):", re.MULTILINE)
+
+
+def ruleset(set_name: str, default_timeout: int, table: str = NFT_TABLE) -> str:
+    """
+    Script nft untuk provisioning (dipakai `agent setup`).
+    Aman dijalankan ulang: chain di-flush sebelum rule drop ditambahkan.
+    """
+    v4, v6, net4, net6 = set_names(set_name)
+    sets = ""
+    for name, addr_type, flags in (
+        (v4, "ipv4_addr", "timeout"),
+        (v6, "ipv6_addr", "timeout"),
+        (net4, "ipv4_addr", "interval, timeout"),
+        (net6, "ipv6_addr", "interval, timeout"),
+    ):
+        sets += f"""    set {name} {{
+        type {addr_type}
+        flags {flags}
+        timeout {int(default_timeout)}s
+        size 65536
+    }}
+"""
+    return f"""table inet {table} {{
+{sets}    chain input {{
+        type filter hook input priority -10; policy accept;
+    }}
+}}
+flush chain inet {table} input
+add rule inet {table} input ip saddr @{v4} drop
+add rule inet {table} input ip6 saddr @{v6} drop
+add rule inet {table} input ip saddr @{net4} drop
+add rule inet {table} input ip6 saddr @{net6} drop
+"""
+
+
+class Nftables(FirewallBackend):
+    name = "nftables"
+
+    def __init__(self, set_name: str, table: str = NFT_TABLE, sudo: bool = True):
+        super().__init__()
+        self.set_name = set_name
+        self.table = table
+        self.prefix = ["sudo"] if sudo else []
+        self.sets = set_names(set_name)
+
+    def _set_for(self, ip: str) -> str:
+        return set_for(self.set_name, ip)
+
+    def _lines(self, op: Op) -> List[str]:
+        action, ip, timeout = op
+        target = f"inet {self.table} {self._set_for(ip)}"
+        # add (timeout pendek) + delete dulu supaya:
+        #  - delete element yang tidak ada tidak menggagalkan transaksi
+        #  - add ulang benar-benar me-refresh timeout
+        lines = [
+            f"add element {target} {{ {ip} timeout 1s }}",
+            f"delete element {target} {{ {ip} }}",
+        ]
+        if action == "add":
+            suffix = f" timeout {int(timeout)}s" if timeout else ""
+            lines.append(f"add element {target} {{ {ip}{suffix} }}")
+        return lines
+
+    def _nft(self, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        self.forks += 1
+        return subprocess.run(self.prefix + ["nft"] + args, capture_output=True, text=True, **kwargs)
+
+    def apply(self, ops: List[Op]) -> List[bool]:
+        results: List[bool] = [False] * len(ops)
+        pending = list(range(len(ops)))
+
+        while pending:
+            script, owner = [], []
+            valid = []
+            for i in pending:
+                try:
+                    lines = self._lines(ops[i])
+                except ValueError:
+                    logger.warning(f"[blocker] nft: invalid address {ops[i][1]}")
+                    continue
+                script.extend(lines)
+                owner.extend([i] * len(lines))
+                valid.append(i)
+            if not valid:
+                break
+
+            proc = self._nft(["-f", "-"], input="\n".join(script) + "\n")
+            if proc.returncode == 0:
+                for i in valid:
+                    results[i] = True
+                break
+
+            # transaksi atomik: satu baris gagal = seluruh batch batal.
+            # buang op yang bermasalah lalu ulangi sisanya.
+            bad = {owner[int(n) - 1] for n in _ERR_LINE_RE.findall(proc.stderr or "") if 0 < int(n) <= len(owner)}
+            if not bad:
+                logger.error(f"[blocker] nft transaction failed: {(proc.stderr or '').strip()}")
+                break
+            for i in bad:
+                logger.warning(f"[blocker] nft: {ops[i][1]} rejected")
+            pending = [i for i in valid if i not in bad]
+
+        return results
+
+    def test(self, ip: str) -> bool:
+        proc = self._nft(["get", "element", "inet", self.table, self._set_for(ip), f"{{ {ip} }}"])
+        if proc.returncode == 0:
+            return True
+        if "/" in ip:
+            return False
+        # alamat bisa tertutup prefix hasil agregasi di set interval
+        net = set_for(self.set_name, ip, net_set=True)
+        return self._nft(["get", "element", "inet", self.table, net, f"{{ {ip} }}"]).returncode == 0
+
+    def list_entries(self) -> Dict[str, int]:
+        entries: Dict[str, int] = {}
+        for name in self.sets:
+            proc = self._nft(["-j", "list", "set", "inet", self.table, name])
+            if proc.returncode != 0:
+                # set v6/net boleh belum ada (setup lama); set utama wajib ada
+                if name == self.set_name:
+                    raise subprocess.CalledProcessError(proc.returncode, "nft list set", proc.stdout, proc.stderr)
+                continue
+            for obj in json.loads(proc.stdout).get("nftables", []):
+                for elem in (obj.get("set") or {}).get("elem", []):
+                    # elem: "1.2.3.4" atau {"elem": {"val": "1.2.3.4", "timeout": 3600, "expires": 3512}}
+                    if isinstance(elem, dict) and "elem" in elem:
+                        inner = elem["elem"]
+                        val = inner.get("val")
+                        remaining = int(inner.get("expires") or inner.get("timeout") or 0)
+                    else:
+                        val, remaining = elem, 0
+                    if isinstance(val, dict) and "prefix" in val:
+                        val = f"{val['prefix']['addr']}/{val['prefix']['len']}"
+                    if isinstance(val, str):
+                        entries[val] = remaining
+        return entries
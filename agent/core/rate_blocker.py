@@ -0,0 +1,182 @@
+"""
+Rate-based auto-block: blokir source yang mengirim terlalu banyak alert
+(atau terlalu banyak signature berbeda) dalam sliding window.
+
+Struktur data (memori tetap walau ada jutaan source IP):
+  - count-min sketch per slot waktu (window dibagi beberapa slot, slot tertua
+    dikosongkan saat bergeser). Update konservatif untuk menekan overestimate.
+  - tabel heavy hitter terbatas: hanya source yang sudah cukup ramai di slot
+    aktif yang dilacak (estimasi window penuh + signature berbeda).
+
+Dipanggil untuk SETIAP alert sebelum dedup, karena dedup justru menyembunyikan
+volume. Alert yang melewati ambang ditandai `rate_block` dan melewati dedup
+supaya diproses block stage.
+"""
+
+import heapq
+import os
+import threading
+import time
+from array import array
+from typing import Dict, Optional
+
+RATE_BLOCK = os.environ.get("SURIDASH_RATE_BLOCK", "false").lower() == "true"
+RATE_BLOCK_WINDOW = int(os.environ.get("SURIDASH_RATE_BLOCK_WINDOW", "60"))
+RATE_BLOCK_MAX_ALERTS = int(os.environ.get("SURIDASH_RATE_BLOCK_MAX_ALERTS", "1000"))
+RATE_BLOCK_MAX_SIGNATURES = int(os.environ.get("SURIDASH_RATE_BLOCK_MAX_SIGNATURES", "20"))
+RATE_BLOCK_SKETCH_WIDTH = int(os.environ.get("SURIDASH_RATE_BLOCK_SKETCH_WIDTH", "32768"))
+RATE_BLOCK_TRACKED = int(os.environ.get("SURIDASH_RATE_BLOCK_TRACKED", "10000"))
+
+SKETCH_DEPTH = 4
+WINDOW_SLOTS = 6
+
+
+class _Source:
+    __slots__ = ("estimate", "signatures", "seen", "triggered")
+
+    def __init__(self):
+        self.estimate = 0
+        self.signatures: Dict[object, float] = {}  # signature_id -> terakhir terlihat
+        self.seen = 0.0
+        self.triggered = 0.0
+
+
+class RateTracker:
+    def __init__(
+        self,
+        window: int = RATE_BLOCK_WINDOW,
+        max_alerts: int = RATE_BLOCK_MAX_ALERTS,
+        max_signatures: int = RATE_BLOCK_MAX_SIGNATURES,
+        width: int = RATE_BLOCK_SKETCH_WIDTH,
+        tracked: int = RATE_BLOCK_TRACKED,
+        clock=time.monotonic,
+    ):
+        self.window = window
+        self.max_alerts = max(1, max_alerts)
+        self.max_signatures = max(1, max_signatures)
+        self.width = max(64, width)
+        self.tracked = max(16, tracked)
+        self._clock = clock
+
+        self.slot_seconds = window / WINDOW_SLOTS
+        self._zero = array("I", bytes(4 * self.width))
+        self._slots = [
+            [array("I", self._zero) for _ in range(SKETCH_DEPTH)]
+            for _ in range(WINDOW_SLOTS)
+        ]
+        self._slot = 0
+        self._slot_end = clock() + self.slot_seconds
+
+        # masuk tabel heavy hitter kalau ramai di slot aktif saja sudah
+        # melewati ambang ini
+        self.admit = max(1, min(self.max_alerts // (2 * WINDOW_SLOTS), self.max_signatures // 2))
+        self._sources: Dict[str, _Source] = {}
+        self._lock = threading.Lock()
+
+        self.observed = 0
+        self.triggered = 0
+
+    def _advance(self, now: float):
+        if now < self._slot_end:
+            return
+        lag = int((now - self._slot_end) // self.slot_seconds) + 1
+        for _ in range(min(lag, WINDOW_SLOTS)):
+            self._slot = (self._slot + 1) % WINDOW_SLOTS
+            for row in self._slots[self._slot]:
+                row[:] = self._zero
+        self._slot_end += lag * self.slot_seconds
+
+    def _indexes(self, ip: str):
+        h = hash(ip)
+        h1 = h & 0xFFFFFFFF
+        h2 = ((h >> 32) & 0xFFFFFFFF) | 1
+        w = self.width
+        return [(h1 + i * h2) % w for i in range(SKETCH_DEPTH)]
+
+    def _evict(self, now: float):
+        cutoff = now - self.window
+        stale = [ip for ip, src in self._sources.items() if src.seen < cutoff]
+        for ip in stale:
+            del self._sources[ip]
+        if len(self._sources) >= self.tracked:
+            # buang 10% dengan estimasi terkecil
+            n = max(1, self.tracked // 10)
+            for ip, _ in heapq.nsmallest(n, self._sources.items(), key=lambda kv: kv[1].estimate):
+                del self._sources[ip]
+
+    def observe(self, alert: dict) -> Optional[dict]:
+        """Catat satu alert. Return info pelanggaran kalau source baru saja melewati ambang."""
+        ip = alert.get("src_ip")
+        if not ip:
+            return None
+
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            self.observed += 1
+
+            idx = self._indexes(ip)
+            cur = self._slots[self._slot]
+            m = min(cur[r][i] for r, i in enumerate(idx))
+            for r, i in enumerate(idx):
+                if cur[r][i] == m:
+                    cur[r][i] = m + 1
+
+            src = self._sources.get(ip)
+            if src is None:
+                if m + 1 < self.admit:
+                    return None
+                if len(self._sources) >= self.tracked:
+                    self._evict(now)
+                src = self._sources[ip] = _Source()
+
+            src.seen = now
+            src.estimate = sum(min(sk[r][i] for r, i in enumerate(idx)) for sk in self._slots)
+
+            sid = (alert.get("alert") or {}).get("signature_id")
+            if sid is not None:
+                src.signatures[sid] = now
+            distinct = len(src.signatures)
+            if distinct >= self.max_signatures:
+                cutoff = now - self.window
+                src.signatures = {s: t for s, t in src.signatures.items() if t >= cutoff}
+                distinct = len(src.signatures)
+
+            if src.estimate < self.max_alerts and distinct < self.max_signatures:
+                return None
+            if src.triggered and now - src.triggered < self.window:
+                return None
+            src.triggered = now
+            self.triggered += 1
+            return {"alerts": src.estimate, "signatures": distinct, "window": self.window}
+
+    def stats(self) -> dict:
+        with self._lock:
+            top = heapq.nlargest(5, self._sources.items(), key=lambda kv: kv[1].estimate)
+            return {
+                "observed": self.observed,
+                "triggered": self.triggered,
+                "tracked": len(self._sources),
+                "top": [{"ip": ip, "alerts": src.estimate, "signatures": len(src.signatures)} for ip, src in top],
+            }
+
+
+_tracker = RateTracker() if RATE_BLOCK else None
+
+
+def observe_rate(alert: dict) -> bool:
+    """
+    Catat alert di tracker; kalau source melewati ambang, tandai alert dengan
+    `rate_block` dan return True (alert harus melewati dedup).
+    """
+    if _tracker is None:
+        return False
+    verdict = _tracker.observe(alert)
+    if verdict is None:
+        return False
+    alert["rate_block"] = verdict
+    return True
+
+
+def get_stats():
+    return _tracker.stats() if _tracker is not None else None
@@ -0,0 +1,199 @@
+"""
+Session: state per koneksi websocket ke dashboard.
+
+Menyimpan capability hasil negosiasi dengan server dan menjadi satu-satunya
+jalur kirim pesan, supaya encoding, framing dan statistik bytes-on-wire
+diatur di satu tempat.
+
+Negosiasi:
+  agent  -> {"type": "agent_hello", "capabilities": [...]}
+  server -> {"type": "server_hello", "capabilities": [...]}   (subset yang diterima)
+
+Server lama yang tidak membalas server_hello tetap menerima format pesan lama
+(JSON text frame).
+"""
+
+import os
+from collections import defaultdict
+
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory, PerMessageDeflate
+from websockets.frames import CTRL_OPCODES
+
+from agent.utils import codec
+
+# capability yang bisa dipakai agent
+CAP_ALERT_BATCH = "suricata_alert_batch"
+# agent_status hanya berisi field yang berubah sejak status sebelumnya
+CAP_STATUS_DELTA = "agent_status_delta"
+# system_metrics berupa keyframe + delta (lihat metrics_delta.py)
+CAP_METRICS_DELTA = "system_metrics_delta"
+# encoding biner: "encoding:msgpack" / "encoding:cbor" (kalau library-nya terpasang)
+ENCODING_PREFIX = "encoding:"
+
+# permessage-deflate
+WS_COMPRESSION = os.environ.get("SURIDASH_WS_COMPRESSION", "true").lower() == "true"
+WS_DEFLATE_WINDOW_BITS = int(os.environ.get("SURIDASH_WS_DEFLATE_WINDOW_BITS", "12"))
+WS_DEFLATE_LEVEL = int(os.environ.get("SURIDASH_WS_DEFLATE_LEVEL", "6"))
+WS_DEFLATE_MEMLEVEL = int(os.environ.get("SURIDASH_WS_DEFLATE_MEMLEVEL", "5"))
+# encoding biner yang ditawarkan ke server (kosong = JSON saja)
+WS_BINARY_ENCODING = os.environ.get("SURIDASH_WS_BINARY_ENCODING", "msgpack").lower()
+
+
+def agent_capabilities() -> list:
+    caps = [CAP_ALERT_BATCH, CAP_STATUS_DELTA, CAP_METRICS_DELTA]
+    offered = [e.strip() for e in WS_BINARY_ENCODING.split(",") if e.strip()]
+    for name in codec.binary_encodings():
+        if name in offered:
+            caps.append(ENCODING_PREFIX + name)
+    return caps
+
+
+def _frame_overhead(n: int) -> int:
+    # header websocket + masking key (client selalu masking)
+    if n < 126:
+        return 2 + 4
+    if n < 65536:
+        return 4 + 4
+    return 10 + 4
+
+
+class WireStats:
+    """Bytes per tipe pesan: sebelum kompresi (raw) dan yang benar-benar lewat kabel."""
+
+    def __init__(self):
+        self._stats = defaultdict(lambda: [0, 0, 0])  # type -> [messages, raw, wire]
+        self.tag = None
+
+    def record(self, msg_type: str, raw: int, wire: int = None):
+        st = self._stats[msg_type or "unknown"]
+        st[0] += 1
+        st[1] += raw
+        if wire is not None:
+            st[2] += wire
+
+    def add_wire(self, msg_type: str, wire: int):
+        self._stats[msg_type or "unknown"][2] += wire
+
+    def snapshot(self) -> dict:
+        out = {}
+        for t, (n, raw, wire) in self._stats.items():
+            out[t] = {
+                "messages": n,
+                "rawBytes": raw,
+                "wireBytes": wire,
+                "ratio": round(wire / raw, 3) if raw else None,
+            }
+        return out
+
+
+class _CountingDeflate(PerMessageDeflate):
+    """PerMessageDeflate yang mencatat ukuran frame setelah kompresi."""
+
+    def __init__(self, *args, wire_stats: WireStats = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wire_stats = wire_stats
+
+    def encode(self, frame):
+        out = super().encode(frame)
+        if self.wire_stats is not None and frame.opcode not in CTRL_OPCODES:
+            # ws.send() sampai encode() tidak pernah yield selama koneksi terbuka,
+            # jadi tag masih milik pesan ini
+            self.wire_stats.add_wire(self.wire_stats.tag, len(out.data) + _frame_overhead(len(out.data)))
+        return out
+
+
+class _CountingDeflateFactory(ClientPerMessageDeflateFactory):
+    def __init__(self, wire_stats: WireStats, **kwargs):
+        super().__init__(**kwargs)
+        self.wire_stats = wire_stats
+
+    def process_response_params(self, params, accepted_extensions):
+        # validasi parameter hasil negosiasi tetap oleh factory bawaan
+        ext = super().process_response_params(params, accepted_extensions)
+        return _CountingDeflate(
+            ext.remote_no_context_takeover,
+            ext.local_no_context_takeover,
+            ext.remote_max_window_bits,
+            ext.local_max_window_bits,
+            ext.compress_settings,
+            wire_stats=self.wire_stats,
+        )
+
+
+def build_extensions(wire_stats: WireStats):
+    """Extension websocket untuk connect(); None = tanpa kompresi."""
+    if not WS_COMPRESSION:
+        return None
+    bits = min(15, max(9, WS_DEFLATE_WINDOW_BITS))
+    return [
+        _CountingDeflateFactory(
+            wire_stats,
+            server_max_window_bits=bits,
+            client_max_window_bits=bits,
+            compress_settings={"level": WS_DEFLATE_LEVEL, "memLevel": WS_DEFLATE_MEMLEVEL},
+        )
+    ]
+
+
+class Session:
+    def __init__(self, ws, wire_stats: WireStats = None):
+        self.ws = ws
+        self.capabilities = set()
+        self.encoding = "json"
+        self._binary = None  # (dumps, loads) kalau encoding biner aktif
+        self.wire_stats = wire_stats or WireStats()
+        self.compressed = any(isinstance(e, PerMessageDeflate) for e in getattr(ws, "extensions", []))
+
+    def supports(self, cap: str) -> bool:
+        return cap in self.capabilities
+
+    @property
+    def closed(self) -> bool:
+        # termasuk state CLOSING: send() sudah pasti gagal
+        return not self.ws.open
+
+    @property
+    def binary(self) -> bool:
+        return self._binary is not None
+
+    async def hello(self):
+        await self.send({"type": "agent_hello", "capabilities": agent_capabilities()})
+
+    def on_server_hello(self, data: dict):
+        offered = agent_capabilities()
+        accepted = data.get("capabilities") or []
+        self.capabilities = {c for c in accepted if c in offered}
+
+        for cap in accepted:
+            if cap in self.capabilities and cap.startswith(ENCODING_PREFIX):
+                name = cap[len(ENCODING_PREFIX):]
+                self._binary = codec.get_binary(name)
+                if self._binary:
+                    self.encoding = name
+                    break
+
+    def decode(self, message):
+        if isinstance(message, bytes) and self._binary:
+            return self._binary[1](message)
+        return codec.loads(message)
+
+    async def send(self, payload: dict):
+        if self._binary:
+            await self._write(True, self._binary[0](payload), payload.get("type"))
+        else:
+            await self._write(False, codec.dumps(payload), payload.get("type"))
+
+    async def send_raw(self, data: bytes, msg_type: str = None):
+        """Kirim JSON yang sudah di-encode sebagai text frame."""
+        await self._write(False, data, msg_type)
+
+    async def _write(self, binary: bool, data: bytes, msg_type: str = None):
+        stats = self.wire_stats
+        stats.tag = msg_type
+        if self.compressed:
+            stats.record(msg_type, len(data))  # wire dicatat oleh extension deflate
+        else:
+            stats.record(msg_type, len(data), len(data) + _frame_overhead(len(data)))
+
+        # bytes -> binary frame, str -> text frame
+        await self.ws.send(data if binary else data.decode("utf-8"))
@@ -0,0 +1,366 @@
+"""
+AlertSpool: antrian alert di disk untuk saat websocket putus / alert_queue penuh.
+
+Format: deretan file segment berukuran tetap (`seg-<id>.spool`) yang di-mmap.
+Setiap record = header (panjang, crc32) + payload. Writer hanya append ke
+segment terakhir; reader membaca dari segment tertua dan menghapus segment
+yang sudah habis dibaca. Kalau jumlah segment melewati batas disk, segment
+tertua dibuang (alert-nya hilang, tercatat di `dropped`).
+
+Segment di-mmap sesuai ukuran file-nya, jadi segment dari run dengan
+SURIDASH_SPOOL_SEGMENT_MB berbeda tetap terbaca; writer selalu mulai di
+segment baru kalau ukuran segment terakhir tidak sama dengan setting sekarang.
+
+fsync tidak dilakukan per record: thread sync mem-flush segment aktif dan
+posisi reader (file `cursor`) tiap interval. Setelah crash, record terakhir
+yang belum ter-flush bisa hilang dan record yang sudah dibaca tapi cursor-nya
+belum tersimpan bisa terkirim ulang.
+
+Memori tetap datar berapapun lama outage: yang terbuka hanya mmap segment
+writer dan reader.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger("suridash-agent")
+
+SPOOL = os.environ.get("SURIDASH_SPOOL", "true").lower() == "true"
+SPOOL_DIR = os.environ.get("SURIDASH_SPOOL_DIR", "/var/lib/suridash/spool")
+SPOOL_MAX_MB = int(os.environ.get("SURIDASH_SPOOL_MAX_MB", "256"))
+SPOOL_SEGMENT_MB = int(os.environ.get("SURIDASH_SPOOL_SEGMENT_MB", "8"))
+SPOOL_FSYNC_MS = int(os.environ.get("SURIDASH_SPOOL_FSYNC_MS", "1000"))
+# laju replay setelah reconnect (alert/detik)
+SPOOL_REPLAY_RATE = int(os.environ.get("SURIDASH_SPOOL_REPLAY_RATE", "200"))
+
+_HDR = struct.Struct("<II")  # panjang payload, crc32 payload
+_CURSOR = struct.Struct("<QQ")  # segment id, offset
+
+
+class _Segment:
+    def __init__(self, path: str, size: int = 0, create: bool = False):
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        self.fd = os.open(path, flags, 0o600)
+        try:
+            if create:
+                os.ftruncate(self.fd, size)  # sparse, blok disk terpakai sesuai isi
+            # panjang 0 = seluruh file (ValueError kalau file kosong)
+            self.mm = mmap.mmap(self.fd, 0)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def close(self):
+        self.mm.close()
+        os.close(self.fd)
+
+
+def _read_record(mm, off: int):
+    """Return (payload, next_offset) atau None kalau akhir data / record rusak."""
+    end = len(mm)
+    if off + _HDR.size > end:
+        return None
+    n, crc = _HDR.unpack_from(mm, off)
+    start = off + _HDR.size
+    if n == 0 or start + n > end:
+        return None
+    payload = mm[start:start + n]
+    if zlib.crc32(payload) != crc:
+        return None
+    return payload, start + n
+
+
+def _count_records(mm, off: int):
+    """Return (jumlah record, offset akhir data) mulai dari `off`."""
+    n = 0
+    while True:
+        rec = _read_record(mm, off)
+        if rec is None:
+            return n, off
+        n += 1
+        off = rec[1]
+
+
+class AlertSpool:
+    def __init__(
+        self,
+        directory: str = SPOOL_DIR,
+        max_bytes: int = SPOOL_MAX_MB * 1024 * 1024,
+        segment_bytes: int = SPOOL_SEGMENT_MB * 1024 * 1024,
+        fsync_interval: float = SPOOL_FSYNC_MS / 1000,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.dir = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max(2, max_bytes // segment_bytes)
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._cursor_dirty = False
+        self._sync_fds = []  # fd (dup) segment lama yang belum di-fsync
+        self._victims = []  # (fd, offset) segment yang dibuang, record-nya belum dihitung
+        self._stop = threading.Event()
+
+        self.pending = 0
+        self.appended = 0
+        self.replayed = 0
+        self.dropped = 0
+
+        self._open()
+
+        self._thread = threading.Thread(target=self._sync_loop, name="suridash-spool-sync", daemon=True)
+        self._thread.start()
+
+    # ---------- layout ----------
+    def _path(self, seg_id: int) -> str:
+        return os.path.join(self.dir, f"seg-{seg_id:016d}.spool")
+
+    def _segments(self) -> List[int]:
+        ids = []
+        for name in os.listdir(self.dir):
+            if name.startswith("seg-") and name.endswith(".spool"):
+                try:
+                    ids.append(int(name[4:-6]))
+                except ValueError:
+                    pass
+        return sorted(ids)
+
+    def _count(self, seg_id: int, off: int = 0):
+        """Return (jumlah record, offset akhir data) di segment mulai dari `off`."""
+        seg = _Segment(self._path(seg_id))
+        try:
+            return _count_records(seg.mm, off)
+        finally:
+            seg.close()
+
+    def _open(self):
+        segs = []
+        for seg_id in self._segments():
+            if os.path.getsize(self._path(seg_id)) == 0:
+                # crash sebelum ftruncate: tidak berisi apa-apa dan tidak bisa di-mmap
+                os.unlink(self._path(seg_id))
+            else:
+                segs.append(seg_id)
+        read_seg, read_off = self._load_cursor()
+
+        if not segs:
+            segs = [read_seg]
+            _Segment(self._path(read_seg), self.segment_bytes, create=True).close()
+            read_off = 0
+        elif read_seg not in segs:
+            # cursor hilang / segment-nya sudah dibuang
+            read_seg, read_off = segs[0], 0
+
+        # hitung backlog + posisi tulis di segment terakhir
+        write_off = 0
+        for seg_id in segs:
+            if seg_id < read_seg:
+                os.unlink(self._path(seg_id))  # sisa yang sudah terbaca
+                continue
+            n, write_off = self._count(seg_id, read_off if seg_id == read_seg else 0)
+            self.pending += n
+
+        self._rseg_id, self._roff, self._rseg = read_seg, read_off, None
+        self._wseg_id = segs[-1]
+        self._woff = max(write_off, read_off if read_seg == segs[-1] else 0)
+        if os.path.getsize(self._path(self._wseg_id)) != self.segment_bytes:
+            # ukuran segment berubah sejak run sebelumnya: segment lama dibaca
+            # apa adanya, tulisan baru masuk segment dengan ukuran sekarang
+            self._wseg_id += 1
+            self._woff = 0
+            _Segment(self._path(self._wseg_id), self.segment_bytes, create=True).close()
+        self._wseg = _Segment(self._path(self._wseg_id))
+
+        if self.pending:
+            logger.info(f"Alert spool: {self.pending} alerts pending from previous run")
+
+    def _load_cursor(self):
+        try:
+            with open(os.path.join(self.dir, "cursor"), "rb") as f:
+                return _CURSOR.unpack(f.read(_CURSOR.size))
+        except (OSError, struct.error):
+            return 0, 0
+
+    def _write_cursor(self, seg_id: int, off: int):
+        path = os.path.join(self.dir, "cursor")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_CURSOR.pack(seg_id, off))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # ---------- writer ----------
+    def append(self, data: bytes) -> bool:
+        n = len(data)
+        if _HDR.size + n > self.segment_bytes:
+            self.dropped += 1
+            return False
+
+        with self._lock:
+            if self._woff + _HDR.size + n > self.segment_bytes:
+                self._rotate()
+            mm = self._wseg.mm
+            start = self._woff + _HDR.size
+            # payload dulu, header terakhir: record setengah jadi tidak lolos crc
+            mm[start:start + n] = data
+            _HDR.pack_into(mm, self._woff, n, zlib.crc32(data))
+            self._woff = start + n
+            self.appended += 1
+            self.pending += 1
+            self._dirty = True
+        return True
+
+    def _rotate(self):
+        old = self._wseg
+        self._sync_fds.append(os.dup(old.fd))
+        old.close()
+
+        self._wseg_id += 1
+        self._wseg = _Segment(self._path(self._wseg_id), self.segment_bytes, create=True)
+        self._woff = 0
+
+        # batas disk: buang segment tertua. File langsung di-unlink, record yang
+        # hilang dihitung belakangan lewat reap() (scan segment terlalu mahal
+        # untuk dijalankan di dalam append)
+        segs = self._segments()
+        while len(segs) > self.max_segments:
+            victim = segs.pop(0)
+            unread, off = victim >= self._rseg_id, 0
+            if victim == self._rseg_id:
+                if self._rseg is not None:
+                    self._rseg.close()
+                    self._rseg = None
+                off = self._roff
+                self._rseg_id, self._roff = segs[0], 0
+                self._cursor_dirty = True
+            path = self._path(victim)
+            if unread:
+                try:
+                    self._victims.append((os.open(path, os.O_RDONLY), off))
+                except OSError:
+                    pass
+            os.unlink(path)
+
+    @property
+    def reap_pending(self) -> bool:
+        return bool(self._victims)
+
+    def reap(self):
+        """Hitung record di segment yang dibuang _rotate (jalankan di luar event loop)."""
+        while True:
+            with self._lock:
+                victims, self._victims = self._victims, []
+            if not victims:
+                return
+            self._reap(victims)
+
+    def _reap(self, victims):
+        for fd, off in victims:
+            try:
+                mm = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+                try:
+                    lost, _ = _count_records(mm, off)
+                finally:
+                    mm.close()
+            except ValueError:
+                lost = 0  # file kosong
+            finally:
+                os.close(fd)
+            with self._lock:
+                self.pending -= lost
+                self.dropped += lost
+            logger.warning(f"Alert spool full, dropped oldest segment ({lost} alerts)")
+
+    # ---------- reader ----------
+    def read(self, max_items: int) -> List[bytes]:
+        out = []
+        with self._lock:
+            while len(out) < max_items:
+                if self._rseg is None:
+                    self._rseg = _Segment(self._path(self._rseg_id))
+                rec = _read_record(self._rseg.mm, self._roff)
+                if rec is None:
+                    if self._rseg_id >= self._wseg_id:
+                        break  # sudah menyusul writer
+                    # segment habis dibaca -> hapus, lanjut ke berikutnya
+                    self._rseg.close()
+                    self._rseg = None
+                    os.unlink(self._path(self._rseg_id))
+                    self._rseg_id += 1
+                    self._roff = 0
+                    continue
+                out.append(rec[0])
+                self._roff = rec[1]
+
+            if out:
+                self.pending -= len(out)
+                self.replayed += len(out)
+                self._cursor_dirty = True
+        return out
+
+    # ---------- durability ----------
+    def sync(self):
+        with self._lock:
+            fds, self._sync_fds = self._sync_fds, []
+            if self._dirty:
+                fds.append(os.dup(self._wseg.fd))
+                self._dirty = False
+            cursor = (self._rseg_id, self._roff) if self._cursor_dirty else None
+            self._cursor_dirty = False
+
+        for fd in fds:
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        if cursor:
+            self._write_cursor(*cursor)
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Alert spool sync error: {e}")
+
+    def close(self):
+        self._stop.set()
+        self.reap()
+        self.sync()
+        with self._lock:
+            if self._rseg is not None:
+                self._rseg.close()
+                self._rseg = None
+            self._wseg.close()
+
+    def __len__(self) -> int:
+        return self.pending
+
+    def stats(self) -> dict:
+        with self._lock:
+            segments = self._wseg_id - self._rseg_id + 1
+        return {
+            "pending": self.pending,
+            "appended": self.appended,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "segments": segments,
+            "maxBytes": self.max_segments * self.segment_bytes,
+        }
+
+
+def open_spool() -> Optional[AlertSpool]:
+    if not SPOOL:
+        return None
+    try:
+        return AlertSpool()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Alert spool disabled ({SPOOL_DIR}): {e}")
+        return None
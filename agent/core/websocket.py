@@ -1,54 +1,101 @@
 import asyncio
-import json
+import os
 import time
 import websockets
 import threading
 
-from agent.core.blocker import block_ip, is_ip_blocked, unblock_ip
-from agent.core.auto_blocker import auto_block_from_alert, AUTO_BLOCK_TIMEOUT
+from agent.core.blocker import block_ip, unblock_ip, get_stats as blocker_stats
+from agent.core.auto_blocker import AUTO_BLOCK_TIMEOUT
+from agent.core.rate_blocker import observe_rate, get_stats as rate_block_stats
+from agent.core.block_stage import BlockStage
+from agent.core.alert_batch import ALERT_BATCH, AlertBatcher
+from agent.core.alert_lanes import LaneQueue
+from agent.core.session import CAP_ALERT_BATCH, CAP_METRICS_DELTA, CAP_STATUS_DELTA, Session, WireStats, build_extensions
+from agent.core.metrics_delta import MetricsDelta
+from agent.core.spool import SPOOL_REPLAY_RATE, open_spool
 from agent.collectors.cpu import collect as cpu
 from agent.collectors.memory import collect as memory
 from agent.collectors.disk import collect as disk
 from agent.collectors.network import collect as network
-from agent.collectors.suricata import collect as suricata
+from agent.collectors.sampler import get_sampler
+from agent.collectors.suricata import collect as suricata, observe_stats
+from agent.collectors.suricata_sc import SuricataCommandError, SuricataSocket, query_status, socket_available
+from agent.collectors.suricata_stats import STATS_INTERVAL, SURICATA_STATS, drain_counters, observe_counters, get_stats as suricata_stats_stats
 from agent.collectors.system import collect as system_info
 from agent.collectors.suricata_alerts import tail_eve_alerts
-from agent.utils.deduper import dedup_allow, fingerprint_suricata_alert
+from agent.collectors.eve_pool import EVE_WORKERS, EvePool
+from agent.collectors.eve_socket import EVE_SOCKET, serve_eve_socket
+from agent.utils.deduper import dedup_allow, dedup_summaries, fingerprint_suricata_alert
+from agent.utils import codec
 
 METRIC_INTERVAL = 5  # detik
 STATUS_INTERVAL = 10  # detik
+# dengan agent_status_delta: status penuh tiap N kiriman, sisanya hanya yang berubah
+STATUS_FULL_EVERY = 30
+# interval kirim ringkasan alert yang terdeduplikasi
+SUMMARY_INTERVAL = int(os.environ.get("SURIDASH_DEDUP_SUMMARY_INTERVAL", "10"))
 
-alert_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+# antrian alert per prioritas (critical/high/low), lihat alert_lanes.py
+alert_queue = LaneQueue()
 _tail_thread_started = False
+_eve_socket_server = None
+
+# Maksimal alert yang sedang menunggu block stage sekaligus
+ALERT_CONCURRENCY = int(os.environ.get("SURIDASH_ALERT_CONCURRENCY", "256"))
+_block_stage = None
+
+# alert yang tidak muat di alert_queue (misal websocket putus) masuk ke sini
+_spool = None
+_spool_reap = None  # task yang menghitung segment spool yang dibuang
+
+# bytes-on-wire per tipe pesan, akumulasi lintas reconnect
+_wire_stats = WireStats()
+
+# koneksi ke unix command socket Suricata (kalau ada), dipakai ulang antar status
+_suricatasc = None
+_suricatasc_failing = False  # error socket dicatat sekali per perubahan keadaan
+# kapan dump-counters terakhir masuk ke counter store (monotonic)
+_socket_counters_at = None
 
 def collect_metrics():
+    # ringkasan dari ring buffer sampler, tidak ada pembacaan psutil di event loop
+    window = get_sampler().window(METRIC_INTERVAL)
     return {
-        "cpu": cpu(),
-        "memory": memory(),
-        "disk": disk(),
-        "network": network(),
+        "cpu": cpu(window),
+        "memory": memory(window),
+        "disk": disk(window),
+        "network": network(window),
     }
 
 
-async def send_metrics(ws, logger):
+async def send_metrics(session, logger):
     """Task: kirim metrics periodik"""
+    # state delta per koneksi: frame pertama selalu keyframe
+    encoder = MetricsDelta()
     while True:
+        metrics = collect_metrics()
+        if session.supports(CAP_METRICS_DELTA):
+            metrics = encoder.encode(metrics)
         payload = {
             "type": "system_metrics",
-            "payload": collect_metrics(),
+            "payload": metrics,
             "timestamp": int(time.time()),
         }
         logger.info("Sent system metrics")
-        await ws.send(json.dumps(payload))
+        await session.send(payload)
         await asyncio.sleep(METRIC_INTERVAL)
 
 
-async def handle_messages(ws, logger):
+async def handle_messages(session, logger):
     """Task: terima command dari server"""
-    async for message in ws:
-        data = json.loads(message)
+    async for message in session.ws:
+        data = session.decode(message)
 
-        if data.get("type") == "block_ip":
+        if data.get("type") == "server_hello":
+            session.on_server_hello(data)
+            logger.info(f"Server capabilities: {sorted(session.capabilities) or 'none'} (encoding: {session.encoding})")
+
+        elif data.get("type") == "block_ip":
             ip = data.get("ip")
             duration = int(data.get("duration", 3600))
             severity = data.get("severity")
@@ -56,13 +103,13 @@ async def handle_messages(ws, logger):
 
             # Optional: double-check severity di agent juga
             if severity is not None and int(severity) > 2:
-                await ws.send(json.dumps({
+                await session.send({
                     "type": "block_ip_ack",
                     "ip": ip,
                     "ok": False,
                     "error": "severity too low",
                     "reason": reason,
-                }))
+                })
                 continue
 
             # Jalankan block_ip di thread supaya tidak blocking event loop
@@ -70,23 +117,23 @@ async def handle_messages(ws, logger):
                 ok = await asyncio.to_thread(block_ip, ip, duration)
                 logger.warning(f"Blocked IP {ip} for {duration}s (ok={ok}, reason={reason})")
 
-                await ws.send(json.dumps({
+                await session.send({
                     "type": "block_ip_ack",
                     "ip": ip,
                     "duration": duration,
                     "ok": bool(ok),
                     "reason": reason,
-                }))
+                })
             except Exception as e:
                 logger.error(f"Block IP failed: {e}")
-                await ws.send(json.dumps({
+                await session.send({
                     "type": "block_ip_ack",
                     "ip": ip,
                     "duration": duration,
                     "ok": False,
                     "error": str(e),
                     "reason": reason,
-                }))
+                })
 
         elif data.get("type") == "unblock_ip":
             ip = data.get("ip")
@@ -94,68 +141,288 @@ async def handle_messages(ws, logger):
             try:
                 ok = await asyncio.to_thread(unblock_ip, ip)
                 logger.warning(f"Unblocked IP {ip} (ok={ok})")
-                await ws.send(json.dumps({
+                await session.send({
                     "type": "unblock_ip_ack",
                     "ip": ip,
                     "ok": bool(ok),
-                }))
+                })
             except Exception as e:
-                await ws.send(json.dumps({
+                await session.send({
                     "type": "unblock_ip_ack",
                     "ip": ip,
                     "ok": False,
                     "error": str(e),
-                }))
-
-
-async def send_agent_status(ws, logger):
+                })
+
+
+def _status_delta(prev: dict, cur: dict) -> dict:
+    """Field yang berubah per section (dua level); field yang hilang dikirim None."""
+    out = {}
+    for section, value in cur.items():
+        old = prev.get(section)
+        if value == old:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict):
+            changed = {k: v for k, v in value.items() if old.get(k) != v}
+            changed.update({k: None for k in old if k not in value})
+            out[section] = changed
+        else:
+            out[section] = value
+    return out
+
+
+async def send_agent_status(session, logger):
+    last = None  # status penuh terakhir yang sudah dikirim (per koneksi)
+    sent = 0
     while True:
         logger.info("Fetching agent status...")
+        status = _collect_status(session, await _suricata_status(logger))
+
+        if session.supports(CAP_STATUS_DELTA):
+            full = last is None or sent % STATUS_FULL_EVERY == 0
+            body = dict(status) if full else _status_delta(last, status)
+            body["delta"] = not full
+            last = status
+            sent += 1
+        else:
+            body = status
+
         payload = {
             "type": "agent_status",
-            "payload": {
-                "suricata": suricata(),
-                "system": system_info(),
-            },
+            "payload": body,
             "timestamp": int(time.time()),
         }
 
         logger.info("Sent agent status payload")
 
-        await ws.send(json.dumps(payload))
-        await asyncio.sleep(STATUS_INTERVAL)  
+        await session.send(payload)
+        await asyncio.sleep(STATUS_INTERVAL)
+
+
+async def _suricata_status(logger) -> dict:
+    """Status dari file/proc, dilengkapi data command socket kalau tersedia."""
+    global _suricatasc, _suricatasc_failing, _socket_counters_at
+    # collector Suricata bisa fork `suricata -V` (sekali setelah upgrade)
+    status = await asyncio.to_thread(suricata)
+    if not socket_available():
+        return status
+
+    if _suricatasc is None:
+        _suricatasc = SuricataSocket()
+    try:
+        fields, counters = await query_status(_suricatasc)
+    except (OSError, EOFError, asyncio.TimeoutError, SuricataCommandError, ValueError) as e:
+        if not _suricatasc_failing:
+            logger.warning(f"Suricata command socket unavailable: {e!r}")
+        _suricatasc_failing = True
+        return status
+    if _suricatasc_failing:
+        logger.info("Suricata command socket available again")
+    _suricatasc_failing = False
+
+    status.update(fields)
+    if counters:
+        _socket_counters_at = time.monotonic()
+        observe_stats({"stats": counters})
+        observe_counters({"stats": counters})
+    return status
+
+
+def _collect_status(session, suricata_status: dict) -> dict:
+    return {
+        "suricata": suricata_status,
+        "system": system_info(),
+        "blocker": blocker_stats(),
+        "rateBlock": rate_block_stats(),
+        "suricataStats": suricata_stats_stats(),
+        "suricataSocket": _suricatasc.stats() if _suricatasc is not None else None,
+        "alertQueue": alert_queue.stats(),
+        "spool": _spool.stats() if _spool is not None else None,
+        "transport": {
+            "encoding": session.encoding,
+            "compression": session.compressed,
+            "messages": _wire_stats.snapshot(),
+        },
+    }
 
 
 # =========================
 # SURICATA ALERT PIPELINE
 # =========================
-def suricata_tail_worker(config, eve_path, logger, loop):
-    logger.info(f"Suricata tail worker started ({eve_path})")
+def _on_stats(event: dict):
+    # event stats Suricata: rulesLoaded untuk status + counter store (suricata_stats)
+    observe_stats(event)
+    # kalau dump-counters dari command socket sedang dipakai, event dari file
+    # (yang bisa tertinggal) tidak dicampur ke counter store
+    if _socket_counters_at is None or time.monotonic() - _socket_counters_at > 2 * STATUS_INTERVAL:
+        observe_counters(event)
+
+
+def _fingerprinted_alerts(eve_path, bucket_sec):
+    for alert in tail_eve_alerts(eve_path, on_stats=_on_stats):
+        yield fingerprint_suricata_alert(alert, bucket_seconds=bucket_sec), alert
+
+
+def _enqueue_alert(alert: dict, logger):
+    # antrian penuh -> alert prioritas terendah yang terbuang
+    evicted = alert_queue.put_nowait(alert)
+    if evicted is None:
+        return
+    if _spool is None:
+        logger.warning("Alert queue full, dropping lowest-priority alert")
+        return
+    if not _spool.pending:
+        logger.warning("Alert queue full, spooling alerts to disk")
+    _spool_append(evicted)
+
+
+def _spool_append(alert: dict):
+    global _spool_reap
+    _spool.append(codec.dumps(alert))
+    if _spool.reap_pending and (_spool_reap is None or _spool_reap.done()):
+        # spool penuh: scan segment yang dibuang di thread, bukan di event loop
+        _spool_reap = asyncio.ensure_future(asyncio.to_thread(_spool.reap))
+
+
+def _return_alerts(alerts, logger):
+    """
+    Alert yang sudah keluar dari alert_queue tapi tidak (pasti) terkirim:
+    masuk spool kalau ada, kalau tidak kembali ke alert_queue untuk koneksi
+    berikutnya.
+    """
+    if _spool is not None:
+        for alert in alerts:
+            _spool_append(alert)
+        logger.warning(f"Spooled {len(alerts)} unsent alerts")
+        return
+    for alert in alerts:
+        if alert_queue.put_nowait(alert) is not None:
+            logger.warning("Alert queue full, dropping lowest-priority alert")
+
+
+async def replay_spool(logger):
+    """Task: kirim ulang alert dari spool dengan laju terbatas setelah reconnect."""
+    interval = 0.1
+    per_tick = max(1, int(SPOOL_REPLAY_RATE * interval))
+    # alert live didahulukan: replay hanya mengisi separuh kosong alert_queue
+    low_water = alert_queue.maxsize // 2
 
-    for alert in tail_eve_alerts(eve_path):
-        try:
-            src_ip = alert.get("src_ip")
+    while True:
+        await asyncio.sleep(interval)
+        room = min(per_tick, low_water - alert_queue.qsize())
+        if room <= 0 or not _spool.pending:
+            continue
 
-            # ✅ DEDUP: kalau fingerprint sudah pernah dikirim -> skip
-            bucket_sec = config.get("DEDUP_BUCKET", 20)
-            ttl_sec = config.get("DEDUP_TTL", 25)
-            key = fingerprint_suricata_alert(alert, bucket_seconds=bucket_sec)
-            if not dedup_allow(key, ttl_seconds=ttl_sec):
-                sig_name = (alert.get("alert") or {}).get("signature", "unknown")
-                logger.info(f"Alert deduplicated/delayed: {sig_name}")
+        for data in _spool.read(room):
+            try:
+                evicted = alert_queue.put_nowait(codec.loads(data))
+            except ValueError as e:
+                logger.error(f"Corrupt spooled alert skipped: {e}")
                 continue
+            if evicted is not None:
+                _spool_append(evicted)
+
+        if not _spool.pending:
+            logger.info("Alert spool drained")
+
+
+def _dedup_pass(key, alert: dict, ttl_sec: int, logger) -> bool:
+    # ✅ DEDUP: kalau fingerprint sudah pernah dikirim -> skip
+    # duplikat dihitung per fingerprint dan dikirim sebagai suricata_alert_summary
+    if not dedup_allow(key, ttl_seconds=ttl_sec, alert=alert):
+        sig_name = (alert.get("alert") or {}).get("signature", "unknown")
+        logger.debug(f"Alert deduplicated/delayed: {sig_name}")
+        return False
+    return True
+
+
+def _build_summary_payload(key, entry) -> dict:
+    src_ip, dest_ip, proto, dest_port, sig_id, _rev, severity, category, _bucket = key
+    return {
+        "signature": entry.signature,
+        "signatureId": sig_id,
+        "srcIp": src_ip,
+        "destIp": dest_ip,
+        "destPort": dest_port,
+        "protocol": proto,
+        "category": category,
+        "severity": severity,
+        "count": entry.count,
+        "firstSeen": entry.first,
+        "lastSeen": entry.last,
+        "srcPorts": sorted(entry.ports or ()),
+    }
 
-            def _enqueue(a=alert):
-                try:
-                    alert_queue.put_nowait(a)
-                except asyncio.QueueFull:
-                    logger.warning("Alert queue full, dropping alert")
 
-            loop.call_soon_threadsafe(_enqueue)
+async def send_alert_summaries(session, logger):
+    """Task: kirim ringkasan alert yang di-suppress dedup (per fingerprint yang sudah expired)."""
+    while True:
+        await asyncio.sleep(SUMMARY_INTERVAL)
+        summaries = dedup_summaries()
+        if not summaries:
+            continue
+        payload = [_build_summary_payload(k, e) for k, e in summaries]
+        await session.send({
+            "type": "suricata_alert_summary",
+            "payload": payload,
+            "timestamp": int(time.time()),
+        })
+        logger.info(
+            f"Sent Suricata alert summary: {len(payload)} fingerprints, "
+            f"{sum(p['count'] for p in payload)} suppressed alerts"
+        )
+
+
+async def send_suricata_stats(session, logger):
+    """Task: kirim delta counter Suricata (whitelist) per interval."""
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+        payload = drain_counters()
+        if payload is None:
+            continue
+        await session.send({
+            "type": "suricata_stats",
+            "payload": payload,
+            "timestamp": int(time.time()),
+        })
+        logger.debug(f"Sent Suricata stats: {len(payload['counters'])} counters over {payload['interval']}s")
+
 
+def suricata_tail_worker(config, eve_path, logger, loop):
+    bucket_sec = config.get("DEDUP_BUCKET", 20)
+    ttl_sec = config.get("DEDUP_TTL", 25)
+
+    if EVE_WORKERS > 0:
+        logger.info(f"Suricata tail worker started ({eve_path}, {EVE_WORKERS} parser processes)")
+        source = EvePool(eve_path, EVE_WORKERS, bucket_sec, on_stats=_on_stats).alerts()
+    else:
+        logger.info(f"Suricata tail worker started ({eve_path})")
+        source = _fingerprinted_alerts(eve_path, bucket_sec)
+
+    for key, alert in source:
+        try:
+            # rate tracker melihat semua alert; yang melewati ambang tidak di-dedup
+            if observe_rate(alert) or _dedup_pass(key, alert, ttl_sec, logger):
+                loop.call_soon_threadsafe(_enqueue_alert, alert, logger)
         except Exception as e:
             logger.error(f"Queue error: {e}")
 
+
+async def start_eve_socket(config, logger):
+    """Ingestion lewat unix socket: dedup + enqueue langsung di event loop."""
+    bucket_sec = config.get("DEDUP_BUCKET", 20)
+    ttl_sec = config.get("DEDUP_TTL", 25)
+
+    def on_alert(alert: dict):
+        try:
+            key = fingerprint_suricata_alert(alert, bucket_seconds=bucket_sec)
+            if observe_rate(alert) or _dedup_pass(key, alert, ttl_sec, logger):
+                _enqueue_alert(alert, logger)
+        except Exception as e:
+            logger.error(f"Queue error: {e}")
+
+    return await serve_eve_socket(EVE_SOCKET, on_alert, on_stats=_on_stats)
+
 def _build_alert_payload(alert: dict, is_blocked: bool = False) -> dict:
     # lebih aman: pakai get() agar tidak KeyError
     a = alert.get("alert") or {}
@@ -174,50 +441,111 @@ def _build_alert_payload(alert: dict, is_blocked: bool = False) -> dict:
         "duration": AUTO_BLOCK_TIMEOUT if is_blocked else 0,
     }
 
-async def send_suricata_alerts(ws, logger):
-    while True:
-        alert = await alert_queue.get()
+async def _process_alert(session, logger, alert: dict, batcher=None):
+    src_ip = alert.get("src_ip")
+
+    # Cek status IP + auto-block di block stage (thread pool, coalesce per IP)
+    already_blocked, just_blocked = await _block_stage.process(alert)
 
+    # 🛡️ AUTO-BLOCK: blokir IP jika severity <= threshold
+    if just_blocked:
+        a = alert.get("alert") or {}
+        rate = alert.get("rate_block")
+        if rate:
+            reason = f"rate: {rate['alerts']} alerts, {rate['signatures']} signatures in {rate['window']}s"
+        else:
+            reason = a.get("signature")
         try:
-            src_ip = alert.get("src_ip")
-
-            # Cek apakah IP sudah dalam keadaan terblokir sebelumnya
-            already_blocked = is_ip_blocked(src_ip) if src_ip else False
-
-            # 🛡️ AUTO-BLOCK: blokir IP jika severity <= threshold
-            just_blocked = await asyncio.to_thread(auto_block_from_alert, alert)
-            if just_blocked:
-                a = alert.get("alert") or {}
-                try:
-                    await ws.send(json.dumps({
-                        "type": "block_ip_ack",
-                        "ip": src_ip,
-                        "duration": AUTO_BLOCK_TIMEOUT,
-                        "ok": True,
-                        "severity": a.get("severity"),
-                        "signature": a.get("signature"),
-                        "reason": a.get("signature"),
-                    }))
-                    logger.info(f"Sent block_ip_ack for auto-blocked {src_ip} (reason={a.get('signature')})")
-                except Exception as e:
-                    logger.error(f"Failed to send block_ip_ack: {e}")
-
-            is_now_blocked = already_blocked or just_blocked
-
-            payload = {
-                "type": "suricata_alert",
-                "payload": _build_alert_payload(alert, is_blocked=is_now_blocked),
-            }
-
-            sig = (alert.get("alert") or {}).get("signature", "unknown")
-            logger.info(f"Sent Suricata alert: {sig}")
-            await ws.send(json.dumps(payload))
+            await session.send({
+                "type": "block_ip_ack",
+                "ip": src_ip,
+                "duration": AUTO_BLOCK_TIMEOUT,
+                "ok": True,
+                "severity": a.get("severity"),
+                "signature": a.get("signature"),
+                "reason": reason,
+            })
+            logger.info(f"Sent block_ip_ack for auto-blocked {src_ip} (reason={reason})")
+        except Exception as e:
+            logger.error(f"Failed to send block_ip_ack: {e}")
 
+    is_now_blocked = already_blocked or just_blocked
+
+    alert_payload = _build_alert_payload(alert, is_blocked=is_now_blocked)
+
+    # Batch mode: alert masuk window, kecuali severity tinggi (kirim langsung)
+    if batcher is not None and not batcher.is_urgent(alert_payload):
+        batcher.add(alert_payload, alert)
+        return
+
+    payload = {
+        "type": "suricata_alert",
+        "payload": alert_payload,
+    }
+
+    sig = (alert.get("alert") or {}).get("signature", "unknown")
+    logger.info(f"Sent Suricata alert: {sig}")
+    await session.send(payload)
+
+async def send_suricata_alerts(session, logger):
+    global _block_stage
+    if _block_stage is None:
+        _block_stage = BlockStage()
+
+    batcher = None
+    batch_task = None
+
+    # Tiap alert diproses di task sendiri supaya operasi firewall yang lambat
+    # untuk satu IP tidak menahan alert IP lain.
+    sem = asyncio.Semaphore(ALERT_CONCURRENCY)
+    inflight = set()
+
+    async def _worker(alert):
+        try:
+            await _process_alert(session, logger, alert, batcher)
+        except asyncio.CancelledError:
+            # koneksi ditutup di tengah proses; bisa jadi sudah terkirim (at-least-once)
+            _return_alerts([alert], logger)
+            raise
+        except Exception as e:
+            logger.error(f"Failed to process Suricata alert: {e}")
+            if session.closed:
+                # gagal karena koneksi, bukan karena alert-nya -> kirim ulang nanti
+                _return_alerts([alert], logger)
         finally:
-            alert_queue.task_done()
+            sem.release()
+
+    try:
+        while not session.closed:
+            await sem.acquire()
+            alert = await alert_queue.get()
+            if session.closed:
+                # koneksi putus selama menunggu: alert untuk koneksi berikutnya
+                _return_alerts([alert], logger)
+                sem.release()
+                break
+
+            # server_hello bisa datang belakangan -> aktifkan batch begitu diterima
+            if batcher is None and ALERT_BATCH and session.supports(CAP_ALERT_BATCH):
+                batcher = AlertBatcher(session, logger, on_unsent=lambda alerts: _return_alerts(alerts, logger))
+                batch_task = asyncio.create_task(batcher.run())
+
+            task = asyncio.create_task(_worker(alert))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+    finally:
+        for task in inflight:
+            task.cancel()
+        if batch_task:
+            batch_task.cancel()
 
 async def run_ws(config, logger):
-    global _tail_thread_started
+    global _tail_thread_started, _eve_socket_server, _spool
+    if _spool is None:
+        _spool = open_spool()
+    # sampler metrics mulai mengisi ring buffer sebelum connect
+    get_sampler()
+
     ws_url = config["SERVER_URL"].replace("http", "ws") + "/ws/agent"
     logger.info(f"Connecting to {ws_url}")
 
@@ -231,15 +559,25 @@ async def run_ws(config, logger):
                 },
                 ping_interval=20,
                 ping_timeout=20,
+                compression=None,
+                extensions=build_extensions(_wire_stats),
             ) as ws:
                 logger.info("WebSocket connected")
 
-                suricata_status = suricata()
+                session = Session(ws, _wire_stats)
+                await session.hello()
+
+                suricata_status = await asyncio.to_thread(suricata)
                 eve_log_path = suricata_status.get("eveLogPath")
 
                 loop = asyncio.get_running_loop()
 
-                if eve_log_path:
+                if EVE_SOCKET:
+                    # Suricata menulis eve langsung ke socket milik agent
+                    eve_log_path = EVE_SOCKET
+                    if _eve_socket_server is None:
+                        _eve_socket_server = await start_eve_socket(config, logger)
+                elif eve_log_path:
                     logger.info(f"Suricata alerts enabled, log path: {eve_log_path}")
                     if not _tail_thread_started:
                         threading.Thread(
@@ -253,13 +591,18 @@ async def run_ws(config, logger):
 
                 # Buat task dengan wrapper
                 tasks = [
-                    asyncio.create_task(send_metrics(ws, logger)),
-                    asyncio.create_task(send_agent_status(ws, logger)),
-                    asyncio.create_task(handle_messages(ws, logger)),
+                    asyncio.create_task(send_metrics(session, logger)),
+                    asyncio.create_task(send_agent_status(session, logger)),
+                    asyncio.create_task(handle_messages(session, logger)),
                 ]
                 
                 if eve_log_path:
-                    tasks.append(asyncio.create_task(send_suricata_alerts(ws, logger)))
+                    tasks.append(asyncio.create_task(send_suricata_alerts(session, logger)))
+                    tasks.append(asyncio.create_task(send_alert_summaries(session, logger)))
+                    if SURICATA_STATS:
+                        tasks.append(asyncio.create_task(send_suricata_stats(session, logger)))
+                    if _spool is not None:
+                        tasks.append(asyncio.create_task(replay_spool(logger)))
 
                 # Tunggu sampai salah satu task selesai/error (termasuk websocket putus)
                 done, pending = await asyncio.wait(
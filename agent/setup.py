@@ -5,8 +5,12 @@ import subprocess
 import sys
 from typing import List
 
+from agent.core.firewall import set_names
+
 SET_NAME = os.environ.get("SURIDASH_IPSET_NAME", "suridash-blacklist")
 AUTO_BLOCK_TIMEOUT = int(os.environ.get("SURIDASH_AUTO_BLOCK_TIMEOUT", "3600"))
+FIREWALL_BACKEND = os.environ.get("SURIDASH_FIREWALL_BACKEND", "ipset").lower()
+NFT_CONF = "/etc/suridash-nftables.nft"
 
 def run(cmd: List[str], check=True):
     print("+", " ".join(cmd))
@@ -44,23 +48,34 @@ def install_packages():
 
 def create_ipset():
     print(f"=== [2/6] Creating ipset {SET_NAME} ===")
-    run(["ipset", "create", SET_NAME, "hash:ip", "family", "inet", "hashsize", "4096", "maxelem", "65536", "timeout", str(AUTO_BLOCK_TIMEOUT), "-exist"])
-    print(f"✔ ipset '{SET_NAME}' created or already exists")
+    v4, v6, net4, net6 = set_names(SET_NAME)
+    # alamat tunggal (hash:ip) + prefix hasil agregasi (hash:net), IPv4 dan IPv6
+    for name, kind, family in ((v4, "hash:ip", "inet"), (v6, "hash:ip", "inet6"), (net4, "hash:net", "inet"), (net6, "hash:net", "inet6")):
+        run(["ipset", "create", name, kind, "family", family, "hashsize", "4096", "maxelem", "65536", "timeout", str(AUTO_BLOCK_TIMEOUT), "-exist"])
+    print(f"✔ ipsets '{v4}', '{v6}', '{net4}', '{net6}' created or already exist")
 
 def ensure_iptables_rule():
     print("=== [3/6] Adding iptables DROP rule ===")
 
-    # check rule exists
-    check_cmd = ["iptables", "-C", "INPUT", "-m", "set", "--match-set", SET_NAME, "src", "-j", "DROP"]
-    insert_cmd = ["iptables", "-I", "INPUT", "-m", "set", "--match-set", SET_NAME, "src", "-j", "DROP"]
+    v4, v6, net4, net6 = set_names(SET_NAME)
+    rules = [("iptables", v4), ("iptables", net4)]
+    if have("ip6tables"):
+        rules += [("ip6tables", v6), ("ip6tables", net6)]
+    else:
+        print("⚠ ip6tables not found, IPv6 sets are not enforced")
 
-    try:
-        run(check_cmd, check=True)
-        print("✔ DROP rule already exists")
-    except subprocess.CalledProcessError:
-        print("Adding rule...")
-        run(insert_cmd, check=True)
-        print("✔ DROP rule inserted")
+    for tool, name in rules:
+        # check rule exists
+        check_cmd = [tool, "-C", "INPUT", "-m", "set", "--match-set", name, "src", "-j", "DROP"]
+        insert_cmd = [tool, "-I", "INPUT", "-m", "set", "--match-set", name, "src", "-j", "DROP"]
+
+        try:
+            run(check_cmd, check=True)
+            print(f"✔ DROP rule for {name} already exists")
+        except subprocess.CalledProcessError:
+            print("Adding rule...")
+            run(insert_cmd, check=True)
+            print(f"✔ DROP rule for {name} inserted")
 
 def persist_rules():
     print("=== [4/6] Persist rules (if supported) ===")
@@ -100,9 +115,10 @@ def persist_rules():
 
 def setup_cron_persist():
     print("=== [4.5/6] Setup cron for ipset autosave/restore ===")
+    save = "; ".join(f"ipset save {name}" for name in set_names(SET_NAME))
     cron_content = f"""# Suridash ipset auto-save and restore
-*/5 * * * * root ipset save {SET_NAME} > /etc/suridash-ipset.save 2>/dev/null
-@reboot root sleep 10 && ipset restore < /etc/suridash-ipset.save 2>/dev/null
+*/5 * * * * root ({save}) > /etc/suridash-ipset.save 2>/dev/null
+@reboot root sleep 10 && ipset restore -exist < /etc/suridash-ipset.save 2>/dev/null
 """
     try:
         with open("/etc/cron.d/suridash-ipset", "w") as f:
@@ -121,12 +137,111 @@ def test_ipset():
         print("❌ ipset list failed")
         sys.exit(1)
 
-def main():
+# =========================
+# NFTABLES BACKEND
+# =========================
+def install_nftables():
+    print("=== [1/5] Installing nftables ===")
+
+    if have("apt"):
+        print("Detected Debian/Ubuntu")
+        run(["apt", "update", "-y"])
+        run(["apt", "install", "-y", "nftables"])
+
+    elif have("dnf"):
+        print("Detected RHEL/CentOS/Rocky/Alma")
+        run(["dnf", "install", "-y", "nftables"])
+
+    elif have("apk"):
+        print("Detected Alpine Linux")
+        run(["apk", "add", "nftables"])
+
+    else:
+        print("❌ Unsupported Linux distribution.")
+        sys.exit(1)
+
+    print("✔ nftables installed")
+
+def create_nft_sets():
+    from agent.core.nftables import NFT_TABLE, ruleset
+
+    print(f"=== [2/5] Creating nftables table inet {NFT_TABLE} ===")
+    with open(NFT_CONF, "w") as f:
+        f.write(ruleset(SET_NAME, AUTO_BLOCK_TIMEOUT))
+    os.chmod(NFT_CONF, 0o644)
+
+    run(["nft", "-f", NFT_CONF])
+    print(f"✔ nftables sets '{SET_NAME}' and '{SET_NAME}-v6' ready ({NFT_CONF})")
+
+def persist_nftables():
+    print("=== [3/5] Persist nftables rules ===")
+
+    include = f'include "{NFT_CONF}"'
+    for conf in ("/etc/nftables.conf", "/etc/sysconfig/nftables.conf", "/etc/nftables.nft"):
+        if not os.path.isfile(conf):
+            continue
+        with open(conf) as f:
+            content = f.read()
+        if include not in content:
+            with open(conf, "a") as f:
+                f.write(f"\n# Suridash blacklist\n{include}\n")
+            print(f"Added include to {conf}")
+        break
+    else:
+        print(f"⚠ nftables.conf not found, load {NFT_CONF} manually on boot")
+
+    if have("systemctl"):
+        run(["systemctl", "enable", "nftables"], check=False)
+    elif have("rc-update"):
+        run(["rc-update", "add", "nftables"], check=False)
+
+    print("✔ Persistence configured")
+
+def test_nftables():
+    from agent.core.nftables import NFT_TABLE
+
+    print("=== [4/5] Testing nftables set ===")
+    try:
+        run(["nft", "list", "set", "inet", NFT_TABLE, SET_NAME], check=True)
+        print("✔ nftables set working")
+    except subprocess.CalledProcessError:
+        print("❌ nft list set failed")
+        sys.exit(1)
+
+def main_nftables(skip_install: bool):
+    from agent.core.nftables import NFT_TABLE
+
+    if not skip_install:
+        install_nftables()
+    else:
+        print("=== [1/5] Skipping install (SURIDASH_SKIP_INSTALL=true) ===")
+
+    create_nft_sets()
+    persist_nftables()
+    test_nftables()
+
+    print("=== [5/5] Setup finished ===\n")
+    print(f"🎉 SUCCESS! nftables set '{SET_NAME}' is ready.\n")
+    print("Commands you can use:")
+    print(f"  ➤ Block IP:        sudo nft add element inet {NFT_TABLE} {SET_NAME} {{ 1.2.3.4 }}")
+    print(f"  ➤ Unblock IP:      sudo nft delete element inet {NFT_TABLE} {SET_NAME} {{ 1.2.3.4 }}")
+    print(f"  ➤ View block list: sudo nft list set inet {NFT_TABLE} {SET_NAME}\n")
+    print("Set SURIDASH_FIREWALL_BACKEND=nftables in agent.env so the agent uses it.")
+
+def main(backend: str | None = None):
     print("=== [0/6] Checking root permission ===")
     require_root()
 
+    # netlink memakai ipset yang sama, jadi provisioning-nya ipset
+    backend = (backend or FIREWALL_BACKEND).lower()
+
     # optional: allow skip installing packages
     skip_install = os.environ.get("SURIDASH_SKIP_INSTALL", "false").lower() == "true"
+
+    if backend == "nftables":
+        main_nftables(skip_install)
+        return
+
     if not skip_install:
         install_packages()
     else:
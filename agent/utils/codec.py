@@ -0,0 +1,69 @@
+"""
+Codec JSON untuk hot path (parsing eve.json + payload websocket).
+
+Pakai orjson kalau terpasang (ada di requirements.txt), kalau tidak jatuh ke
+stdlib json secara transparan. dumps() selalu return bytes dan loads()
+menerima bytes maupun str.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+
+if orjson is not None:
+    _OPTS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=_OPTS)
+
+    def loads(data):
+        return orjson.loads(data)
+
+else:
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(obj) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
+
+    def loads(data):
+        return json.loads(data)
+
+
+# ===== encoding biner opsional (MessagePack / CBOR) untuk payload websocket =====
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional dependency
+    cbor2 = None
+
+
+def binary_encodings() -> list:
+    """Encoding biner yang terpasang, urut dari yang paling disukai."""
+    names = []
+    if msgpack is not None:
+        names.append("msgpack")
+    if cbor2 is not None:
+        names.append("cbor")
+    return names
+
+
+def get_binary(name: str):
+    """Return (dumps, loads) untuk encoding biner `name`, atau None."""
+    if name == "msgpack" and msgpack is not None:
+        return (
+            lambda obj: msgpack.packb(obj, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+        )
+    if name == "cbor" and cbor2 is not None:
+        return cbor2.dumps, cbor2.loads
+    return None
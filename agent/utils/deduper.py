@@ -1,57 +1,153 @@
+import os
+import threading
 import time
-import hashlib
-from typing import Dict, Tuple
-
-# key -> expire_ts
-_CACHE: Dict[str, float] = {}
-MAX_KEYS = 50_000
-
-def _cleanup(now: float):
-    if len(_CACHE) <= MAX_KEYS:
-        return
-    # bersihin yang expired dulu
-    expired = [k for k, exp in _CACHE.items() if exp <= now]
-    for k in expired[: MAX_KEYS // 2]:
-        _CACHE.pop(k, None)
-    # kalau masih kebanyakan, reset
-    if len(_CACHE) > MAX_KEYS:
-        _CACHE.clear()
-
-def fingerprint_suricata_alert(alert: dict, bucket_seconds: int = 5) -> str:
+from collections import OrderedDict, deque
+from typing import List, Tuple
+
+MAX_KEYS = int(os.environ.get("SURIDASH_DEDUP_MAX_KEYS", "50000"))
+
+# (src_ip, dest_ip, proto, dest_port, sig_id, rev, severity, category, bucket)
+Fingerprint = Tuple
+
+
+# ringkasan duplikat (suricata_alert_summary)
+SUMMARY_MAX_PORTS = 16
+SUMMARY_MAX_PENDING = int(os.environ.get("SURIDASH_DEDUP_SUMMARY_MAX", "5000"))
+
+
+class _Entry:
+    __slots__ = ("expires", "count", "first", "last", "ports", "signature")
+
+    def __init__(self, expires: float):
+        self.expires = expires
+        self.count = 0  # jumlah alert yang di-suppress
+        self.first = None
+        self.last = None
+        self.ports = None
+        self.signature = None
+
+
+class Deduplicator:
+    """
+    Cache fingerprint -> entry (expire_ts + counter suppress), urut insert.
+
+    TTL sama untuk semua key, jadi urutan insert = urutan expiry: entry expired
+    selalu ada di depan dan dibuang satu per satu saat lookup (amortized O(1)).
+    Kalau penuh, hanya entry tertua yang dibuang; cache tidak pernah di-reset
+    sekaligus.
+
+    Entry yang keluar dari cache (expired / dibuang) dan pernah men-suppress
+    alert masuk ke antrian ringkasan, diambil lewat drain_summaries().
+    """
+
+    def __init__(self, max_keys: int = MAX_KEYS, clock=time.monotonic, max_summaries: int = SUMMARY_MAX_PENDING):
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        self._cache: "OrderedDict[Fingerprint, _Entry]" = OrderedDict()
+        self._summaries = deque(maxlen=max(1, max_summaries))
+        self._lock = threading.Lock()
+        self.evicted = 0  # dibuang sebelum expired karena penuh
+        self.suppressed = 0
+        self.summaries_dropped = 0
+
+    def _retire(self, key, entry: _Entry):
+        if entry.count:
+            if len(self._summaries) == self._summaries.maxlen:
+                self.summaries_dropped += 1
+            self._summaries.append((key, entry))
+
+    def _expire(self, now: float):
+        cache = self._cache
+        while cache:
+            k, entry = next(iter(cache.items()))
+            if entry.expires > now:
+                break
+            del cache[k]
+            self._retire(k, entry)
+
+    def allow(self, key, ttl_seconds: float, alert: dict = None) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            cache = self._cache
+
+            entry = cache.get(key)
+            if entry is not None:
+                if entry.expires > now:
+                    self.suppressed += 1
+                    entry.count += 1
+                    if alert is not None:
+                        ts = alert.get("timestamp")
+                        if entry.first is None:
+                            entry.first = ts
+                            entry.ports = set()
+                            entry.signature = (alert.get("alert") or {}).get("signature")
+                        entry.last = ts
+                        port = alert.get("src_port")
+                        if port is not None and len(entry.ports) < SUMMARY_MAX_PORTS:
+                            entry.ports.add(port)
+                    return False
+                del cache[key]  # expired tapi belum sampai depan (TTL berbeda)
+                self._retire(key, entry)
+
+            cache[key] = _Entry(now + ttl_seconds)
+            if len(cache) > self.max_keys:
+                self._retire(*cache.popitem(last=False))
+                self.evicted += 1
+            return True
+
+    def expire(self):
+        """Buang entry expired walau tidak ada alert baru (dipanggil periodik)."""
+        with self._lock:
+            self._expire(self._clock())
+
+    def drain_summaries(self) -> List[Tuple[Fingerprint, _Entry]]:
+        with self._lock:
+            out = list(self._summaries)
+            self._summaries.clear()
+        return out
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+_DEDUP = Deduplicator()
+
+
+def fingerprint_suricata_alert(alert: dict, bucket_seconds: int = 5) -> Fingerprint:
     """
     Fingerprint stabil untuk dedup.
     Dedup per bucket waktu agar flood alert yang sama dianggap duplikat.
     """
     a = alert.get("alert") or {}
 
-    src_ip = alert.get("src_ip") or ""
-    dest_ip = alert.get("dest_ip") or ""
-    proto = alert.get("proto") or ""
-    dest_port = str(alert.get("dest_port") or 0)
-
-    sig_id = str(a.get("signature_id") or 0)
-    rev = str(a.get("rev") or 0)
-    severity = str(a.get("severity") or 0)
-    category = str(a.get("category") or "")
-
     # time bucket (gunakan waktu agent agar sederhana)
     bucket = int(time.time() // bucket_seconds)
 
     # Hapus src_port agar serangan beruntun dari IP yang sama via port berbeda terdeduplikasi.
     # Kita bisa juga pakai 'category' untuk dedup tipe serangan yang sama (misal XSS)
-    raw = "|".join([src_ip, dest_ip, proto, dest_port, sig_id, rev, severity, category, str(bucket)])
-    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return (
+        alert.get("src_ip") or "",
+        alert.get("dest_ip") or "",
+        alert.get("proto") or "",
+        alert.get("dest_port") or 0,
+        a.get("signature_id") or 0,
+        a.get("rev") or 0,
+        a.get("severity") or 0,
+        a.get("category") or "",
+        bucket,
+    )
+
 
-def dedup_allow(key: str, ttl_seconds: int = 10) -> bool:
+def dedup_allow(key: Fingerprint, ttl_seconds: int = 10, alert: dict = None) -> bool:
     """
     Return True kalau boleh kirim (belum pernah dalam TTL).
+    Kalau `alert` diberikan, duplikat dihitung untuk ringkasan.
     """
-    now = time.time()
-    _cleanup(now)
+    return _DEDUP.allow(key, ttl_seconds, alert)
 
-    exp = _CACHE.get(key)
-    if exp and exp > now:
-        return False
 
-    _CACHE[key] = now + ttl_seconds
-    return True
\ No newline at end of file
+def dedup_summaries() -> List[Tuple[Fingerprint, _Entry]]:
+    """Ringkasan fingerprint yang sudah expired dan pernah men-suppress alert."""
+    _DEDUP.expire()
+    return _DEDUP.drain_summaries()
@@ -0,0 +1,120 @@
+"""
+Wrapper inotify minimal via ctypes (tanpa dependency tambahan).
+
+Dipakai tailer eve.json untuk menunggu perubahan file tanpa polling:
+watch file (IN_MODIFY / IN_MOVE_SELF / IN_DELETE_SELF / IN_ATTRIB) dan
+direktorinya (IN_CREATE / IN_MOVED_TO untuk file baru hasil rotasi).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+_EVENT = struct.Struct("iIII")
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(name, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def available() -> bool:
+    try:
+        return hasattr(_load_libc(), "inotify_init1")
+    except OSError:
+        return False
+
+
+class FileWatcher:
+    """
+    Watch satu file + direktorinya. wait() return flag ringkas:
+      "modified" -> file ditulis / attribut berubah (cek truncate)
+      "rotated"  -> file dipindah/dihapus atau file baru dengan nama sama muncul
+    """
+
+    FILE_MASK = IN_MODIFY | IN_ATTRIB | IN_MOVE_SELF | IN_DELETE_SELF
+    DIR_MASK = IN_CREATE | IN_MOVED_TO
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.name = os.path.basename(self.path).encode()
+        libc = _load_libc()
+
+        self.fd = libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        try:
+            self.wd_file = self._add(self.path, self.FILE_MASK)
+            self.wd_dir = self._add(os.path.dirname(self.path), self.DIR_MASK)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _add(self, path: str, mask: int) -> int:
+        wd = _load_libc().inotify_add_watch(self.fd, path.encode(), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def wait(self, timeout: float) -> set:
+        flags = set()
+        r, _, _ = select.select([self.fd], [], [], timeout)
+        if not r:
+            return flags
+
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return flags
+
+        offset = 0
+        while offset + _EVENT.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            name = buf[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # event hilang -> anggap bisa saja rotasi / truncate, biar caller cek ulang
+                flags.update(("modified", "rotated", "overflow"))
+            elif wd == self.wd_file:
+                if mask & (IN_MOVE_SELF | IN_DELETE_SELF | IN_IGNORED):
+                    flags.add("rotated")
+                elif mask & (IN_MODIFY | IN_ATTRIB):
+                    flags.add("modified")
+            elif wd == self.wd_dir and name == self.name:
+                flags.add("rotated")
+        return flags
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
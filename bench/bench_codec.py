@@ -0,0 +1,77 @@
+"""
+Micro-benchmark encode/decode codec: stdlib json vs agent.utils.codec
+(orjson kalau terpasang).
+
+  python -m bench.bench_codec
+"""
+
+import json
+import time
+
+from agent.utils import codec
+
+ALERT_LINE = (
+    b'{"timestamp":"2026-01-01T00:00:00.000000+0000","flow_id":1234567890123,"in_iface":"eth0",'
+    b'"event_type":"alert","src_ip":"203.0.113.7","src_port":51515,"dest_ip":"192.0.2.10",'
+    b'"dest_port":443,"proto":"TCP","alert":{"action":"allowed","gid":1,"signature_id":2010935,'
+    b'"rev":3,"signature":"ET SCAN Suspicious inbound to MSSQL port 1433","category":'
+    b'"Potentially Bad Traffic","severity":2},"flow":{"pkts_toserver":3,"pkts_toclient":1,'
+    b'"bytes_toserver":180,"bytes_toclient":60,"start":"2026-01-01T00:00:00.000000+0000"}}'
+)
+
+ALERT_MSG = {
+    "type": "suricata_alert",
+    "payload": {
+        "signature": "ET SCAN Suspicious inbound to MSSQL port 1433",
+        "signatureId": 2010935,
+        "timestamp": "2026-01-01T00:00:00.000000+0000",
+        "srcIp": "203.0.113.7",
+        "destIp": "192.0.2.10",
+        "srcPort": 51515,
+        "destPort": 443,
+        "protocol": "TCP",
+        "category": "Potentially Bad Traffic",
+        "severity": 2,
+        "status": "allowed",
+        "duration": 0,
+    },
+}
+
+METRICS_MSG = {
+    "type": "system_metrics",
+    "payload": {
+        "cpu": {"percent": 12.5, "cores": 8},
+        "memory": {"total": 16777216000, "used": 8388608000, "percent": 50.0, "free": 4194304000},
+        "disk": {"total": 512000000000, "used": 128000000000, "percent": 25.0},
+        "network": {"recv": 1250000, "sent": 250000},
+    },
+    "timestamp": 1767225600,
+}
+
+
+def _bench(name, fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    dt = time.perf_counter() - t0
+    print(f"  {name:<24} {n / dt:>14,.0f} ops/s  {dt / n * 1e6:8.2f} us/op")
+    return dt
+
+
+def main(n: int = 200_000):
+    print(f"codec backend: {codec.BACKEND}")
+
+    print("decode eve alert line (bytes)")
+    a = _bench("json.loads", lambda: json.loads(ALERT_LINE), n)
+    b = _bench("codec.loads", lambda: codec.loads(ALERT_LINE), n)
+    print(f"  speedup {a / b:.1f}x")
+
+    for label, msg in (("suricata_alert", ALERT_MSG), ("system_metrics", METRICS_MSG)):
+        print(f"encode {label} -> bytes for ws.send")
+        a = _bench("json.dumps().encode()", lambda: json.dumps(msg).encode(), n)
+        b = _bench("codec.dumps", lambda: codec.dumps(msg), n)
+        print(f"  speedup {a / b:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
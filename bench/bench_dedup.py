@@ -0,0 +1,92 @@
+"""
+Benchmark dedup: implementasi lama (sha1 hex + dict + clear-all) vs
+agent.utils.deduper (tuple key + OrderedDict terbatas).
+
+  python -m bench.bench_dedup
+"""
+
+import hashlib
+import random
+import time
+
+from agent.utils.deduper import Deduplicator, fingerprint_suricata_alert
+
+MAX_KEYS = 50_000
+
+
+class LegacyDedup:
+    """Salinan deduper sebelum refactor, untuk pembanding."""
+
+    def __init__(self):
+        self._cache = {}
+
+    def _cleanup(self, now):
+        if len(self._cache) <= MAX_KEYS:
+            return
+        expired = [k for k, exp in self._cache.items() if exp <= now]
+        for k in expired[: MAX_KEYS // 2]:
+            self._cache.pop(k, None)
+        if len(self._cache) > MAX_KEYS:
+            self._cache.clear()
+
+    @staticmethod
+    def fingerprint(alert, bucket_seconds=5):
+        a = alert.get("alert") or {}
+        raw = "|".join([
+            alert.get("src_ip") or "", alert.get("dest_ip") or "", alert.get("proto") or "",
+            str(alert.get("dest_port") or 0), str(a.get("signature_id") or 0), str(a.get("rev") or 0),
+            str(a.get("severity") or 0), str(a.get("category") or ""),
+            str(int(time.time() // bucket_seconds)),
+        ])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def allow(self, key, ttl_seconds=10):
+        now = time.time()
+        self._cleanup(now)
+        exp = self._cache.get(key)
+        if exp and exp > now:
+            return False
+        self._cache[key] = now + ttl_seconds
+        return True
+
+
+def make_alerts(n: int, distinct: int, seed: int = 1):
+    rnd = random.Random(seed)
+    pool = [
+        {
+            "src_ip": f"198.51.{i // 256 % 256}.{i % 256}",
+            "dest_ip": "192.0.2.10",
+            "proto": "TCP",
+            "dest_port": 443,
+            "alert": {"signature_id": 2010000 + i % 40, "rev": 1, "severity": 2, "category": "Attempted Recon"},
+        }
+        for i in range(distinct)
+    ]
+    return [pool[rnd.randrange(distinct)] for _ in range(n)]
+
+
+def _run(name, fingerprint, allow, alerts):
+    passed = 0
+    t0 = time.perf_counter()
+    for alert in alerts:
+        if allow(fingerprint(alert, 20), 25):
+            passed += 1
+    dt = time.perf_counter() - t0
+    print(f"  {name:<8} {len(alerts) / dt:>12,.0f} alerts/s  passed={passed:,}")
+    return dt
+
+
+def main(n: int = 300_000):
+    # distinct < MAX_KEYS: dominan duplikat; distinct > MAX_KEYS: cache selalu penuh
+    for distinct in (1_000, 40_000, 120_000):
+        alerts = make_alerts(n, distinct)
+        print(f"{n:,} alerts, {distinct:,} distinct fingerprints")
+        legacy = LegacyDedup()
+        a = _run("legacy", legacy.fingerprint, legacy.allow, alerts)
+        dedup = Deduplicator(MAX_KEYS)
+        b = _run("new", fingerprint_suricata_alert, dedup.allow, alerts)
+        print(f"  speedup {a / b:.1f}x  (new: {len(dedup):,} keys, {dedup.evicted:,} evicted early)")
+
+
+if __name__ == "__main__":
+    main()
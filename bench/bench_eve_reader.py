@@ -0,0 +1,110 @@
+"""
+Benchmark pembacaan eve.json: cara lama (text readline + json.loads semua
+baris) vs ChunkLineReader (chunk biner + pre-filter bytes).
+
+  python -m bench.bench_eve_reader --size-mb 2048
+  python -m bench.bench_eve_reader --file /var/log/suricata/eve.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from agent.collectors.suricata_alerts import ChunkLineReader, parse_alert_lines
+
+_TEMPLATES = {
+    "flow": {"event_type": "flow", "proto": "TCP", "flow": {"pkts_toserver": 12, "pkts_toclient": 9, "bytes_toserver": 1820, "bytes_toclient": 9120, "state": "closed"}},
+    "dns": {"event_type": "dns", "proto": "UDP", "dns": {"type": "query", "id": 4242, "rrname": "example.com", "rrtype": "A"}},
+    "http": {"event_type": "http", "proto": "TCP", "http": {"hostname": "example.com", "url": "/index.html", "http_user_agent": "curl/8.0", "status": 200, "length": 5120}},
+    "alert": {"event_type": "alert", "proto": "TCP", "alert": {"action": "allowed", "gid": 1, "signature_id": 2010935, "rev": 3, "signature": "ET SCAN Suspicious inbound to MSSQL port 1433", "category": "Potentially Bad Traffic", "severity": 2}},
+}
+
+
+def generate(path: str, size_mb: int, alert_ratio: float):
+    target = size_mb * 1024 * 1024
+    written = 0
+    rnd = random.Random(1)
+    kinds = ["flow", "dns", "http"]
+    with open(path, "w") as f:
+        while written < target:
+            kind = "alert" if rnd.random() < alert_ratio else rnd.choice(kinds)
+            ev = dict(_TEMPLATES[kind])
+            ev.update({
+                "timestamp": "2026-01-01T00:00:00.000000+0000",
+                "flow_id": rnd.getrandbits(48),
+                "src_ip": f"203.0.113.{rnd.randrange(1, 255)}",
+                "src_port": rnd.randrange(1024, 65535),
+                "dest_ip": "192.0.2.10",
+                "dest_port": 443,
+            })
+            line = json.dumps(ev, separators=(",", ":")) + "\n"
+            f.write(line)
+            written += len(line)
+
+
+def bench_old(path: str):
+    lines = alerts = 0
+    with open(path, "r", buffering=1) as f:
+        for line in f:
+            lines += 1
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if data.get("event_type") == "alert":
+                alerts += 1
+    return lines, alerts
+
+
+def bench_new(path: str):
+    lines = alerts = 0
+    with open(path, "rb", buffering=0) as f:
+        reader = ChunkLineReader(f)
+        while True:
+            batch = reader.read_lines()
+            if batch is None:
+                break
+            lines += len(batch)
+            for _ in parse_alert_lines(batch):
+                alerts += 1
+    return lines, alerts
+
+
+def _run(name, fn, path):
+    t0 = time.perf_counter()
+    lines, alerts = fn(path)
+    dt = time.perf_counter() - t0
+    print(f"{name:<8} {lines:>12,} lines {alerts:>10,} alerts {dt:8.2f}s {lines / dt:>14,.0f} lines/s")
+    return dt
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--file", help="eve.json yang sudah ada (default: generate sintetis)")
+    p.add_argument("--size-mb", type=int, default=512)
+    p.add_argument("--alert-ratio", type=float, default=0.03)
+    args = p.parse_args()
+
+    path = args.file
+    tmp = None
+    if not path:
+        tmp = tempfile.NamedTemporaryFile(prefix="eve-bench-", suffix=".json", delete=False)
+        tmp.close()
+        path = tmp.name
+        print(f"Generating {args.size_mb} MB synthetic eve.json ({args.alert_ratio:.0%} alerts) -> {path}")
+        generate(path, args.size_mb, args.alert_ratio)
+
+    try:
+        old = _run("old", bench_old, path)
+        new = _run("chunked", bench_new, path)
+        print(f"speedup: {old / new:.1f}x")
+    finally:
+        if tmp:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
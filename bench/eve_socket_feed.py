@@ -0,0 +1,72 @@
+"""
+Generator eve sintetis ke unix socket agent (pengganti Suricata saat testing
+SURIDASH_EVE_SOCKET).
+
+  python -m bench.eve_socket_feed --socket /run/suridash/eve.sock --count 10000 --rate 2000
+  python -m bench.eve_socket_feed --socket /tmp/eve.sock --type dgram
+"""
+
+import argparse
+import json
+import random
+import socket
+import time
+
+
+def make_event(i: int, rnd: random.Random, alert_ratio: float) -> bytes:
+    ev = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000000+0000", time.gmtime()),
+        "flow_id": rnd.getrandbits(48),
+        "src_ip": f"10.{rnd.randrange(256)}.{rnd.randrange(256)}.{rnd.randrange(1, 255)}",
+        "src_port": rnd.randrange(1024, 65535),
+        "dest_ip": "10.0.0.10",
+        "dest_port": 1 + i % 65535,
+        "proto": "TCP",
+    }
+    if rnd.random() < alert_ratio:
+        ev["event_type"] = "alert"
+        ev["alert"] = {
+            "action": "allowed",
+            "gid": 1,
+            "signature_id": 2100000 + i % 50,
+            "rev": 1,
+            "signature": f"SURIDASH TEST synthetic alert {i % 50}",
+            "category": "Attempted Information Leak",
+            "severity": 3,
+        }
+    else:
+        ev["event_type"] = "flow"
+    return json.dumps(ev, separators=(",", ":")).encode() + b"\n"
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--socket", required=True)
+    p.add_argument("--type", choices=["stream", "dgram"], default="stream")
+    p.add_argument("--count", type=int, default=1000)
+    p.add_argument("--rate", type=float, default=0, help="event/detik (0 = secepatnya)")
+    p.add_argument("--alert-ratio", type=float, default=1.0)
+    args = p.parse_args()
+
+    kind = socket.SOCK_STREAM if args.type == "stream" else socket.SOCK_DGRAM
+    sock = socket.socket(socket.AF_UNIX, kind)
+    sock.connect(args.socket)
+
+    rnd = random.Random(1)
+    interval = 1.0 / args.rate if args.rate > 0 else 0
+    t0 = time.perf_counter()
+    for i in range(args.count):
+        data = make_event(i, rnd, args.alert_ratio)
+        if kind == socket.SOCK_STREAM:
+            sock.sendall(data)
+        else:
+            sock.send(data)
+        if interval:
+            time.sleep(interval)
+    dt = time.perf_counter() - t0
+    sock.close()
+    print(f"sent {args.count} events in {dt:.2f}s ({args.count / dt:,.0f} ev/s)")
+
+
+if __name__ == "__main__":
+    main()
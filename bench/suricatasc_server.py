@@ -0,0 +1,166 @@
+"""
+Stand-in unix command socket Suricata (protokol suricatasc 0.2) untuk testing
+agent.collectors.suricata_sc tanpa Suricata sungguhan. Counter naik terus
+selama server jalan.
+
+Cara baca sama dengan unix-manager Suricata: satu recv (maks 4096 byte)
+di-parse sebagai SATU perintah JSON; kalau gagal di-parse (misal dua perintah
+dalam satu buffer) koneksi ditutup.
+
+  python -m bench.suricatasc_server --socket /tmp/suricata-command.socket
+  SURIDASH_SURICATA_SOCKET=/tmp/suricata-command.socket python -m agent
+
+  # latency status: connect ulang per status vs koneksi persisten
+  python -m bench.suricatasc_server --bench
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+IFACES = ["eth0", "eth1"]
+# ukuran buffer baca unix-manager Suricata
+READ_SIZE = 4096
+_started = time.time()
+
+
+def _counters() -> dict:
+    up = int(time.time() - _started) + 1
+    packets = up * 25_000
+    return {
+        "uptime": up,
+        "capture": {"kernel_packets": packets, "kernel_drops": packets // 2000, "kernel_ifdrops": 0},
+        "decoder": {"pkts": packets, "bytes": packets * 800, "invalid": up},
+        "detect": {"alert": up * 3, "engines": [{"id": 0, "rules_loaded": 41234, "rules_failed": 2}]},
+        "flow": {"memcap": 0, "active": 1200 + up % 50},
+        "tcp": {"memuse": 4_500_000, "reassembly_memuse": 12_000_000},
+        "threads": {
+            f"W#0{i + 1}-{name}": {"capture": {"kernel_packets": packets // 2, "kernel_drops": packets // 4000}}
+            for i, name in enumerate(IFACES)
+        },
+    }
+
+
+def handle_command(msg: dict):
+    """Return (return, message) seperti unix-manager Suricata."""
+    cmd = msg.get("command")
+    args = msg.get("arguments") or {}
+    up = int(time.time() - _started) + 1
+    if cmd == "uptime":
+        return "OK", up
+    if cmd == "version":
+        return "OK", "7.0.5 RELEASE"
+    if cmd == "running-mode":
+        return "OK", "workers"
+    if cmd == "capture-mode":
+        return "OK", "AF_PACKET_DEV"
+    if cmd == "ruleset-stats":
+        return "OK", [{"id": 0, "rules_loaded": 41234, "rules_failed": 2}]
+    if cmd == "ruleset-reload-time":
+        return "OK", [{"id": 0, "last_reload": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(_started))}]
+    if cmd == "iface-list":
+        return "OK", {"count": len(IFACES), "ifaces": IFACES}
+    if cmd == "iface-stat":
+        if args.get("iface") not in IFACES:
+            return "NOK", "Interface not found"
+        return "OK", {"pkts": up * 12_500, "drop": up * 6, "invalid-checksums": 0}
+    if cmd == "dump-counters":
+        return "OK", _counters()
+    return "NOK", f"Unknown command '{cmd}'"
+
+
+async def _client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float):
+    try:
+        hello = await reader.read(READ_SIZE)
+        if delay:
+            await asyncio.sleep(delay)
+        hello = json.loads(hello)
+        if hello.get("version") not in ("0.1", "0.2"):
+            writer.write(b'{"return":"NOK","message":"unsupported version"}\n')
+            return
+        writer.write(b'{"return":"OK"}\n')
+        while True:
+            buf = await reader.read(READ_SIZE)
+            if not buf:
+                break
+            if delay:
+                # latency per wakeup loop unix-manager
+                await asyncio.sleep(delay)
+            try:
+                msg = json.loads(buf)
+            except ValueError as e:
+                # Suricata: json_loads gagal -> client ditutup tanpa balasan
+                print(f"invalid command from client, closing: {e}")
+                break
+            ret, message = handle_command(msg)
+            writer.write(json.dumps({"return": ret, "message": message}).encode() + b"\n")
+            await writer.drain()
+    except (ValueError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(path: str, delay: float = 0.0):
+    if os.path.exists(path):
+        os.unlink(path)
+    return await asyncio.start_unix_server(lambda r, w: _client(r, w, delay), path=path, limit=1 << 20)
+
+
+async def _bench(rounds: int, delay: float):
+    from agent.collectors.suricata_sc import STATUS_COMMANDS, SuricataSocket, query_status
+
+    path = os.path.join(tempfile.mkdtemp(), "suricata-command.socket")
+    server = await serve(path, delay)
+
+    # seperti suricatasc CLI: connect + handshake untuk setiap status
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        oneshot = SuricataSocket(path)
+        await query_status(oneshot)
+        await oneshot.close()
+    fresh = (time.perf_counter() - t0) / rounds
+
+    client = SuricataSocket(path)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        status, counters = await query_status(client)
+    persistent = (time.perf_counter() - t0) / rounds
+
+    n = len(STATUS_COMMANDS) + len(IFACES)
+    print(f"status via socket ({n} commands, {delay * 1000:.1f}ms server wakeup latency)")
+    print(f"  connect per status {fresh * 1000:8.2f} ms/status")
+    print(f"  persistent         {persistent * 1000:8.2f} ms/status")
+    print(f"  {json.dumps(status)[:160]}...")
+    print(f"  client {client.stats()}")
+    await client.close()
+    await asyncio.sleep(0.05)  # biarkan handler server melihat EOF
+    server.close()
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--socket", default="/tmp/suricata-command.socket")
+    p.add_argument("--delay", type=float, default=0.0, help="latency per wakeup server (detik)")
+    p.add_argument("--bench", action="store_true")
+    p.add_argument("--rounds", type=int, default=200)
+    args = p.parse_args()
+
+    if args.bench:
+        asyncio.run(_bench(args.rounds, args.delay or 0.001))
+        return
+
+    async def run():
+        server = await serve(args.socket, args.delay)
+        print(f"suricatasc stand-in listening on {args.socket}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import multiprocessing
+
 from agent.__main__ import main
 
 if __name__ == "__main__":
+    # wajib untuk binary PyInstaller: worker parser eve pakai multiprocessing spawn
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,60 @@
+import subprocess
+
+from agent.core import ipset
+from agent.core.ipset import IpsetCli
+
+
+class FakeRestore:
+    """`ipset restore -exist` tiruan: berhenti di baris pertama yang gagal."""
+
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.calls = 0
+        self.added = []
+
+    def __call__(self, cmd, input="", **kwargs):
+        self.calls += 1
+        for lineno, line in enumerate(input.splitlines(), 1):
+            _, name, ip = line.split()[:3]
+            if name not in self.existing:
+                return subprocess.CompletedProcess(
+                    cmd, 1, "",
+                    f"ipset v7.15: Error in line {lineno}: The set with the given name does not exist\n",
+                )
+            self.added.append((name, ip))
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+def test_missing_v6_set_only_fails_ops_for_that_set(monkeypatch):
+    fake = FakeRestore(["bl", "bl-net"])
+    monkeypatch.setattr(ipset.subprocess, "run", fake)
+
+    ops = [
+        ("add", "203.0.113.1", 60),
+        ("add", "2001:db8::1", 60),
+        ("add", "203.0.113.2", 60),
+        ("add", "2001:db8::2", 60),
+        ("add", "198.51.100.0/24", 60),
+        ("add", "203.0.113.3", 60),
+    ]
+    results = IpsetCli("bl", sudo=False).apply(ops)
+
+    assert results == [True, False, True, False, True, True]
+    assert fake.added == [
+        ("bl", "203.0.113.1"),
+        ("bl", "203.0.113.2"),
+        ("bl-net", "198.51.100.0/24"),
+        ("bl", "203.0.113.3"),
+    ]
+    # satu restore awal + satu ulang setelah set v6 ditemukan hilang
+    assert fake.calls == 2
+
+
+def test_missing_main_set_fails_whole_batch(monkeypatch):
+    fake = FakeRestore([])
+    monkeypatch.setattr(ipset.subprocess, "run", fake)
+
+    results = IpsetCli("bl", sudo=False).apply([("add", "203.0.113.1", 0), ("del", "203.0.113.2", 0)])
+
+    assert results == [False, False]
+    assert fake.calls == 1